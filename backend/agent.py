@@ -1,46 +1,136 @@
-import socketio
+# agent.py
+# Tails one eve.json and ships its events to the server.
+#
+#   python agent.py [--sensor ID] [--eve PATH]
+#
+# --sensor picks an entry of the "sensors" list in agent_config.json (its
+# path and filter); --eve names the file directly. With neither, the first
+# configured sensor is used. Checkpoint and spool are kept per sensor, so
+# several agents can run on one host.
+import argparse
+import hashlib
 import json
-import time
+import os
+import socketio
 from threading import Thread, Event
+from agent_batch import AlertBatcher
+from agent_tail import EveTailer
+from agent_filter import EventFilter, load_agent_config
+from agent_link import NAMESPACE, DRAIN_RATE, ServerLink, open_spool
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_EVE_PATH = r"D:\Program Files\Suricata\log\eve.json"
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "agent_checkpoints")
+LEGACY_CHECKPOINT_PATH = os.path.join(BASE_DIR, "eve_checkpoint.json")  # before checkpoints were per sensor
+
+
+def sensor_id_for(path):
+    """Stable id for a sensor given only by its eve.json path."""
+    key = os.path.normcase(os.path.abspath(path)).encode("utf-8")
+    return "eve-" + hashlib.sha1(key).hexdigest()[:10]
 
-sio = socketio.Client()
-EVE_PATH = r"D:\Program Files\Suricata\log\eve.json"
-stop_event = Event()  # signal to stop tailing
 
-@sio.event
-def connect():
-    print("✅ Connected to Flask SocketIO")
+def resolve_sensor(agent_config, sensor_id=None, eve_path=None):
+    """(id, path, filter config) for this agent from the command line and agent_config.json."""
+    sensors = agent_config.get("sensors") or []
+    sensor = {}
+    if sensor_id is not None:
+        sensor = next((s for s in sensors if s.get("id") == sensor_id), None)
+        if sensor is None and eve_path is None:
+            raise SystemExit(f"Unknown sensor {sensor_id!r}; add it to agent_config.json or pass --eve")
+        sensor = sensor or {}
+    elif eve_path is None and sensors:
+        sensor = sensors[0]
+    path = eve_path or sensor.get("path") or DEFAULT_EVE_PATH
+    return sensor_id or sensor.get("id") or sensor_id_for(path), path, sensor.get("filter", agent_config.get("filter"))
 
-@sio.event
-def disconnect():
-    print("❌ Disconnected from server")
 
-def tail_eve():
+def adopt_legacy_checkpoint(path, checkpoint_path):
+    """Carry over the old shared eve_checkpoint.json if it was written for this file."""
+    if os.path.exists(checkpoint_path) or not os.path.exists(LEGACY_CHECKPOINT_PATH):
+        return
     try:
-        with open(EVE_PATH, "r", encoding="utf-8") as f:
-            f.seek(0, 2)  # go to end of file
-            while not stop_event.is_set():
-                line = f.readline()
-                if not line:
-                    time.sleep(0.2)  # use regular sleep here
-                    continue
-                try:
-                    event = json.loads(line.strip())
-                    sio.emit("alert_event", event, namespace="/api/alerts/stream")
-                    print("📤 Sent alert:", event.get("event_type"))
-                except Exception as e:
-                    print("⚠️ Error:", e)
-    except Exception as e:
-        print("⚠️ tail_eve error:", e)
-
-try:
-    sio.connect("http://localhost:5000", namespaces=["/api/alerts/stream"])
+        with open(LEGACY_CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            legacy_path = json.load(f).get("path")
+    except (OSError, ValueError, AttributeError):
+        return
+    if legacy_path == os.path.normcase(os.path.abspath(path)):
+        os.replace(LEGACY_CHECKPOINT_PATH, checkpoint_path)
+        print("📍 Moved eve_checkpoint.json to the sensor's checkpoint")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ship one eve.json to the server")
+    parser.add_argument("--sensor", help="id of a sensor listed in agent_config.json")
+    parser.add_argument("--eve", help="path of the eve.json to tail")
+    args = parser.parse_args(argv)
+
+    agent_config = load_agent_config()
+    sensor_id, eve_path, filter_config = resolve_sensor(agent_config, args.sensor, args.eve)
+    print(f"👀 [{sensor_id}] Tailing {eve_path}")
+
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{sensor_id}.json")
+    adopt_legacy_checkpoint(eve_path, checkpoint_path)
+
+    sio = socketio.Client()
+    stop_event = Event()  # signal to stop tailing
+    spool_config = agent_config.get("spool", {})
+    spool_root = spool_config.get("directory", os.path.join(BASE_DIR, "agent_spool"))
+    link = ServerLink(
+        sio, agent_config.get("server_url", "http://localhost:5000"),
+        open_spool(dict(spool_config, directory=os.path.join(spool_root, sensor_id)), spool_root),
+        drain_rate=spool_config.get("drain_batches_per_second", DRAIN_RATE),  # replay pace after an outage
+    )
+
+    @sio.on("connect", namespace=NAMESPACE)
+    def connect():
+        print("✅ Connected to Flask SocketIO")
+        link.wake.set()
+
+    @sio.on("disconnect", namespace=NAMESPACE)
+    def disconnect():
+        print("❌ Disconnected from server")
+
+    # The checkpoint moves only once a batch has been sent or spooled
+    batcher = AlertBatcher(link.send_batch, on_sent=lambda position: tailer.commit(position))
+    event_filter = EventFilter(filter_config)  # drops flow/stats etc. before decoding
+
+    def handle_line(line, position):
+        try:
+            event = event_filter.check(line)
+        except Exception as e:
+            print("⚠️ Error:", e)
+            event = None
+        if event is not None:
+            batcher.add(event, position)
+        elif not batcher.skip(position):
+            tailer.commit(position, save=False)  # nothing owed before this line
+
+    tailer = EveTailer(eve_path, handle_line, checkpoint_path, stop_event)
+
+    def tail_eve():
+        try:
+            tailer.run()
+        except Exception as e:
+            print("⚠️ tail_eve error:", e)
+        finally:
+            batcher.flush(link.flush_on_shutdown)  # acked or spooled, never dropped on disconnect
+
     thread = Thread(target=tail_eve)
-    thread.start()
-    sio.wait()  # main thread waits for SocketIO events
-except KeyboardInterrupt:
-    print("\n🛑 Stopping client...")
-    stop_event.set()    # tell tail_eve to exit
-    thread.join()       # wait for thread to finish
-    sio.disconnect()    # disconnect socket
-    print("✅ Client stopped gracefully")
+    drainer = Thread(target=link.drain_spool, args=(stop_event,), daemon=True)
+    try:
+        thread.start()
+        drainer.start()
+        link.connect_with_retry(stop_event)
+        sio.wait()  # main thread waits for SocketIO events
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping client...")
+        tailer.stop()       # tell tail_eve to exit
+        thread.join()       # wait for thread to finish
+        sio.disconnect()    # disconnect socket
+        print("✅ Client stopped gracefully")
+
+
+if __name__ == "__main__":
+    main()
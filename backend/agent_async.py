@@ -0,0 +1,179 @@
+# agent_async.py
+# One process, one Socket.IO connection, many eve.json files.
+# Sensors are listed in agent_config.json:
+#   "server_url": "http://localhost:5000",
+#   "sensors": [{"id": "dmz", "path": "/var/log/suricata/dmz/eve.json", "filter": {...}}, ...]
+# A sensor's "filter" overrides the top-level "filter" section.
+import asyncio
+import os
+from collections import Counter, deque
+import socketio
+from watchdog.observers import Observer
+from agent_batch import MAX_BATCH_SIZE, MAX_BATCH_DELAY
+from agent_tail import EveTailer, SAFETY_WAKE
+from agent_filter import EventFilter, load_agent_config
+from agent_link import NAMESPACE, DRAIN_RATE, AsyncServerLink, open_spool
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+READ_SLICE = 4 * 1024 * 1024  # bytes read per sensor before yielding to the others
+QUEUE_SIZE = 20000            # events waiting to be batched; tailers pause when it is full
+
+agent_config = load_agent_config()
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "agent_checkpoints")
+spool_config = agent_config.get("spool", {})
+
+sio = socketio.AsyncClient()
+link = AsyncServerLink(
+    sio, agent_config.get("server_url", "http://localhost:5000"),
+    open_spool(spool_config, os.path.join(BASE_DIR, "agent_spool_multi")),
+    drain_rate=spool_config.get("drain_batches_per_second", DRAIN_RATE),
+)
+
+
+class Sensor:
+    """One tailed eve.json; its events are tagged with sensor_id and fed to the shared queue."""
+
+    def __init__(self, sensor_id, path, filter_config, queue):
+        self.id = sensor_id
+        self.queue = queue
+        self.filter = EventFilter(filter_config)
+        self.wake = asyncio.Event()
+        self.events = deque()  # read but not yet queued; popped only once queued
+        self.positions = deque()  # tail position of every event read but not yet delivered, in order
+        self.tailer = EveTailer(path, self._on_line, os.path.join(CHECKPOINT_DIR, f"{sensor_id}.json"))
+
+    def _on_line(self, line, position):
+        try:
+            event = self.filter.check(line)
+        except Exception as e:
+            print(f"⚠️ [{self.id}] Error:", e)
+            event = None
+        if event is not None:
+            event["sensor_id"] = self.id
+            self.events.append(event)
+            self.positions.append(position)
+        elif self.positions:
+            self.positions[-1] = position  # checkpointed along with the last pending event
+        else:
+            self.tailer.commit(position, save=False)  # nothing owed before this line
+
+    def delivered(self, count):
+        """The oldest `count` pending events were sent or spooled: move the checkpoint past them."""
+        position = None
+        for _ in range(count):
+            position = self.positions.popleft()
+        if position is not None:
+            self.tailer.commit(position)
+
+    async def run(self):
+        print(f"👀 [{self.id}] Tailing {self.tailer.path}")
+        while True:
+            self.wake.clear()  # changes from here on wake the wait below
+            more = self.tailer.step(READ_SLICE)
+            while self.events:
+                await self.queue.put(self.events[0])  # backpressure when the sender falls behind
+                self.events.popleft()
+            if more:
+                await asyncio.sleep(0)  # let the other sensors have a turn
+                continue
+            try:
+                await asyncio.wait_for(self.wake.wait(), SAFETY_WAKE)
+            except asyncio.TimeoutError:
+                pass
+
+
+# 🔹 Connection, batching and spool
+@sio.on("connect", namespace=NAMESPACE)
+async def connect():
+    print("✅ Connected to Flask SocketIO")
+
+
+@sio.on("disconnect", namespace=NAMESPACE)
+async def disconnect():
+    print("❌ Disconnected from server")
+
+
+def report_delivered(sensors, events):
+    """Advance each sensor's checkpoint past its events in a batch that was sent or spooled."""
+    for sensor_id, count in Counter(event["sensor_id"] for event in events).items():
+        sensors[sensor_id].delivered(count)
+
+
+async def batch_sender(queue, batch, sensors):
+    """
+    Multiplexes every sensor onto the one connection, flushing by size or delay.
+
+    `batch` is owned by the caller so a batch still being built is not lost
+    when this task is cancelled at shutdown. `sensors` maps ids to Sensor,
+    whose checkpoints move once their events are delivered.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch.append(await queue.get())
+        deadline = loop.time() + MAX_BATCH_DELAY
+        while len(batch) < MAX_BATCH_SIZE:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        await link.send_batch(list(batch))
+        report_delivered(sensors, batch)
+        batch.clear()
+
+
+async def main():
+    sensors_config = agent_config.get("sensors") or []
+    if not sensors_config:
+        print("⚠️ No sensors configured; add a \"sensors\" list to agent_config.json")
+        return
+
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    sensors = [
+        Sensor(s["id"], s["path"], s.get("filter", agent_config.get("filter")), queue)
+        for s in sensors_config
+    ]
+
+    # A single watchdog thread serves every sensor; it only wakes the matching coroutine
+    observer = Observer()
+    for sensor in sensors:
+        sensor.tailer.schedule(observer, lambda sensor=sensor: loop.call_soon_threadsafe(sensor.wake.set))
+    observer.start()
+
+    by_id = {sensor.id: sensor for sensor in sensors}
+    building = []
+    tasks = [asyncio.create_task(sensor.run()) for sensor in sensors]
+    tasks += [asyncio.create_task(batch_sender(queue, building, by_id)), asyncio.create_task(link.drain_spool())]
+    try:
+        await link.connect_with_retry()
+        await asyncio.gather(*tasks)
+    finally:
+        observer.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Oldest first: the batch being built, then the queue, then what sensors still hold
+        leftover = building + [queue.get_nowait() for _ in range(queue.qsize())]
+        for sensor in sensors:
+            leftover.extend(sensor.events)
+        if leftover:
+            await link.flush_on_shutdown(leftover)
+            report_delivered(by_id, leftover)
+        observer.join()
+        if sio.connected:
+            await sio.disconnect()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):  # python-socketio's SIGINT handler surfaces as a cancel
+        print("\n🛑 Stopping client...")
+        print("✅ Client stopped gracefully")
@@ -0,0 +1,100 @@
+# agent_batch.py
+import time
+from threading import Lock, Timer
+
+MAX_BATCH_SIZE = 500    # events per frame
+MAX_BATCH_DELAY = 0.5   # seconds an event may wait before its batch is sent
+
+
+class AlertBatcher:
+    """
+    Collects tailed events and hands them to `send` as one list.
+
+    A batch goes out as soon as it holds max_size events, or once its oldest
+    event has waited max_delay seconds, whichever comes first. During a burst
+    that turns tens of thousands of per-line emits into a few dozen frames,
+    while a quiet sensor still delivers each event within max_delay: the
+    first event of a batch arms a timer, so nobody has to poll.
+
+    Events may carry the tail position of the line they came from. Once a
+    batch has been handed to `send`, on_sent is called with the position of
+    its last line, so a checkpoint only ever covers delivered events.
+    Batches are delivered and reported strictly in order.
+    """
+
+    def __init__(self, send, max_size=MAX_BATCH_SIZE, max_delay=MAX_BATCH_DELAY, on_sent=None):
+        self.send = send
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.on_sent = on_sent
+        self.events = []
+        self.position = None  # tail position covered by the pending events
+        self.first_at = 0.0
+        self.generation = 0  # bumped whenever a batch is taken
+        self.lock = Lock()
+        self.send_lock = Lock()  # held while a batch is delivered and reported; taken before `lock`
+
+    def add(self, event, position=None):
+        with self.lock:
+            if not self.events:
+                self.first_at = time.monotonic()
+                self._arm_timer()
+            self.events.append(event)
+            if position is not None:
+                self.position = position
+            if len(self.events) < self.max_size and not self._expired():
+                return
+        self._deliver()
+
+    def skip(self, position):
+        """
+        Account for a tailed line that produced no event.
+
+        Returns True when the pending batch will report its position. False
+        means nothing is pending or in flight, so the caller may checkpoint
+        the position itself.
+        """
+        with self.send_lock, self.lock:
+            if self.events:
+                self.position = position
+                return True
+            return False
+
+    def _on_timer(self, generation):
+        # Only flush the batch this timer was armed for; it may already have gone out on size
+        with self.send_lock:
+            with self.lock:
+                if generation != self.generation or not self.events:
+                    return
+                batch, position = self._take()
+            self._send(self.send, batch, position)
+
+    def flush(self, send=None):
+        """Send whatever is pending, e.g. on shutdown; `send` overrides the usual sender."""
+        self._deliver(send)
+
+    def _deliver(self, send=None):
+        with self.send_lock:
+            with self.lock:
+                batch, position = self._take()
+            if batch:
+                self._send(send or self.send, batch, position)
+
+    def _send(self, send, batch, position):
+        send(batch)
+        if position is not None and self.on_sent:
+            self.on_sent(position)
+
+    def _arm_timer(self):
+        timer = Timer(self.max_delay, self._on_timer, args=(self.generation,))
+        timer.daemon = True
+        timer.start()
+
+    def _expired(self):
+        return time.monotonic() - self.first_at >= self.max_delay
+
+    def _take(self):
+        batch, self.events = self.events, []
+        position, self.position = self.position, None
+        self.generation += 1
+        return batch, position
@@ -0,0 +1,103 @@
+# agent_filter.py
+import ipaddress
+import json
+import os
+import re
+
+CONFIG_PATH = os.getenv("AGENT_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_config.json"))
+
+DEFAULT_FILTER = {
+    "event_types": None,                   # allowlist; None keeps every type not dropped below
+    "drop_event_types": ["flow", "stats"],  # same types the server throws away
+    "min_severity": None,                  # keep alerts with severity <= this (1 is highest)
+    "ignore_subnets": [],                  # drop events whose src or dest is in one of these
+}
+
+# Suricata writes compact JSON, so the fields we filter on can be found in the raw bytes
+EVENT_TYPE_RE = re.compile(rb'"event_type"\s*:\s*"([^"]*)"')
+SEVERITY_RE = re.compile(rb'"severity"\s*:\s*(\d+)')
+SRC_IP_RE = re.compile(rb'"src_ip"\s*:\s*"([^"]*)"')
+DEST_IP_RE = re.compile(rb'"dest_ip"\s*:\s*"([^"]*)"')
+
+
+def load_agent_config(path=CONFIG_PATH):
+    """Agent settings from a JSON file; a missing file means defaults."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class EventFilter:
+    """
+    Drops unwanted eve.json lines before they are decoded and shipped.
+
+    check() looks at event_type, severity and the IPs with byte-level regex
+    matches, so the bulk of traffic (flow events) is rejected without ever
+    running json.loads. Only lines that pass are decoded; if a field can't
+    be found in the raw bytes the decoded event is checked instead.
+    """
+
+    def __init__(self, config=None):
+        config = {**DEFAULT_FILTER, **(config or {})}
+        allow = config["event_types"]
+        self.allow = {t.encode() for t in allow} if allow else None
+        self.drop = {t.encode() for t in config["drop_event_types"] or ()}
+        self.min_severity = config["min_severity"]
+        self.subnets = [ipaddress.ip_network(net, strict=False) for net in config["ignore_subnets"] or ()]
+        self.dropped = 0
+
+    def _type_ok(self, event_type):
+        if event_type in self.drop:
+            return False
+        return self.allow is None or event_type in self.allow
+
+    def _ip_ignored(self, ip):
+        if not ip or not self.subnets:
+            return False
+        try:
+            addr = ipaddress.ip_address(ip.decode() if isinstance(ip, bytes) else ip)
+        except ValueError:
+            return False
+        return any(addr in net for net in self.subnets)
+
+    def check(self, line: bytes):
+        """Return the decoded event if it should be sent, otherwise None."""
+        match = EVENT_TYPE_RE.search(line)
+        event_type = match.group(1) if match else None
+        if event_type is not None and not self._type_ok(event_type):
+            self.dropped += 1
+            return None
+
+        if event_type == b"alert" and self.min_severity is not None:
+            match = SEVERITY_RE.search(line)
+            if match and int(match.group(1)) > self.min_severity:
+                self.dropped += 1
+                return None
+
+        if self.subnets:
+            for regex in (SRC_IP_RE, DEST_IP_RE):
+                match = regex.search(line)
+                if match and self._ip_ignored(match.group(1)):
+                    self.dropped += 1
+                    return None
+
+        event = json.loads(line)
+        if event_type is None and not self._accepts(event):
+            self.dropped += 1
+            return None
+        return event
+
+    def _accepts(self, event):
+        """Slow path for lines the byte sniff couldn't classify."""
+        if not isinstance(event, dict):
+            return False
+        event_type = str(event.get("event_type", "")).encode()
+        if not self._type_ok(event_type):
+            return False
+        severity = (event.get("alert") or {}).get("severity")
+        if event_type == b"alert" and self.min_severity is not None and severity is not None:
+            if int(severity) > self.min_severity:
+                return False
+        return not any(self._ip_ignored(event.get(key)) for key in ("src_ip", "dest_ip"))
@@ -0,0 +1,180 @@
+# agent_link.py
+import asyncio
+import time
+from threading import Event
+
+import socketio
+
+from agent_batch import MAX_BATCH_SIZE
+from agent_spool import DiskSpool, MAX_SPOOL_BYTES, SEGMENT_BYTES
+
+NAMESPACE = "/api/alerts/stream"
+DRAIN_RATE = 20          # spooled batches replayed per second after an outage
+ACK_TIMEOUT = 10         # seconds to wait for the server to ack a replayed batch
+SHUTDOWN_TIMEOUT = 5     # seconds to wait for an ack while stopping
+MAX_RETRY_DELAY = 30
+
+
+def open_spool(spool_config, directory):
+    """DiskSpool from the "spool" section of agent_config.json; `directory` unless it names one."""
+    return DiskSpool(
+        spool_config.get("directory", directory),
+        segment_bytes=spool_config.get("segment_bytes", SEGMENT_BYTES),
+        max_bytes=spool_config.get("max_bytes", MAX_SPOOL_BYTES),
+    )
+
+
+class ServerLink:
+    """
+    Delivery of event batches to the server, backed by a DiskSpool.
+
+    send_batch() emits directly while connected and the spool is empty,
+    otherwise it spools, so new events queue behind older unsent ones.
+    drain_spool() replays the spool at drain_rate, one acked batch at a time.
+    flush_on_shutdown() hands over what is still in memory when the agent
+    stops. AsyncServerLink does the same over socketio.AsyncClient.
+    """
+
+    def __init__(self, sio, server_url, spool, drain_rate=DRAIN_RATE, namespace=NAMESPACE):
+        self.sio = sio
+        self.server_url = server_url
+        self.spool = spool
+        self.drain_rate = drain_rate
+        self.namespace = namespace
+        self.wake = Event()  # set on connect and whenever something is spooled
+
+    def is_connected(self):
+        return self.sio.connected and self.namespace in self.sio.namespaces
+
+    def _direct(self):
+        # Spooled batches go first, so new events queue behind them until the spool is drained
+        return self.spool.empty() and self.is_connected()
+
+    def _chunks(self, events):
+        for start in range(0, len(events), MAX_BATCH_SIZE):
+            yield events[start:start + MAX_BATCH_SIZE]
+
+    def send_batch(self, events):
+        if self._direct():
+            try:
+                self.sio.emit("alert_batch", {"events": events}, namespace=self.namespace)
+                print(f"📤 Sent {len(events)} alerts")
+                return
+            except Exception as e:
+                print("⚠️ Error sending batch:", e)
+        self.spool.append(events)
+        self.wake.set()
+
+    def _replay_one(self):
+        """Send the oldest spooled batch and wait for its ack; False if there was nothing to send."""
+        item = self.spool.peek()
+        if item is None:
+            return False
+        events, token = item
+        self.sio.call("alert_batch", {"events": events}, namespace=self.namespace, timeout=ACK_TIMEOUT)
+        self.spool.commit(token)
+        print(f"📤 Replayed {len(events)} spooled alerts")
+        return True
+
+    def drain_spool(self, stop_event):
+        """Replays the spool at drain_rate until stop_event is set."""
+        while not stop_event.is_set():
+            if self.spool.empty() or not self.is_connected():
+                self.wake.wait(1.0)
+                self.wake.clear()
+                continue
+            try:
+                self._replay_one()
+            except Exception as e:
+                print("⚠️ Error replaying spool:", e)
+                time.sleep(1.0)
+            time.sleep(1.0 / self.drain_rate)
+
+    def flush_on_shutdown(self, events):
+        """
+        Hand over everything read but not yet sent.
+
+        Sent with an ack while connected and the spool is empty, spooled otherwise
+        so the next run delivers it.
+        """
+        for chunk in self._chunks(events):
+            if self._direct():
+                try:
+                    self.sio.call("alert_batch", {"events": chunk}, namespace=self.namespace, timeout=SHUTDOWN_TIMEOUT)
+                    print(f"📤 Sent {len(chunk)} alerts on shutdown")
+                    continue
+                except Exception as e:
+                    print("⚠️ Error sending on shutdown, spooling:", e)
+            self.spool.append(chunk)
+            print(f"💾 Spooled {len(chunk)} alerts on shutdown")
+
+    def connect_with_retry(self, stop_event):
+        # Tailing has already started; anything read before the first connect lands in the spool
+        delay = 1
+        while not stop_event.is_set():
+            try:
+                self.sio.connect(self.server_url, namespaces=[self.namespace])
+                return
+            except socketio.exceptions.ConnectionError as e:
+                print(f"⚠️ Server unreachable ({e}), retrying in {delay}s")
+                stop_event.wait(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+
+class AsyncServerLink(ServerLink):
+    """ServerLink for socketio.AsyncClient; the same policy, awaited."""
+
+    async def send_batch(self, events):
+        if self._direct():
+            try:
+                await self.sio.emit("alert_batch", {"events": events}, namespace=self.namespace)
+                print(f"📤 Sent {len(events)} alerts")
+                return
+            except Exception as e:
+                print("⚠️ Error sending batch:", e)
+        self.spool.append(events)
+
+    async def _replay_one(self):
+        item = self.spool.peek()
+        if item is None:
+            return False
+        events, token = item
+        await self.sio.call("alert_batch", {"events": events}, namespace=self.namespace, timeout=ACK_TIMEOUT)
+        self.spool.commit(token)
+        print(f"📤 Replayed {len(events)} spooled alerts")
+        return True
+
+    async def drain_spool(self):
+        """Replays the spool at drain_rate until cancelled."""
+        while True:
+            await asyncio.sleep(1.0 / self.drain_rate)
+            if self.spool.empty() or not self.is_connected():
+                continue
+            try:
+                await self._replay_one()
+            except Exception as e:
+                print("⚠️ Error replaying spool:", e)
+                await asyncio.sleep(1.0)
+
+    async def flush_on_shutdown(self, events):
+        for chunk in self._chunks(events):
+            if self._direct():
+                try:
+                    await self.sio.call("alert_batch", {"events": chunk}, namespace=self.namespace, timeout=SHUTDOWN_TIMEOUT)
+                    print(f"📤 Sent {len(chunk)} alerts on shutdown")
+                    continue
+                except Exception as e:
+                    print("⚠️ Error sending on shutdown, spooling:", e)
+            self.spool.append(chunk)
+            print(f"💾 Spooled {len(chunk)} alerts on shutdown")
+
+    async def connect_with_retry(self):
+        delay = 1
+        while True:
+            try:
+                await self.sio.connect(self.server_url, namespaces=[self.namespace])
+                return
+            except socketio.exceptions.ConnectionError as e:
+                print(f"⚠️ Server unreachable ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
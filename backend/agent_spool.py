@@ -0,0 +1,141 @@
+# agent_spool.py
+import json
+import os
+import re
+import tempfile
+from threading import Lock
+
+SEGMENT_BYTES = 8 * 1024 * 1024       # roll to a new segment file past this size
+MAX_SPOOL_BYTES = 512 * 1024 * 1024   # oldest segments are dropped beyond this
+SEGMENT_RE = re.compile(r"seg-(\d{12})\.ndjson")
+
+
+class DiskSpool:
+    """
+    Bounded append log of unsent batches, kept as numbered segment files.
+
+    Each line of a segment is one batch (a JSON list of events). Writers
+    append to the newest segment; the reader works through the oldest one
+    from a persisted cursor and deletes segments it has finished. Only one
+    batch is ever held in memory, and once the spool exceeds max_bytes the
+    oldest segments are dropped, so a long outage costs disk, not RAM.
+    """
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, max_bytes=MAX_SPOOL_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.writer = None
+        self.sizes = {}
+        for name in os.listdir(directory):
+            match = SEGMENT_RE.fullmatch(name)
+            if match:
+                self.sizes[int(match.group(1))] = os.path.getsize(os.path.join(directory, name))
+        self.cursor_path = os.path.join(directory, "cursor.json")
+        self.cursor = self._load_cursor()
+        self.dropped_bytes = 0
+
+    def _segment_path(self, seq):
+        return os.path.join(self.directory, f"seg-{seq:012d}.ndjson")
+
+    # 🔹 Cursor (segment, offset of the next unsent batch)
+    def _load_cursor(self):
+        try:
+            with open(self.cursor_path, "r", encoding="utf-8") as f:
+                seg, offset = json.load(f)
+            if seg in self.sizes:
+                return [seg, offset]
+        except (OSError, ValueError, TypeError):
+            pass
+        return [min(self.sizes), 0] if self.sizes else None
+
+    def _save_cursor(self):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.cursor, f)
+        os.replace(tmp, self.cursor_path)
+
+    # 🔹 Writing
+    def append(self, batch):
+        data = (json.dumps(batch) + "\n").encode("utf-8")
+        with self.lock:
+            if self.writer is None or self.sizes[self.writer[0]] >= self.segment_bytes:
+                self._roll()
+            seq, f = self.writer
+            f.write(data)
+            f.flush()
+            self.sizes[seq] += len(data)
+            if self.cursor is None:
+                self.cursor = [seq, 0]
+            self._enforce_limit()
+
+    def _roll(self):
+        if self.writer:
+            self.writer[1].close()
+        seq = max(self.sizes, default=0) + 1
+        self.sizes[seq] = 0
+        self.writer = (seq, open(self._segment_path(seq), "ab"))
+
+    def _enforce_limit(self):
+        while sum(self.sizes.values()) > self.max_bytes and len(self.sizes) > 1:
+            oldest = min(self.sizes)
+            self.dropped_bytes += self.sizes[oldest]
+            print(f"⚠️ Spool over {self.max_bytes} bytes, dropping oldest segment {oldest}")
+            self._remove(oldest)
+
+    def _remove(self, seq):
+        del self.sizes[seq]
+        try:
+            os.remove(self._segment_path(seq))
+        except FileNotFoundError:
+            pass
+        if self.cursor and self.cursor[0] == seq:
+            self.cursor = [min(self.sizes), 0] if self.sizes else None
+
+    # 🔹 Reading
+    def empty(self):
+        with self.lock:
+            return self.cursor is None
+
+    def peek(self):
+        """Oldest unsent batch as (batch, token), or None; pass token to commit() once sent."""
+        with self.lock:
+            while self.cursor:
+                seq, offset = self.cursor
+                with open(self._segment_path(seq), "rb") as f:
+                    f.seek(offset)
+                    line = f.readline()
+                last = seq == max(self.sizes)
+                if line.endswith(b"\n"):
+                    try:
+                        return json.loads(line), (seq, offset + len(line))
+                    except ValueError:
+                        self.cursor = [seq, offset + len(line)]  # corrupt line, skip it
+                        continue
+                if last:
+                    return None  # caught up with the writer
+                self._remove(seq)  # finished (or torn at the end), move to the next segment
+            return None
+
+    def commit(self, token):
+        seq, offset = token
+        with self.lock:
+            if not self.cursor or self.cursor[0] != seq:
+                return  # segment was dropped while the batch was in flight
+            self.cursor = [seq, offset]
+            if seq == max(self.sizes) and offset >= self.sizes[seq]:
+                self._reset()
+            else:
+                self._save_cursor()
+
+    def _reset(self):
+        """Everything has been sent: delete the segments so new batches go out directly."""
+        if self.writer:
+            self.writer[1].close()
+            self.writer = None
+        for seq in list(self.sizes):
+            self._remove(seq)
+        if os.path.exists(self.cursor_path):
+            os.remove(self.cursor_path)
@@ -0,0 +1,198 @@
+# agent_tail.py
+import json
+import os
+import tempfile
+from threading import Event, Lock
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+READ_CHUNK = 1024 * 1024
+SAFETY_WAKE = 30.0  # seconds; re-checks the file even if a notification was missed
+
+
+class _WakeOnChange(FileSystemEventHandler):
+    """Calls on_change whenever the watched file is written, created, moved or deleted."""
+
+    def __init__(self, path, on_change):
+        self.path = path
+        self.on_change = on_change
+
+    def on_any_event(self, event):
+        paths = (event.src_path, getattr(event, "dest_path", ""))
+        if any(p and os.path.normcase(os.path.abspath(p)) == self.path for p in paths):
+            self.on_change()
+
+
+class EveTailer:
+    """
+    Follows eve.json using filesystem notifications instead of polling.
+
+    The tailer sleeps until watchdog reports a change, then reads everything
+    that was appended and hands each complete line (as bytes) to
+    on_line(line, position), position being the (inode, offset) just past
+    that line. Rotation is detected by the file's inode changing and
+    truncation by its size dropping below our offset; in both cases the new
+    file is read from the start.
+
+    Reading does not move the checkpoint: the consumer calls commit() with a
+    line's position once everything up to it has been delivered (sent or
+    spooled), and that position is what is saved to checkpoint_path. A
+    restart therefore resumes right after the last delivered line, and
+    events still waiting in a batch are read again rather than lost.
+    """
+
+    def __init__(self, path, on_line, checkpoint_path, stop_event=None):
+        self.path = os.path.normcase(os.path.abspath(path))
+        self.on_line = on_line
+        self.checkpoint_path = checkpoint_path
+        self.stop_event = stop_event or Event()
+        self.wake = Event()
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.pending = b""
+        self.started = False  # the checkpoint only applies to the first open
+        self.lock = Lock()    # commit() is called from the sending thread
+        self.committed = None  # (inode, offset) delivered up to
+        self.saved = None      # what checkpoint_path holds
+
+    # 🔹 Checkpoint
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("inode"), int(data.get("offset", 0))
+        except (OSError, ValueError, AttributeError):
+            return None, 0
+
+    def _save_checkpoint(self):
+        """Write the committed position if it moved; call with self.lock held."""
+        if self.committed is None or self.committed == self.saved:
+            return
+        inode, offset = self.committed
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"path": self.path, "inode": inode, "offset": offset}, f)
+        os.replace(tmp, self.checkpoint_path)
+        self.saved = self.committed
+
+    def commit(self, position, save=True):
+        """
+        Everything up to `position` has been delivered.
+
+        save=False only records it; it is written after the current read
+        pass, which keeps lines that are filtered out from costing a write each.
+        """
+        with self.lock:
+            self.committed = position
+            if save:
+                self._save_checkpoint()
+
+    # 🔹 File handling
+    def _open(self, resume=False):
+        """Open the current file; on startup resume from the checkpoint if it still applies."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(f.fileno())
+        offset = 0
+        if resume:
+            inode, saved = self._load_checkpoint()
+            if inode is None:
+                offset = stat.st_size  # first run: only new events, like before
+                print("📍 No checkpoint, starting at end of file")
+            elif inode == stat.st_ino and saved <= stat.st_size:
+                offset = saved
+                print(f"📍 Resuming at byte {offset}")
+            else:
+                print("🔄 File rotated or truncated while stopped, starting from the beginning")
+            self.commit((stat.st_ino, offset))  # nothing before this point is owed to anyone
+
+        if self.file:
+            self.file.close()
+        f.seek(offset)
+        self.file, self.inode, self.offset, self.pending = f, stat.st_ino, offset, b""
+        return True
+
+    def _drain(self, max_bytes=None):
+        """
+        Hand over every complete line appended since the last read.
+
+        With max_bytes, stop after roughly that much and return True so the
+        caller can come back for the rest (keeps a big backlog from being
+        read into memory at once).
+        """
+        read = 0
+        more = False
+        while True:
+            if max_bytes is not None and read >= max_bytes:
+                more = True
+                break
+            chunk = self.file.read(READ_CHUNK)
+            if not chunk:
+                break
+            read += len(chunk)
+            lines = (self.pending + chunk).split(b"\n")
+            self.pending = lines.pop()
+            for line in lines:
+                self.offset += len(line) + 1
+                if line.strip():
+                    self.on_line(line, (self.inode, self.offset))
+        if read:
+            with self.lock:
+                self._save_checkpoint()
+        return more
+
+    def _check_rotation(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return  # mid-rotation; the create event will wake us again
+        if stat.st_ino != self.inode:
+            self._drain()  # finish the rotated file through the handle we still hold
+            print("🔄 eve.json rotated, following the new file")
+            self._open()
+        elif stat.st_size < self.offset + len(self.pending):
+            print("✂️ eve.json truncated, reading from the start")
+            self._open()
+
+    # 🔹 Main loop
+    def schedule(self, observer, on_change):
+        """Register this file with a (possibly shared) watchdog observer."""
+        observer.schedule(_WakeOnChange(self.path, on_change), os.path.dirname(self.path), recursive=False)
+
+    def step(self, max_bytes=None):
+        """
+        Read whatever is new, following rotation and truncation.
+
+        Returns True if max_bytes was hit and more data is already waiting.
+        """
+        resume, self.started = not self.started, True
+        if self.file is None and not self._open(resume=resume):
+            return False
+        if self._drain(max_bytes):
+            return True
+        self._check_rotation()
+        return self._drain(max_bytes)
+
+    def run(self):
+        observer = Observer()
+        self.schedule(observer, self.wake.set)
+        observer.start()
+        try:
+            while not self.stop_event.is_set():
+                self.wake.clear()  # changes from here on wake the wait below
+                self.step()
+                self.wake.wait(SAFETY_WAKE)
+        finally:
+            observer.stop()
+            observer.join()
+            if self.file:
+                self.file.close()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
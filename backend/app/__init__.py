@@ -8,7 +8,7 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
 from dotenv import load_dotenv
-from sqlalchemy import inspect, text
+from sqlalchemy import text
 from sqlalchemy.exc import ProgrammingError
 from app.routes.alerts import alerts_bp
 from flask_socketio import SocketIO
@@ -30,7 +30,14 @@ def create_app():
     # Initialize extensions (required before using db.get_engine)
     db.init_app(app)
     jwt.init_app(app)
-    socketio.init_app(app)
+    socketio_options = {}
+    if app.config.get("SOCKETIO_MESSAGE_QUEUE"):
+        # 🔹 Several workers share one alert stream through the message queue
+        from app.utils.message_queue import make_client_manager
+        socketio_options["client_manager"] = make_client_manager(
+            app.config["SOCKETIO_MESSAGE_QUEUE"], channel=app.config["SOCKETIO_CHANNEL"]
+        )
+    socketio.init_app(app, **socketio_options)
     
     socketio.on_namespace(AlertsNamespace("/api/alerts/stream"))
 
@@ -85,13 +92,11 @@ def create_app():
                 raise
 
         # Step 2: Create tables if they don't exist
+        # create_all only adds missing tables, so existing installs pick up new ones too
         try:
-            inspector = inspect(db.get_engine())
-            if not inspector.get_table_names():
-                db.create_all()
-                print("Tables created successfully!")
-            else:
-                print("Tables already exist — skipping creation.")
+            from app import models  # registers every model with db before create_all
+            db.create_all()
+            print("Tables created successfully!")
         except Exception as table_error:
             print(f"Error during table creation: {str(table_error)}")
             raise
@@ -1,23 +1,108 @@
 #backend/app/geo.py
 import geoip2.database
+import geoip2.errors
+import ipaddress
+import maxminddb
 import os
+import socket
+from bisect import bisect_right
+from config import Config
+from app.utils.geo_cache import GeoCache, MISSING
 
 # Load the MaxMind GeoLite2 database
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, 'GeoLite2-City.mmdb')
 
-reader = geoip2.database.Reader(DB_PATH)
+try:
+    import maxminddb.extension  # C reader; same memory map, much faster decoding
+    READER_MODE = maxminddb.MODE_MMAP_EXT
+except ImportError:
+    READER_MODE = maxminddb.MODE_MMAP
 
-def get_geo(ip):
+reader = geoip2.database.Reader(DB_PATH, mode=READER_MODE)
+
+# 🔹 Shared by every caller, so repeat talkers never reach the mmdb
+geo_cache = GeoCache(Config.GEO_CACHE_SIZE, Config.GEO_CACHE_TTL, Config.GEO_NEGATIVE_TTL)
+
+
+# 🔹 IPv4 space that never geolocates: private, shared, loopback, link-local,
+# documentation, benchmarking, multicast and reserved. Sorted, non-overlapping.
+_V4_NON_ROUTABLE = [
+    ("0.0.0.0", 8), ("10.0.0.0", 8), ("100.64.0.0", 10), ("127.0.0.0", 8),
+    ("169.254.0.0", 16), ("172.16.0.0", 12), ("192.0.0.0", 24), ("192.0.2.0", 24),
+    ("192.168.0.0", 16), ("198.18.0.0", 15), ("198.51.100.0", 24), ("203.0.113.0", 24),
+    ("224.0.0.0", 3),  # 224/4 multicast and 240/4 reserved, broadcast included
+]
+_V4_STARTS = []
+_V4_ENDS = []
+for _net, _prefix in _V4_NON_ROUTABLE:
+    _start = int.from_bytes(socket.inet_aton(_net), "big")
+    _V4_STARTS.append(_start)
+    _V4_ENDS.append(_start + (1 << (32 - _prefix)) - 1)
+
+
+def is_routable(ip):
+    """False for addresses with no location; IPv4 is a bisect over integer ranges."""
     try:
-        response = reader.city(ip)
-        print(f"Geo lookup for {ip}: lat={response.location.latitude}, lon={response.location.longitude}")
-        return {
-            'lat': response.location.latitude,
-            'lon': response.location.longitude,
-            'city': response.city.name,
-            'country': response.country.name
-        }
-    except Exception as e:
-        print(f"Geo lookup failed for {ip}: {e}")
-        return None
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except (OSError, TypeError):
+        try:
+            addr = ipaddress.IPv6Address(ip)
+        except ValueError:
+            return False
+        return addr.is_global and not addr.is_multicast
+    i = bisect_right(_V4_STARTS, value) - 1
+    return i < 0 or value > _V4_ENDS[i]
+
+
+def get_geo(ip):
+    cached = geo_cache.get(ip)
+    if cached is not MISSING:
+        return cached
+
+    if not is_routable(ip):
+        geo = None  # private, reserved or malformed: nothing to look up
+    else:
+        try:
+            response = reader.city(ip)
+            geo = {
+                'lat': response.location.latitude,
+                'lon': response.location.longitude,
+                'city': response.city.name,
+                'country': response.country.name
+            }
+        except geoip2.errors.AddressNotFoundError:
+            geo = None
+        except Exception as e:
+            print(f"⚠️ Geo lookup failed for {ip}: {e}")
+            return None  # not cached; may be transient
+
+    geo_cache.put(ip, geo)
+    return geo
+
+
+def get_geo_many(ips):
+    """Locations for a batch of IPs, deduplicated; unknown addresses map to None."""
+    return {ip: get_geo(ip) for ip in dict.fromkeys(ip for ip in ips if isinstance(ip, str))}
+
+
+def enrich_geo(alert):
+    """
+    Attach src_/dest_ lat, lon and country to a normalized alert, in place.
+
+    Only located addresses get fields; geo_enriched marks the alert as
+    looked up so clients don't ask /api/geo about the rest.
+    """
+    for side in ("src", "dest"):
+        ip = alert.get(f"{side}_ip")
+        geo = get_geo(ip) if isinstance(ip, str) else None
+        if geo and geo["lat"] is not None and geo["lon"] is not None:
+            alert[f"{side}_lat"] = geo["lat"]
+            alert[f"{side}_lon"] = geo["lon"]
+            alert[f"{side}_country"] = geo["country"]
+    alert["geo_enriched"] = True
+    return alert
+
+
+def geo_stats():
+    return geo_cache.stats()
@@ -2,4 +2,7 @@
 from .user import User
 from .app_user import AppUser
 from .admin import Admin
-from .filter import Filter 
\ No newline at end of file
+from .filter import Filter
+from .alert import Alert
+from .threat_intel import ThreatIntelCache
+from .live_sequence import LiveSequence
\ No newline at end of file
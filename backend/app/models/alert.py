@@ -0,0 +1,56 @@
+# backend/app/models/alert.py
+from app import db
+from datetime import datetime
+from sqlalchemy.dialects import mysql
+
+
+class Alert(db.Model):
+    __tablename__ = "alerts"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    timestamp = db.Column(db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"), nullable=True)
+    src_ip = db.Column(db.String(45), nullable=True)  # 45 chars fits IPv6
+    src_port = db.Column(db.Integer, nullable=True)
+    dest_ip = db.Column(db.String(45), nullable=True)
+    dest_port = db.Column(db.Integer, nullable=True)
+    protocol = db.Column(db.String(16), nullable=True)
+    signature = db.Column(db.String(255), nullable=True)
+    signature_id = db.Column(db.Integer, nullable=True)
+    gid = db.Column(db.Integer, nullable=True)
+    severity = db.Column(db.SmallInteger, nullable=True)
+    action = db.Column(db.String(32), nullable=True)
+    source = db.Column(db.String(10), nullable=False, default="upload")  # upload / live
+    upload_id = db.Column(db.String(64), nullable=True)  # raw event lives in the stored upload
+    event_index = db.Column(db.Integer, nullable=True)
+    sensor_id = db.Column(db.String(64), nullable=True)  # live alerts: which agent sensor saw it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_alerts_timestamp", "timestamp"),
+        db.Index("ix_alerts_src_ip", "src_ip"),
+        db.Index("ix_alerts_dest_ip", "dest_ip"),
+        db.Index("ix_alerts_signature_id", "signature_id"),
+        db.Index("ix_alerts_severity", "severity"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "src_ip": self.src_ip,
+            "src_port": self.src_port,
+            "dest_ip": self.dest_ip,
+            "dest_port": self.dest_port,
+            "protocol": self.protocol,
+            "signature": self.signature,
+            "signature_id": self.signature_id,
+            "gid": self.gid,
+            "severity": self.severity,
+            "action": self.action,
+            "upload_id": self.upload_id,
+            "event_index": self.event_index,
+            "sensor_id": self.sensor_id,
+        }
+
+    def __repr__(self):
+        return f"<Alert {self.id} {self.signature_id}>"
@@ -0,0 +1,10 @@
+# backend/app/models/live_sequence.py
+from app import db
+
+
+class LiveSequence(db.Model):
+    """Next live alert seq id, shared by every worker on the same message queue."""
+    __tablename__ = "live_sequence"
+
+    name = db.Column(db.String(32), primary_key=True)
+    next_seq = db.Column(db.BigInteger, nullable=False)
@@ -0,0 +1,20 @@
+# backend/app/models/threat_intel.py
+from app import db
+from datetime import datetime
+
+
+class ThreatIntelCache(db.Model):
+    """Last response from a threat-intel provider for an IP, reused until expires_at."""
+    __tablename__ = "threat_intel_cache"
+
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(16), nullable=False)  # abuse / vt
+    ip = db.Column(db.String(45), nullable=False)  # 45 chars fits IPv6
+    response = db.Column(db.JSON, nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("provider", "ip", name="uq_threat_intel_provider_ip"),
+        db.Index("ix_threat_intel_expires_at", "expires_at"),
+    )
@@ -1,142 +1,116 @@
-from flask import Blueprint, request, jsonify, current_app
-import os, json
-from werkzeug.utils import secure_filename
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+import os, json, re, tempfile, uuid
+from app.utils.stream_parser import iter_events
+from app.utils.normalize import AlertNormalizer
+from app.utils.parallel_ingest import parallel_ingest
+from app.utils.alert_store import BulkAlertWriter, last_alert_id, reassign_upload, store_alerts
+from app.utils.alert_query import query_alerts
+from app.utils.alert_summary import alert_summary
+from app.utils.live_window import live_window
+from app.routes.socketIO import publish_counts
+from app.utils.upload_cache import get_upload_cache, hash_stream, HashingReader, replay_json, replay_ndjson
+from app.utils.raw_events import BLOCK_EXT, BlockWriter, RawIndexWriter, read_raw_event
+from app.utils.compression import EXTENSIONS, open_decompressed, open_stored, sniff_file
 
 alerts_bp = Blueprint("alerts", __name__)
 UPLOAD_FOLDER = "uploads"
+STREAM_FLUSH_BYTES = 64 * 1024  # size of each chunk written back to the client
+CACHE_HIT_HEADERS = {"X-Upload-Cache": "hit"}
+SHA256_RE = re.compile(r"[0-9a-f]{64}")
+UPLOAD_ID_RE = re.compile(r"[0-9a-f]{32}|[0-9a-f]{64}")
 
-from datetime import datetime, timezone
 
-def normalize_alert(alert: dict) -> dict:
-    alert_obj = alert.get("alert") or alert.get("Event", {}).get("alert") or alert.get("Event") or {}
+def _upload_cache():
+    directory = os.path.join(current_app.root_path, UPLOAD_FOLDER, "cache")
+    content_directory = os.path.join(current_app.root_path, UPLOAD_FOLDER, "content")
+    return get_upload_cache(directory, current_app.config["UPLOAD_CACHE_MAX_BYTES"], content_directory)
 
-    # Source IP
-    src_ip = (
-        alert.get("src_ip")
-        or alert.get("src_addr")
-        or alert.get("src_host")
-        or alert_obj.get("ip_source")
-        or alert_obj.get("ip_source")
-        or alert.get("Event", {}).get("ip_source")
-        or (alert.get("src_ap").split(":")[0] if alert.get("src_ap") and ":" in alert.get("src_ap") else None)
-    )
 
-    # Destination IP
-    dest_ip = (
-        alert.get("dest_ip")
-        or alert.get("dst_ip")
-        or alert.get("dst_addr")
-        or alert.get("dst_host")
-        or alert_obj.get("ip_destination")
-        or alert_obj.get("ip_dest")
-        or alert.get("Event", {}).get("ip_dest")
-        or (alert.get("dst_ap").split(":")[0] if alert.get("dst_ap") and ":" in alert.get("dst_ap") else None)
-    )
+def _cache_key(digest):
+    """Cached results differ with GEO_ENRICH, so enriched ones get their own entry."""
+    if digest and current_app.config["GEO_ENRICH"]:
+        return f"{digest}.geo"
+    return digest
 
-    # Severity / priority
-    severity = (
-        alert_obj.get("severity")
-        or alert_obj.get("priority")
-        or alert.get("severity")
-        or alert.get("priority")
-        or alert.get("Event", {}).get("priority_id")
-    )
 
-    # Protocol
-    protocol = (
-        alert.get("proto")
-        or alert.get("protocol")
-        or alert_obj.get("protocol")
-        or alert_obj.get("ip_proto")
-        or alert.get("Event", {}).get("ip_proto")
-    )
+def _content_path(digest, ext):
+    """Stored uploads and their raw-event indexes, named by content hash."""
+    return os.path.join(current_app.root_path, UPLOAD_FOLDER, "content", f"{digest}{ext}")
 
-    # Signature / message
-    signature = (
-        alert_obj.get("signature")
-        or alert.get("signature")
-        or alert.get("msg")
-        or alert.get("rule")
-        or alert.get("class")
-    )
 
-    # Signature ID
-    sig_id = (
-        alert_obj.get("signature_id")
-        or alert.get("sid")
-        or alert_obj.get("sig_id")
-        or alert.get("Event", {}).get("signature_id")
-    )
-    if isinstance(sig_id, int):
-        sig_id = f"signature ID:{sig_id}"
-
-    # Generator ID / GID
-    gid = (
-        alert_obj.get("gid")
-        or alert.get("gid")
-        or alert.get("Event", {}).get("generator_id")
-    )
+def _save_content(file, path):
+    """
+    Store an uploaded file at `path` unless it is already there.
 
-    # Packet number / event ID
-    pkt_num = alert.get("pkt_num") or alert.get("Event", {}).get("event_id") or alert.get("event_id")
+    The file is written under a temp name and renamed into place, so a
+    concurrent upload of the same content never sees it half-written.
+    """
+    if os.path.exists(path):
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        file.save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _find_content(upload_id):
+    """Stored upload for an id: plain, or compressed (in blocks since restart points were indexed)."""
+    for ext in ("",) + EXTENSIONS:
+        path = _content_path(upload_id, ".json" + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _open_upload(file, upload_id):
+    """
+    (reader, content path, BlockWriter or None) for a multipart upload.
+
+    Plain uploads are stored as sent and parsed from disk. Compressed ones
+    are decompressed straight from the request and written back as blocked
+    gzip on the way through the parser; the caller commits the BlockWriter
+    (and its restart points, with the index) once parsing succeeded.
+    """
+    if sniff_file(file.stream):
+        blocks = BlockWriter(os.path.dirname(_content_path(upload_id, "")))
+        reader, _ = open_decompressed(file.stream)
+        return blocks.tee(reader), _content_path(upload_id, ".json" + BLOCK_EXT), blocks
+    path = _content_path(upload_id, ".json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _save_content(file, path)
+    return open_stored(path), path, None
+
+
+def _with_raw_ref(alert, upload_id, event_index):
+    """List payloads carry a reference to the raw event instead of a copy of it."""
+    alert["upload_id"] = upload_id
+    alert["event_index"] = event_index
+    return alert
+
+
+def _geo_stage():
+    """enrich_geo when GEO_ENRICH is on, otherwise a pass-through."""
+    if current_app.config["GEO_ENRICH"]:
+        from app.geo import enrich_geo  # lazy: opens the mmdb only when enrichment is on
+        return enrich_geo
+    return lambda alert: alert
+
+
+def _cache_alerts(cache, digest, alerts):
+    writer = cache.writer()
+    try:
+        for alert in alerts:
+            writer.write(json.dumps(alert) + "\n")
+        writer.commit(_cache_key(digest))
+    except Exception as e:
+        writer.discard()
+        print(f"⚠️ Error caching upload {digest[:12]}: {e}")
 
-    # Action
-    action = alert.get("action") or alert_obj.get("packet_action") or alert.get("Event", {}).get("packet_action")
 
-    # Timestamp
-    ts = (
-        alert.get("timestamp")
-        or alert.get("time")
-        or alert_obj.get("timestamp")
-        or alert.get("Event", {}).get("event_second")
-    )
-    micro = alert.get("Event", {}).get("event_microsecond", 0)
-    if isinstance(ts, int):
-        from datetime import datetime, timezone
-        ts = datetime.fromtimestamp(ts + micro / 1_000_000, tz=timezone.utc).isoformat()
-    # Source port
-    src_port = (
-        alert.get("src_port")
-        or alert_obj.get("src_port")
-        or alert.get("Event", {}).get("src_port")
-    )
-    # If Unified2 style "ip:port" exists in src_ap
-    if not src_port and alert.get("src_ap") and ":" in alert.get("src_ap"):
-        try:
-            src_port = int(alert.get("src_ap").split(":")[1])
-        except ValueError:
-            src_port = None
-
-    # Destination port
-    dest_port = (
-        alert.get("dest_port")
-        or alert_obj.get("dest_port")
-        or alert.get("Event", {}).get("dest_port")
-    )
-    # If Unified2 style "ip:port" exists in dst_ap
-    if not dest_port and alert.get("dst_ap") and ":" in alert.get("dst_ap"):
-        try:
-            dest_port = int(alert.get("dst_ap").split(":")[1])
-        except ValueError:
-            dest_port = None
-
-    return {
-        "timestamp": ts,
-        "src_ip": src_ip,
-        "dest_ip": dest_ip,
-        "signature": signature,
-        "severity": severity,
-        "protocol": protocol,
-        "signature_id": sig_id,
-        "gid": gid,
-        "pkt_num": pkt_num,
-        "action": action,
-        "original": alert,
-        "src_port": src_port,
-        "dest_port": dest_port,
-    }
-
-    
 @alerts_bp.route("/upload-alerts", methods=["POST"])
 def upload_alerts():
     if "file" not in request.files:
@@ -146,39 +120,291 @@ def upload_alerts():
     if file.filename == "":
         return jsonify({"error": "No selected file"}), 400
 
-    filename = secure_filename(file.filename)
-    save_path = os.path.join(current_app.root_path, UPLOAD_FOLDER, filename)
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    file.save(save_path)
+    # Uploads are content-addressed: a file we have seen before is served from cache
+    digest = hash_stream(file.stream)
+    cache = _upload_cache()
+    cached = cache.get(_cache_key(digest))
+    if cached:
+        print(f"♻️ Upload cache hit for {digest[:12]}")
+        return Response(stream_with_context(replay_json(cached)), mimetype="application/json", headers=CACHE_HIT_HEADERS)
+
+    source, save_path, blocks = _open_upload(file, digest)
 
     alerts = []
+    normalize = AlertNormalizer()
+    enrich = _geo_stage()
+    index = RawIndexWriter(os.path.dirname(save_path))
+    workers = current_app.config["INGEST_WORKERS"]
+    parallel = (
+        workers > 1
+        and blocks is None
+        and os.path.getsize(save_path) >= current_app.config["PARALLEL_INGEST_MIN_BYTES"]
+    )
 
     try:
-        with open(save_path, "r") as f:
-            first_char = f.read(1)
-            f.seek(0)
+        with source as f:
+            if parallel:
+                is_array = f.read(4096).lstrip().startswith(b"[")
+                f.seek(0)
 
-            if first_char == "[":
-                data = json.load(f)
-                for alert in data:
+            if parallel and not is_array:
+                # Large NDJSON: fan out across worker processes, without blocking the hub
+                for alert, offset, length in parallel_ingest(save_path, workers):
+                    alerts.append(_with_raw_ref(enrich(alert), digest, index.add(offset, length)))
+            else:
+                for event, offset, length in iter_events(f, with_offsets=True):
                     # Skip stats-only events
-                    if alert.get("event_type") == "stats":
+                    if event.get("event_type") == "stats":
                         continue
-                    alerts.append(normalize_alert(alert))
+                    alerts.append(_with_raw_ref(enrich(normalize(event)), digest, index.add(offset, length)))
+            if blocks:
+                f.drain()
+                blocks.commit(save_path)
+        index.commit(_content_path(digest, ".idx"), blocks and blocks.restart_points)
+
+    except Exception as e:
+        index.discard()
+        if blocks:
+            blocks.discard()
+        return jsonify({"error": f"Failed to parse file: {str(e)}"}), 400
+
+    publish_counts(alerts)  # every worker's /summary and geo bins, not just this one's
+
+    try:
+        stored = store_alerts(alerts, source="upload")
+        print(f"💾 Stored {stored} uploaded alerts")
+    except Exception as e:
+        print(f"⚠️ Error storing uploaded alerts: {e}")
+
+    _cache_alerts(cache, digest, alerts)
+
+    return jsonify({"alerts": alerts}), 200
+
+
+@alerts_bp.route("/upload-alerts/stream", methods=["POST"])
+def upload_alerts_stream():
+    """
+    Streaming variant of /upload-alerts.
+
+    Accepts either a multipart "file" field or the raw export as the request
+    body, parses it incrementally and answers with chunked NDJSON (one
+    normalized alert per line). Alerts are persisted in batches as they are
+    parsed, so nothing is accumulated server-side.
+
+    Results are cached by content hash. Multipart uploads are hashed up
+    front; raw bodies can name their hash in an X-Content-SHA256 header so a
+    known file is replayed from cache, otherwise it is hashed while parsing.
+    The upload itself is kept so individual raw events can be served by
+    /raw: plain raw bodies are spooled to disk as they are read, compressed
+    ones are stored as independently compressed blocks (see BlockWriter).
+
+    Stored uploads are named by their hash, so sending the same body twice
+    stores it once. A raw body whose hash was not given (or was wrong) is
+    moved under its real hash once read; its stored rows and cache entry
+    follow, and the stream ends with a {"upload_id": ..., "replaces": ...}
+    line mapping the provisional upload_id of the alerts already sent.
+    """
+    cache = _upload_cache()
+    if request.mimetype == "multipart/form-data":
+        if "file" not in request.files:
+            return jsonify({"error": "No file part"}), 400
+        file = request.files["file"]
+        if file.filename == "":
+            return jsonify({"error": "No selected file"}), 400
+        digest = hash_stream(file.stream)
+        upload_id = digest
+    else:
+        digest = request.headers.get("X-Content-SHA256", "").lower()
+        if not SHA256_RE.fullmatch(digest):
+            digest = None
+        # The hash is only known once the body has been read: until then the
+        # claimed one (or a random id) stands in for it
+        upload_id = digest or uuid.uuid4().hex
+
+    cached = cache.get(_cache_key(digest))
+    if cached:
+        print(f"♻️ Upload cache hit for {digest[:12]}")
+        return Response(stream_with_context(replay_ndjson(cached)), mimetype="application/x-ndjson", headers=CACHE_HIT_HEADERS)
+
+    content_dir = cache.content_directory
+    os.makedirs(content_dir, exist_ok=True)
+    upload_copy = None
+    if request.mimetype == "multipart/form-data":
+        spool = hasher = None
+        if sniff_file(file.stream):
+            # Form files are closed once this view returns, so the parser reads a (still compressed) temp copy
+            upload_copy = tempfile.TemporaryFile(dir=content_dir)
+            file.save(upload_copy)
+            upload_copy.seek(0)
+            blocks = BlockWriter(content_dir)
+            source = blocks.tee(open_decompressed(upload_copy)[0])
+        else:
+            source, _, blocks = _open_upload(file, upload_id)  # plain: stored as sent, parsed from disk
+    else:
+        # Never trust the header for writes; the entry is keyed by what we actually read.
+        # A plain body is spooled exactly as received; a compressed one is kept in blocks.
+        spool = tempfile.NamedTemporaryFile(dir=content_dir, suffix=".tmp", delete=False)
+        hasher = HashingReader(request.stream, sink=spool)
+        source, ext = open_decompressed(hasher)
+        blocks = None
+        if ext:
+            hasher.sink = None
+            spool.close()
+            os.remove(spool.name)
+            spool = None
+            blocks = BlockWriter(content_dir)
+            source = blocks.tee(source)
+        after_id = last_alert_id()  # rows of this upload can only come after it
+
+    enrich = _geo_stage()
+
+    def generate():
+        normalize = AlertNormalizer()
+        writer = BulkAlertWriter(source="upload")
+        cache_writer = cache.writer()
+        index = RawIndexWriter(content_dir)
+        committed = False
+        counted = []
+        out = []
+        size = 0
+        try:
+            for event, offset, length in iter_events(source, with_offsets=True):
+                # Skip stats-only events
+                if event.get("event_type") == "stats":
+                    continue
+                normalized = _with_raw_ref(enrich(normalize(event)), upload_id, index.add(offset, length))
+                writer.add(normalized)
+                counted.append(normalized)
+                line = json.dumps(normalized) + "\n"
+                cache_writer.write(line)
+                out.append(line)
+                size += len(line)
+                if size >= STREAM_FLUSH_BYTES:
+                    publish_counts(counted)  # one summary/geo delta per chunk
+                    counted = []
+                    yield "".join(out)
+                    out = []
+                    size = 0
+            publish_counts(counted)
+            writer.flush()
+            rewrite = None
+            if blocks:
+                source.drain()  # the rest of the upload goes into the blocks too
+            if hasher:
+                stored_id = hasher.hexdigest()  # drains the rest of the body into the spool
+                if not blocks:
+                    spool.close()
+                    content_path = _content_path(stored_id, ".json")
+                    if os.path.exists(content_path):
+                        os.remove(spool.name)  # same body stored before
+                    else:
+                        os.replace(spool.name, content_path)
+                if stored_id != upload_id:
+                    reassign_upload(upload_id, stored_id, after_id)
+                    old_ref = json.dumps({"upload_id": upload_id})[1:-1]
+                    new_ref = json.dumps({"upload_id": stored_id})[1:-1]
+                    rewrite = lambda line: line.replace(old_ref, new_ref)
+                    out.append(json.dumps({"upload_id": stored_id, "replaces": upload_id}) + "\n")
             else:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
+                stored_id = digest
+            if blocks:
+                blocks.commit(_content_path(stored_id, ".json" + BLOCK_EXT))
+            index.commit(_content_path(stored_id, ".idx"), blocks and blocks.restart_points)
+            cache_writer.commit(_cache_key(stored_id), rewrite)
+            committed = True
+        except Exception as e:
+            out.append(json.dumps({"error": f"Failed to parse file: {str(e)}"}) + "\n")
+        finally:
+            # Also reached when the client disconnects mid-stream
+            if not committed:
+                if writer.rows:
+                    # A parse error mid-file still persists the alerts already parsed and sent
                     try:
-                        alert = json.loads(line)
-                        if alert.get("event_type") == "stats":
-                            continue
-                        alerts.append(normalize_alert(alert))
-                    except json.JSONDecodeError:
-                        continue
+                        writer.flush()
+                    except Exception as store_error:
+                        writer.db.session.rollback()
+                        print(f"⚠️ Error storing streamed alerts: {store_error}")
+                cache_writer.discard()
+                index.discard()
+                if blocks:
+                    blocks.discard()
+                if spool:
+                    spool.close()
+                    if os.path.exists(spool.name):
+                        os.remove(spool.name)
+            if not hasher:
+                source.close()  # the stored upload we opened; the request stream is Flask's
+            if upload_copy:
+                upload_copy.close()
+        if out:
+            yield "".join(out)
 
-        return jsonify({"alerts": alerts}), 200
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
-    except Exception as e:
-        return jsonify({"error": f"Failed to parse file: {str(e)}"}), 400
+
+@alerts_bp.route("/raw/<upload_id>/<int:n>", methods=["GET"])
+def raw_event(upload_id, n):
+    """Serve the n-th raw event of an upload, read on demand from the stored file."""
+    if not UPLOAD_ID_RE.fullmatch(upload_id):
+        return jsonify({"error": "Invalid upload id"}), 400
+    try:
+        content_path = _find_content(upload_id)
+        if content_path is None:
+            raise FileNotFoundError(upload_id)
+        raw = read_raw_event(content_path, _content_path(upload_id, ".idx"), n)
+    except FileNotFoundError:
+        return jsonify({"error": "Upload not found"}), 404  # never stored, or evicted with its cache entry
+    except IndexError:
+        return jsonify({"error": "Event not found"}), 404
+
+    _upload_cache().touch(f"{upload_id}.idx")
+
+    return Response(raw, mimetype="application/json")
+
+
+@alerts_bp.route("/query", methods=["POST"])
+def query_stored_alerts():
+    """
+    Server-side filtering over stored alerts.
+
+    Body: {"filters": {...same shape as alertPage.tsx...}, "cursor": "...",
+    "limit": 100, "order": "desc"}. Pass back "next_cursor" to get the next page.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        page = query_alerts(
+            filters=data.get("filters"),
+            cursor=data.get("cursor"),
+            limit=data.get("limit"),
+            order=data.get("order", "desc"),
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid query: {str(e)}"}), 400
+
+    return jsonify(page), 200
+
+
+@alerts_bp.route("/summary", methods=["GET"])
+def alerts_summary():
+    """Dashboard counters maintained at ingest time; cost does not grow with alert count."""
+    top_n = request.args.get("top", default=5, type=int)
+    return jsonify(alert_summary.snapshot(top_n=max(1, min(top_n, 100)))), 200
+
+
+@alerts_bp.route("/live", methods=["POST"])
+def query_live_window():
+    """
+    Filter and aggregate the in-memory window of recent live alerts.
+
+    Body: {"filters": {...}, "limit": 100, "top": 5}. Returns the newest
+    matching alerts and a summary computed over every match in the window.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        limit = max(1, min(int(data.get("limit") or 100), 1000))
+        top_n = max(1, min(int(data.get("top") or 5), 100))
+        result = live_window.query(filters=data.get("filters"), limit=limit, top_n=top_n)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid query: {str(e)}"}), 400
+
+    return jsonify(result), 200
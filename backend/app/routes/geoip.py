@@ -1,20 +1,59 @@
 # filepath: backend/app/routes/geoip.py
 from flask import Blueprint, request, jsonify
-from app.geo import get_geo  # You must have a lookup_ip(ip) function
+from app.geo import get_geo_many, geo_stats
+from app.utils.geo_bins import geo_bins, stored_geo_bins
 
 geo_bp = Blueprint('geoip', __name__)
 
 @geo_bp.route('/api/geo', methods=['POST'])
 def geo_lookup():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     ips = data.get('ips', [])
-    results = []
-    for ip in ips:
-        loc = get_geo(ip)
-        if loc:
-            results.append({
-                "ip": ip,
-                "lat": loc.get("lat"),
-                "lon": loc.get("lon")
-            })
-    return jsonify(results)
\ No newline at end of file
+    if not isinstance(ips, list):
+        return jsonify({"error": "ips must be a list"}), 400
+    # Keyed by IP, [lat, lon] per located address; private and unknown IPs are left out
+    results = {}
+    for ip, loc in get_geo_many(ips).items():
+        if loc and loc.get("lat") is not None and loc.get("lon") is not None:
+            results[ip] = [loc["lat"], loc["lon"]]
+    return jsonify(results)
+
+
+@geo_bp.route('/api/geo/stats', methods=['GET'])
+def geo_cache_stats():
+    return jsonify(geo_stats())
+
+
+@geo_bp.route('/api/geo/bins', methods=['GET'])
+def geo_bins_view():
+    """
+    Alert counts aggregated for the map.
+
+    Query: level=country|city|grid (default grid), zoom=<map zoom> for the
+    grid, bbox=south,west,north,east, limit=<max bins>, source=live|stored.
+    "live" covers alerts ingested since the server started (uploads and the
+    live stream); "stored" covers the whole alerts table.
+    """
+    source = request.args.get('source', 'live')
+    if source not in ('live', 'stored'):
+        return jsonify({"error": "source must be live or stored"}), 400
+    try:
+        bbox = request.args.get('bbox')
+        if bbox:
+            bbox = [float(v) for v in bbox.split(',')]
+            if len(bbox) != 4:
+                raise ValueError("bbox needs south,west,north,east")
+        limit = request.args.get('limit', type=int)
+        bins = geo_bins
+        if source == 'stored':
+            stored_geo_bins.refresh()
+            bins = stored_geo_bins
+        result = bins.snapshot(
+            level=request.args.get('level', 'grid'),
+            zoom=request.args.get('zoom', 0, type=int),
+            bbox=bbox,
+            limit=max(1, min(limit, 10000)) if limit else None,
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid query: {str(e)}"}), 400
+    return jsonify(result)
\ No newline at end of file
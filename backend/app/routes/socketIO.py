@@ -1,151 +1,293 @@
-import eventlet
-from flask_socketio import emit, Namespace
+from flask import request
+from flask_socketio import emit, join_room, leave_room, Namespace
+from app.utils.normalize import AlertNormalizer, dns_to_display
+from app.utils.alert_summary import alert_summary, summary_counts
+from app.utils.geo_bins import geo_bins, ip_counts, SRC, DEST
+from app.utils.live_window import live_window
+from app.utils.alert_filter import canonical_filter, filter_rooms
+from app.utils.alert_buffer import AlertRingBuffer
+from app.utils.alert_history import AlertHistory, SharedSequence
+from app.utils.message_queue import FANOUT_EVENT, FanoutMixin
+from app.utils.wire_format import encode_batch, negotiate
+from config import Config
 
-alert_buffer = []
-BUFFER_INTERVAL = 1.0  # seconds between flushes
+alert_buffer = AlertRingBuffer(
+    capacity=Config.LIVE_BUFFER_CAPACITY,
+    policy=Config.LIVE_BUFFER_POLICY,
+    flush_size=Config.LIVE_FLUSH_MAX_BATCH,
+)
+alert_history = AlertHistory(Config.LIVE_REPLAY_SIZE)  # seq ids + backlog for reconnecting clients
+shared_sequence = SharedSequence()  # seq ids when several workers share a message queue
+normalize_alert = AlertNormalizer()  # live streams: schema detected once per sensor/connection
 
 
 class AlertsNamespace(Namespace):
-    def on_connect(self):
+    def on_connect(self, auth=None):
         print("✅ Pro user connected to real-time alerts")
-        emit("alert", {"message": "Connected to real-time alerts"})
+        auth = auth if isinstance(auth, dict) else {}
+        # Wire format is negotiated once here: "json" (default), "columnar" or "msgpack"
+        fmt = negotiate(auth.get("format"))
+        filter_rooms.set_format(request.sid, fmt)
+        join_room(filter_rooms.join(request.sid, None))  # unfiltered until the client subscribes
+        emit("alert", {"message": "Connected to real-time alerts", "last_seq": alert_history.last_seq, "format": fmt})
+        if auth.get("since") is not None:
+            _replay(auth["since"])
 
     def on_disconnect(self):
+        filter_rooms.forget(request.sid)
+        normalize_alert.forget(request.sid)
         print("❌ Pro user disconnected")
 
+    def on_subscribe(self, data):
+        """
+        Only receive alerts matching a filter.
+
+        Body: {"filter_id": n, "token": "<jwt>"} for a saved filter, or
+        {"filters": {...}} with the same shape as Filter.filters_json. Clients
+        with the same effective filter share a room; an empty filter puts the
+        client back on the unfiltered stream. Add "since": <seq> to also get
+        the matching alerts emitted after that seq.
+        """
+        data = data or {}
+        filters = data.get("filters")
+        if data.get("filter_id") is not None:
+            filters, error = _load_saved_filter(data.get("filter_id"), data.get("token"))
+            if error:
+                return {"error": error}
+
+        try:
+            filters = canonical_filter(filters)
+        except (ValueError, TypeError) as e:
+            return {"error": f"Invalid filter: {str(e)}"}
+
+        room = _move_to_room(filters)
+        print(f"🎯 Subscriber moved to room {room}")
+        if data.get("since") is not None:
+            _replay(data["since"])
+        return {"room": room, "last_seq": alert_history.last_seq}
+
+    def on_unsubscribe(self, data=None):
+        return {"room": _move_to_room(None)}
+
+    def on_replay(self, data):
+        """Resend the alerts after {"since": <seq>} that match the client's room."""
+        since = (data or {}).get("since")
+        if since is None:
+            return {"error": "since is required"}
+        return _replay(since)
+
     def on_alert_event(self, data):
         if not data:
             print("⚠️ Received empty alert event")
             return
 
-        event_type = data.get("event_type")
+        normalized = _process_event(data)
+        if normalized is not None:
+            print(f"📥 Buffered alert: {normalized.get('signature') or data.get('event_type')}")
 
-        # Ignore flow/stats events entirely
-        if event_type in ["flow", "stats"]:
-            return
+    def on_alert_batch(self, data):
+        """Agents send {"events": [...]}: one frame and one dispatch for the whole batch."""
+        events = (data or {}).get("events") if isinstance(data, dict) else None
+        if not events:
+            print("⚠️ Received empty alert batch")
+            return 0
+
+        buffered = sum(1 for event in events if isinstance(event, dict) and _process_event(event) is not None)
+        print(f"📥 Buffered {buffered}/{len(events)} alerts from batch")
+        return buffered  # ack for agents replaying their spool
+
+
+def _process_event(data):
+    """Normalize one agent event and queue it; returns None for ignored events."""
+    event_type = data.get("event_type")
+
+    # Ignore flow/stats events entirely
+    if event_type in ["flow", "stats"]:
+        return None
+
+    # ✅ Handle DNS events nicely
+    if event_type == "dns":
+        normalized = dns_to_display(data)
+    else:
+        # Multi-sensor agents share one connection, so their sensor id names the stream
+        normalized = normalize_alert(data, stream=data.get("sensor_id") or request.sid)
+
+    # Multi-sensor agents tag every event with the sensor it came from
+    if data.get("sensor_id"):
+        normalized["sensor_id"] = data["sensor_id"]
+
+    # Optional: ship lat/lon/country with the alert so the map needs no /api/geo round-trip
+    if Config.GEO_ENRICH:
+        from app.geo import enrich_geo  # lazy: opens the mmdb only when enrichment is on
+        enrich_geo(normalized)
+
+    alert_summary.add(normalized)
+    geo_bins.add(normalized)
+    live_window.append(normalized)
+    alert_buffer.append(normalized)
+    return normalized
+
+
+def _move_to_room(filters):
+    old_room = filter_rooms.leave(request.sid)
+    room = filter_rooms.join(request.sid, filters)
+    if old_room != room:
+        if old_room:
+            leave_room(old_room)
+        join_room(room)
+    return room
+
+
+def _replay(since):
+    """Send the caller what it missed after `since`, in flush-sized batches."""
+    try:
+        since = int(since)
+    except (ValueError, TypeError):
+        return {"error": "Invalid since"}
+    alerts, missed = alert_history.since(since, filter_rooms.predicate(request.sid))
+    fmt = filter_rooms.format(request.sid)
+    size = Config.LIVE_FLUSH_MAX_BATCH
+    for i in range(0, len(alerts), size):
+        # "missed" tells the client that older alerts had already left the replay window
+        emit("bulk_alerts", encode_batch(alerts[i:i + size], fmt, replay=True, missed=missed and i == 0))
+    print(f"⏪ Replayed {len(alerts)} alerts after seq {since}")
+    return {"replayed": len(alerts), "missed": missed, "last_seq": alert_history.last_seq}
 
-        # ✅ Handle DNS events nicely
-        if event_type == "dns":
-            normalized = dns_to_display(data)
-        else:
-            normalized = normalize_alert(data)
-
-        alert_buffer.append(normalized)
-        print(f"📥 Buffered alert: {normalized.get('signature') or event_type}")
-
-
-# 🔹 DNS events: lightweight normalization for display
-def dns_to_display(dns_event):
-    rrname = (
-        dns_event.get("dns", {}).get("queries", [{}])[0].get("rrname")
-        if dns_event.get("dns")
-        else "unknown.domain"
-    )
-    return {
-        "timestamp": dns_event.get("timestamp"),
-        "src_ip": dns_event.get("src_ip"),
-        "src_port": dns_event.get("src_port"),
-        "dest_ip": dns_event.get("dest_ip"),
-        "dest_port": dns_event.get("dest_port"),
-        "protocol": dns_event.get("proto"),
-        "signature": f"DNS query for {rrname}",
-        "severity": dns_event.get("severity"),
-    }
-
-
-# 🔹 Normalize regular alerts
-def normalize_alert(alert: dict) -> dict:
-    alert_obj = alert.get("alert") or alert.get("Event", {}).get("alert") or alert.get("Event") or {}
-
-    src_ip = (
-        alert.get("src_ip")
-        or alert.get("src_addr")
-        or alert.get("src_host")
-        or alert_obj.get("ip_source")
-        or alert.get("Event", {}).get("ip_source")
-        or (alert.get("src_ap").split(":")[0] if alert.get("src_ap") and ":" in alert.get("src_ap") else None)
-    )
-
-    dest_ip = (
-        alert.get("dest_ip")
-        or alert.get("dst_ip")
-        or alert.get("dst_addr")
-        or alert.get("dst_host")
-        or alert_obj.get("ip_destination")
-        or alert.get("Event", {}).get("ip_dest")
-        or (alert.get("dst_ap").split(":")[0] if alert.get("dst_ap") and ":" in alert.get("dst_ap") else None)
-    )
-
-    # ✅ Add port detection here
-    src_port = (
-        alert.get("src_port")
-        or alert.get("sport")
-        or alert.get("Event", {}).get("sport")
-    )
-
-    dest_port = (
-        alert.get("dest_port")
-        or alert.get("dport")
-        or alert.get("Event", {}).get("dport")
-    )
-
-    signature = (
-        alert_obj.get("signature")
-        or alert.get("signature")
-        or alert.get("msg")
-        or alert.get("rule")
-        or alert.get("class")
-    )
-
-    severity = (
-        alert_obj.get("severity")
-        or alert_obj.get("priority")
-        or alert.get("severity")
-        or alert.get("priority")
-        or alert.get("Event", {}).get("priority_id")
-    )
-
-    protocol = (
-        alert.get("proto")
-        or alert.get("protocol")
-        or alert_obj.get("protocol")
-        or alert_obj.get("ip_proto")
-        or alert.get("Event", {}).get("ip_proto")
-    )
-
-    return {
-        "timestamp": alert.get("timestamp"),
-        "src_ip": src_ip,
-        "src_port": src_port,
-        "dest_ip": dest_ip,
-        "dest_port": dest_port,
-        "signature": signature,
-        "severity": severity,
-        "protocol": protocol,
-    }
-
-
-# 🔹 Background task that flushes buffer every second
-def bulk_alert_sender():
-    from app import socketio  # ✅ Lazy import fixes circular import
-    print("🚀 Bulk alert sender started (running every 1s)")
+
+def _load_saved_filter(filter_id, token):
+    """filters_json of a saved filter, if the token belongs to its owner."""
+    from flask_jwt_extended import decode_token
+    from app.models.filter import Filter
+    try:
+        identity = decode_token(token)["sub"]
+    except Exception:
+        return None, "Invalid token"
+    flt = Filter.query.filter_by(id=filter_id).first()
+    if not flt or str(flt.user_id) != str(identity):
+        return None, "Filter not found"
+    return flt.filters_json, None
+
+
+# 🔹 Delivery of a live batch to this worker's clients
+def _deliver_batch(data):
+    """
+    Number a batch, remember it for replay and emit it to the local filter rooms.
+
+    With a message queue every worker runs this for every worker's batches;
+    alerts ingested elsewhere are also added to this worker's summary, geo bins
+    and live window so /summary, /api/geo/bins and /live cover the whole stream.
+    """
+    from app import socketio
+    alerts = data["alerts"]
+    manager = socketio.server.manager
+    if data.get("origin") not in (None, getattr(manager, "host_id", None)):
+        alert_summary.add_many(alerts)
+        geo_bins.add_many(alerts)
+        live_window.extend(alerts)
+    # Before emitting, so a client joining now can replay it
+    if data.get("stamped"):
+        alert_history.record(alerts)  # seqs assigned by the publishing worker
+    else:
+        alert_history.stamp(alerts)
+
+    # Each filter is evaluated once per batch; its room only gets the matches, encoded once.
+    # ignore_queue: other workers deliver to their own clients from the fan-out message
+    for room, matching, fmt in filter_rooms.fan_out(alerts):
+        socketio.emit("bulk_alerts", encode_batch(matching, fmt), namespace="/api/alerts/stream", to=room, ignore_queue=True)
+
+
+def _deliver_fanout(data):
+    """fanout_handler: live batches, or the counts of an upload (see publish_counts)."""
+    if "counts" in data:
+        _add_counts(data["counts"])
+    else:
+        _deliver_batch(data)
+
+
+def _add_counts(counts):
+    alert_summary.add_counts(counts["summary"])
+    geo_bins.add_counts(SRC, counts["geo"][SRC])
+    geo_bins.add_counts(DEST, counts["geo"][DEST])
+
+
+def publish_counts(alerts):
+    """
+    Add ingested (uploaded) alerts to the summary and geo bins of every worker.
+
+    Uploads are parsed by whichever worker took the request. With a message
+    queue their counts, aggregated per IP and signature, go out as a fan-out
+    message that every worker (this one included) merges, so /summary and
+    /api/geo/bins agree whichever worker answers them. The alerts themselves
+    are not sent; dashboards only get live batches.
+    """
+    from app import socketio
+    manager = socketio.server.manager
+    if not isinstance(manager, FanoutMixin):
+        alert_summary.add_many(alerts)
+        geo_bins.add_many(alerts)
+        return
+    if alerts:
+        counts = {"summary": summary_counts(alerts), "geo": ip_counts(alerts)}
+        socketio.emit(FANOUT_EVENT, {"counts": counts, "origin": manager.host_id}, namespace="/api/alerts/stream")
+
+
+def _publish_batch(batch):
+    from app import socketio
+    manager = socketio.server.manager
+    if isinstance(manager, FanoutMixin):
+        # One message on the queue; every worker (this one included) runs _deliver_batch.
+        # Seqs are allocated and published under the shared row lock, so all workers agree on them.
+        with shared_sequence.allocate(len(batch)) as first:
+            for i, alert in enumerate(batch):
+                alert["seq"] = first + i
+            socketio.emit(FANOUT_EVENT, {"alerts": batch, "origin": manager.host_id, "stamped": True}, namespace="/api/alerts/stream")
+    else:
+        _deliver_batch({"alerts": batch})
+
+
+# 🔹 Background task that flushes the buffer when a batch fills up or its oldest alert is due
+def bulk_alert_sender(app):
+    from app.utils.alert_store import store_alerts
+    print(f"🚀 Bulk alert sender started (every {Config.LIVE_FLUSH_MAX_BATCH} alerts or {Config.LIVE_FLUSH_MAX_DELAY}s)")
+    dropped = 0
     while True:
-        eventlet.sleep(BUFFER_INTERVAL)
-        if alert_buffer:
-            batch = list(alert_buffer)
-            alert_buffer.clear()
+        alert_buffer.wait_ready(Config.LIVE_FLUSH_MAX_DELAY)
+        batch = alert_buffer.drain()
+        if alert_buffer.dropped != dropped:
+            print(f"⚠️ Alert buffer full ({Config.LIVE_BUFFER_POLICY}): {alert_buffer.dropped - dropped} alerts dropped")
+            dropped = alert_buffer.dropped
+        if batch:
             try:
                 print("🧾 Example alert being sent:", batch[0])
-                socketio.emit("bulk_alerts", {"alerts": batch}, namespace="/api/alerts/stream")
+                with app.app_context():  # the shared sequence lives in the database
+                    _publish_batch(batch)
                 print(f"📤 Sent {len(batch)} buffered alerts to frontend")
             except Exception as e:
                 print(f"⚠️ Error emitting alerts: {e}")
 
+            # Only the worker that ingested a batch stores it
+            try:
+                with app.app_context():
+                    store_alerts(batch, source="live")
+            except Exception as e:
+                print(f"⚠️ Error storing alerts: {e}")
+
 
 # 🔹 Start background sender only once
-def start_bulk_sender():
+def start_bulk_sender(app):
     from app import socketio  # ✅ Lazy import here too
     if not getattr(start_bulk_sender, "started", False):
-        socketio.start_background_task(bulk_alert_sender)
+        server = socketio.server
+        if isinstance(server.manager, FanoutMixin):
+            server.manager.fanout_handler = _deliver_fanout
+            # Listen right away rather than on the first client connection
+            if not server.manager_initialized:
+                server.manager_initialized = True
+                server.manager.initialize()
+            with app.app_context():
+                alert_history.next_seq = shared_sequence.peek()  # report the shared last_seq from the start
+            print(f"🔗 Sharing live alerts through {Config.SOCKETIO_MESSAGE_QUEUE}")
+        socketio.start_background_task(bulk_alert_sender, app)
+        socketio.start_background_task(geo_bins.run_folder, Config.GEO_BINS_FOLD_INTERVAL)
         start_bulk_sender.started = True
         print("🧵 Started background alert sender thread")
@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify
-import requests, os
+from flask import Blueprint, request, jsonify, current_app
+import requests, os, ipaddress
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from app.utils.intel_cache import InflightRequests, cached_responses, store_response
 
 threat_bp = Blueprint('threatint', __name__)
 
@@ -9,33 +11,73 @@ load_dotenv()
 ABUSE_API_KEY = os.getenv("ABUSE_API_KEY")
 VT_API_KEY = os.getenv("VT_API_KEY")
 
+# 🔹 Upstream calls run here (green threads under eventlet), so both providers are queried at once
+executor = ThreadPoolExecutor(max_workers=8)
+inflight = InflightRequests(executor)
+
+
+def _fetch_abuse(ip, timeout):
+    resp = requests.get(
+        "https://api.abuseipdb.com/api/v2/check",
+        headers={"Key": ABUSE_API_KEY, "Accept": "application/json"},
+        params={"ipAddress": ip, "maxAgeInDays": 90},
+        timeout=timeout
+    )
+    return resp.json(), resp.ok
+
+
+def _fetch_vt(ip, timeout):
+    resp = requests.get(
+        f"https://www.virustotal.com/api/v3/ip_addresses/{ip}",
+        headers={"x-apikey": VT_API_KEY},
+        timeout=timeout
+    )
+    return resp.json(), resp.ok
+
+
+PROVIDERS = {"abuse": _fetch_abuse, "vt": _fetch_vt}
+
+
+def _lookup(app, provider, ip):
+    """One upstream request; successful answers are cached for THREAT_INTEL_TTL."""
+    try:
+        result, ok = PROVIDERS[provider](ip, app.config["THREAT_INTEL_TIMEOUT"])
+    except Exception as e:
+        return {"error": str(e)}
+    if ok:
+        # Errors and rate-limit answers are not cached, so the next click retries
+        with app.app_context():
+            try:
+                store_response(provider, ip, result, app.config["THREAT_INTEL_TTL"])
+            except Exception as e:
+                print(f"⚠️ Could not cache {provider} result for {ip}: {e}")
+    return result
+
+
 @threat_bp.route("/api/threatintel", methods=["POST"])
 def threat_intel():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     ip = data.get("ip")
     if not ip:
         return jsonify({"error": "No IP provided"}), 400
-
-    abuse_result = {}
-    vt_result = {}
-
     try:
-        abuse_resp = requests.get(
-            f"https://api.abuseipdb.com/api/v2/check",
-            headers={"Key": ABUSE_API_KEY, "Accept": "application/json"},
-            params={"ipAddress": ip, "maxAgeInDays": 90}
-        )
-        abuse_result = abuse_resp.json()
-    except Exception as e:
-        abuse_result = {"error": str(e)}
+        ip = str(ipaddress.ip_address(ip))
+    except ValueError:
+        return jsonify({"error": "Invalid IP"}), 400
 
     try:
-        vt_resp = requests.get(
-            f"https://www.virustotal.com/api/v3/ip_addresses/{ip}",
-            headers={"x-apikey": VT_API_KEY}
-        )
-        vt_result = vt_resp.json()
+        results = cached_responses(ip, PROVIDERS)
     except Exception as e:
-        vt_result = {"error": str(e)}
+        print(f"⚠️ Threat intel cache unavailable: {e}")
+        results = {}
+
+    # Concurrent requests for the same IP and provider share one upstream call
+    app = current_app._get_current_object()
+    futures = {
+        provider: inflight.submit((provider, ip), _lookup, app, provider, ip)
+        for provider in PROVIDERS if provider not in results
+    }
+    for provider, future in futures.items():
+        results[provider] = future.result()
 
-    return jsonify({"abuse": abuse_result, "vt": vt_result})
+    return jsonify({"abuse": results["abuse"], "vt": results["vt"]})
@@ -0,0 +1,148 @@
+# backend/app/utils/alert_buffer.py
+import threading
+import time
+from collections import deque
+
+from app.utils.alert_store import to_int
+
+DROP_OLDEST = "drop_oldest"
+DROP_LOWEST_SEVERITY = "drop_lowest_severity"
+COALESCE = "coalesce"
+POLICIES = (DROP_OLDEST, DROP_LOWEST_SEVERITY, COALESCE)
+
+LOWEST_RANK = 5  # severities are 1 (highest) to 4; anything without one ranks below them
+
+
+def _rank(alert):
+    severity = to_int(alert.get("severity"))  # same coercion as alert_filter, so "2" ranks as 2
+    return severity if isinstance(severity, int) and 1 <= severity < LOWEST_RANK else LOWEST_RANK
+
+
+def _coalesce_key(alert):
+    return (
+        alert.get("signature"), alert.get("src_ip"), alert.get("dest_ip"),
+        alert.get("dest_port"), alert.get("protocol"),
+    )
+
+
+class AlertRingBuffer:
+    """
+    Bounded buffer of live alerts waiting for bulk_alert_sender.
+
+    Alerts are kept in one FIFO per severity rank, each entry tagged with an
+    arrival sequence number, so draining returns them in arrival order while
+    the overflow policy can still evict by age or by severity in O(1):
+
+    - drop_oldest: the oldest buffered alert makes room for the new one.
+    - drop_lowest_severity: the oldest alert of the lowest buffered severity
+      is evicted; a new alert less severe than everything buffered is dropped.
+    - coalesce: a new alert with the same signature, endpoints and protocol
+      as a buffered one is folded into it (its "count" goes up), otherwise
+      the oldest alert is evicted.
+
+    wait_ready() implements the flush schedule: it returns as soon as
+    flush_size alerts are pending, or once the oldest has waited max_delay.
+    """
+
+    def __init__(self, capacity, policy=DROP_OLDEST, flush_size=1000):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected one of {POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self.flush_size = flush_size
+        self.buckets = {rank: deque() for rank in range(1, LOWEST_RANK + 1)}
+        self.index = {}  # coalesce key -> entry, only with the coalesce policy
+        self.size = 0
+        self.seq = 0
+        self.first_at = 0.0
+        self.dropped = 0
+        self.coalesced = 0
+        self.lock = threading.Lock()
+        self.pending = threading.Event()  # at least one alert buffered
+        self.full = threading.Event()     # flush_size alerts buffered
+
+    def __len__(self):
+        return self.size
+
+    def append(self, alert):
+        with self.lock:
+            if self.policy == COALESCE:
+                entry = self.index.get(_coalesce_key(alert))
+                if entry is not None and self.size >= self.capacity:
+                    self._coalesce(entry, alert)
+                    return
+
+            rank = _rank(alert)
+            if self.size >= self.capacity and not self._make_room(rank):
+                self.dropped += 1
+                return
+
+            entry = [self.seq, alert]
+            self.seq += 1
+            self.buckets[rank].append(entry)
+            if self.policy == COALESCE:
+                self.index[_coalesce_key(alert)] = entry
+            if self.size == 0:
+                self.first_at = time.monotonic()
+                self.pending.set()
+            self.size += 1
+            if self.size >= self.flush_size:
+                self.full.set()
+
+    def _coalesce(self, entry, alert):
+        merged = entry[1]
+        if "count" not in merged:
+            merged = entry[1] = dict(merged, count=1)
+        merged["count"] += alert.get("count", 1)
+        if alert.get("timestamp"):
+            merged["last_seen"] = alert["timestamp"]
+        self.coalesced += 1
+
+    def _make_room(self, rank):
+        """Evict one entry for an incoming alert of `rank`; False means drop the incoming one."""
+        if self.policy == DROP_LOWEST_SEVERITY:
+            victim = max(r for r, bucket in self.buckets.items() if bucket)
+            if victim < rank:
+                return False
+        else:
+            victim = self._oldest_bucket()
+        entry = self.buckets[victim].popleft()
+        if self.policy == COALESCE:
+            key = _coalesce_key(entry[1])
+            if self.index.get(key) is entry:
+                del self.index[key]
+        self.size -= 1
+        self.dropped += 1
+        return True
+
+    def _oldest_bucket(self):
+        return min((bucket[0][0], rank) for rank, bucket in self.buckets.items() if bucket)[1]
+
+    def drain(self, limit=None):
+        """Take up to `limit` alerts (default flush_size) in arrival order."""
+        limit = limit or self.flush_size
+        out = []
+        with self.lock:
+            while self.size and len(out) < limit:
+                entry = self.buckets[self._oldest_bucket()].popleft()
+                if self.policy == COALESCE:
+                    key = _coalesce_key(entry[1])
+                    if self.index.get(key) is entry:
+                        del self.index[key]
+                out.append(entry[1])
+                self.size -= 1
+            if self.size < self.flush_size:
+                self.full.clear()
+            if not self.size:
+                self.pending.clear()
+        return out
+
+    def wait_ready(self, max_delay):
+        """Block until a flush is due: flush_size alerts pending, or the oldest is max_delay old."""
+        self.pending.wait()
+        remaining = max_delay - (time.monotonic() - self.first_at)
+        if remaining > 0:
+            self.full.wait(remaining)
+
+    def stats(self):
+        return {"buffered": self.size, "dropped": self.dropped, "coalesced": self.coalesced}
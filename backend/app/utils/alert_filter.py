@@ -0,0 +1,162 @@
+# backend/app/utils/alert_filter.py
+import hashlib
+import json
+
+from app.utils.normalize import parse_timestamp
+from app.utils.alert_store import to_int
+from app.utils.wire_format import JSON
+
+
+def canonical_filter(filters: dict):
+    """
+    Reduce an alertPage.tsx filter object to only the parts that filter anything.
+
+    Empty values are dropped and protocols sorted, so two clients with the
+    same effective filter get the same key regardless of how it was saved.
+    Returns {} for a filter that lets everything through.
+    """
+    filters = filters or {}
+    out = {}
+    if filters.get("alertsOnly"):
+        out["alertsOnly"] = True
+    if filters.get("minSeverity"):
+        out["minSeverity"] = int(filters["minSeverity"])
+    protocols = sorted(set(filters.get("protocols") or []))
+    if protocols:
+        out["protocols"] = protocols
+    if filters.get("port") not in (None, ""):
+        out["port"] = int(filters["port"])
+    if filters.get("ip"):
+        out["ip"] = str(filters["ip"])
+    time_range = {k: v for k, v in (filters.get("timeRange") or {}).items() if k in ("start", "end") and v}
+    if time_range:
+        out["timeRange"] = time_range
+    return out
+
+
+def filter_key(filters: dict):
+    """Short stable id for a canonical filter, used as its Socket.IO room name."""
+    raw = json.dumps(filters, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def compile_filter(filters: dict):
+    """
+    Build a predicate over normalized alerts from a canonical filter.
+
+    Same semantics as filter_conditions() and LiveWindow.mask(): minSeverity
+    keeps severities at or above the chosen level (1 is highest), port
+    matches either side, ip is a substring match on either side.
+    """
+    checks = []
+
+    if filters.get("alertsOnly"):
+        checks.append(lambda a: bool(a.get("signature")))
+
+    min_severity = filters.get("minSeverity")
+    if min_severity:
+        def severe_enough(a):
+            # Agents may send "2"; anything non-numeric counts as no severity
+            severity = to_int(a.get("severity"))
+            return bool(severity) and severity <= min_severity
+        checks.append(severe_enough)
+
+    protocols = set(filters.get("protocols") or [])
+    if protocols:
+        checks.append(lambda a: a.get("protocol") in protocols)
+
+    port = filters.get("port")
+    if port is not None:
+        checks.append(lambda a: a.get("src_port") == port or a.get("dest_port") == port)
+
+    ip = filters.get("ip")
+    if ip:
+        checks.append(lambda a: ip in (a.get("src_ip") or "") or ip in (a.get("dest_ip") or ""))
+
+    time_range = filters.get("timeRange") or {}
+    start = parse_timestamp(time_range.get("start"))
+    end = parse_timestamp(time_range.get("end"))
+    if start or end:
+        def in_range(a):
+            ts = parse_timestamp(a.get("timestamp"))
+            if ts is None:
+                return True  # the client keeps alerts without a timestamp too
+            return (not start or ts >= start) and (not end or ts <= end)
+        checks.append(in_range)
+
+    return lambda alert: all(check(alert) for check in checks)
+
+
+ALL_ROOM = "all"  # subscribers without a filter get every alert
+
+
+class FilterRooms:
+    """
+    Groups live subscribers by effective filter and wire format, one Socket.IO room each.
+
+    Each room keeps the compiled predicate of its filter. The sender
+    evaluates every distinct filter once per batch, no matter how many
+    clients or formats share it, and encodes once per room. Rooms are
+    dropped when their last member leaves.
+    """
+
+    def __init__(self):
+        self.rooms = {}    # room -> {"key", "predicate", "format", "members"}
+        self.members = {}  # sid -> room
+        self.formats = {}  # sid -> negotiated wire format
+
+    def set_format(self, sid, fmt):
+        self.formats[sid] = fmt
+
+    def format(self, sid):
+        return self.formats.get(sid, JSON)
+
+    def join(self, sid, filters):
+        """Move sid to the room for `filters` in its wire format and return the room name."""
+        self.leave(sid)
+        canonical = canonical_filter(filters)
+        key = filter_key(canonical) if canonical else None
+        fmt = self.format(sid)
+        room = f"filter:{key}" if key else ALL_ROOM
+        if fmt != JSON:
+            room = f"{room}|{fmt}"
+        entry = self.rooms.get(room)
+        if entry is None:
+            predicate = compile_filter(canonical) if key else None
+            entry = self.rooms[room] = {"key": key, "predicate": predicate, "format": fmt, "members": set()}
+        entry["members"].add(sid)
+        self.members[sid] = room
+        return room
+
+    def leave(self, sid):
+        """Take sid out of its room; returns that room, or None."""
+        room = self.members.pop(sid, None)
+        entry = self.rooms.get(room)
+        if entry:
+            entry["members"].discard(sid)
+            if not entry["members"]:
+                del self.rooms[room]
+        return room
+
+    def forget(self, sid):
+        self.leave(sid)
+        self.formats.pop(sid, None)
+
+    def predicate(self, sid):
+        """Compiled filter of sid's room, or None if it is unfiltered."""
+        entry = self.rooms.get(self.members.get(sid))
+        return entry["predicate"] if entry else None
+
+    def fan_out(self, alerts):
+        """Yield (room, matching alerts, wire format) for every room with at least one match."""
+        matches = {}
+        for room, entry in list(self.rooms.items()):
+            key = entry["key"]
+            if key not in matches:
+                predicate = entry["predicate"]
+                matches[key] = alerts if predicate is None else [a for a in alerts if predicate(a)]
+            if matches[key]:
+                yield room, matches[key], entry["format"]
+
+
+filter_rooms = FilterRooms()
@@ -0,0 +1,122 @@
+# backend/app/utils/alert_history.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+
+
+class AlertHistory:
+    """
+    Sequence numbering and replay window for live alerts.
+
+    Every emitted alert gets a "seq" one higher than the previous, and the
+    last `size` alerts are kept so a reconnecting client can ask for
+    everything after the last seq it saw. Numbering starts at the current
+    time in microseconds, so ids keep increasing across server restarts and
+    a stale cursor simply finds nothing newer instead of skipping alerts.
+    """
+
+    def __init__(self, size):
+        self.alerts = deque(maxlen=size)
+        self.next_seq = time.time_ns() // 1000
+        self.lock = threading.Lock()
+
+    @property
+    def last_seq(self):
+        return self.next_seq - 1
+
+    def stamp(self, batch):
+        """Assign seq ids to a batch (in place) and remember it for replay."""
+        with self.lock:
+            for alert in batch:
+                alert["seq"] = self.next_seq
+                self.next_seq += 1
+            self.alerts.extend(batch)
+        return batch
+
+    def record(self, batch):
+        """Remember a batch stamped elsewhere (see SharedSequence)."""
+        with self.lock:
+            self.alerts.extend(batch)
+            if batch:
+                self.next_seq = batch[-1]["seq"] + 1
+        return batch
+
+    def since(self, seq, predicate=None):
+        """
+        Alerts with a seq greater than `seq`, oldest first.
+
+        Seqs are contiguous, so the start is found by arithmetic rather than
+        a search. Also returns whether alerts between `seq` and the oldest
+        one still held have already been forgotten.
+        """
+        with self.lock:
+            if not self.alerts:
+                return [], False
+            first = self.alerts[0]["seq"]
+            start = max(0, int(seq) + 1 - first)
+            missed = int(seq) + 1 < first
+            window = list(islice(self.alerts, start, None))
+        if predicate:
+            window = [a for a in window if predicate(a)]
+        return window, missed
+
+
+class SharedSequence:
+    """
+    Seq ids handed out from one database row, for workers sharing a message queue.
+
+    allocate() bumps the row and keeps its lock until the block exits, so
+    publishing inside the block puts batches on the queue in seq order.
+    Every worker then sees the same ids in the same order, and a client can
+    fail over to any worker without its last seq meaning something else
+    there. Must be used inside an app context.
+    """
+
+    def __init__(self, name="live_alerts"):
+        self.name = name
+
+    def _table(self):
+        from app.models.live_sequence import LiveSequence  # Lazy import avoids circular import
+        return LiveSequence.__table__
+
+    def _create(self):
+        from app import db
+        from sqlalchemy.exc import IntegrityError
+        try:
+            db.session.execute(self._table().insert().values(name=self.name, next_seq=time.time_ns() // 1000))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # another worker created it first
+
+    def peek(self):
+        """Next id that will be handed out."""
+        from app import db
+        table = self._table()
+        value = db.session.execute(table.select().with_only_columns(table.c.next_seq).where(table.c.name == self.name)).scalar()
+        db.session.commit()
+        if value is None:
+            self._create()
+            return self.peek()
+        return value
+
+    @contextmanager
+    def allocate(self, count):
+        """Yields the first of `count` consecutive ids; the row stays locked until the block exits."""
+        from app import db
+        table = self._table()
+        bump = table.update().where(table.c.name == self.name).values(next_seq=table.c.next_seq + count)
+        try:
+            if db.session.execute(bump).rowcount == 0:
+                db.session.rollback()
+                self._create()
+                db.session.execute(bump)
+            next_seq = db.session.execute(
+                table.select().with_only_columns(table.c.next_seq).where(table.c.name == self.name)
+            ).scalar()
+            yield next_seq - count
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
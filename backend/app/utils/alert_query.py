@@ -0,0 +1,109 @@
+# backend/app/utils/alert_query.py
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from app.utils.normalize import parse_timestamp
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def _naive_utc(value):
+    ts = parse_timestamp(value)
+    return ts.replace(tzinfo=None) if ts else None
+
+
+def filter_conditions(model, filters: dict):
+    """
+    Translate the alertPage.tsx filter object into SQL conditions.
+
+    Mirrors the client-side filter: minSeverity keeps severities at or above
+    the chosen level (1 is highest), protocols is an allow-list, port matches
+    either side, ip is a substring match on either side and timeRange is
+    inclusive.
+    """
+    filters = filters or {}
+    conditions = []
+
+    if filters.get("alertsOnly"):
+        conditions.append(model.signature.isnot(None))
+
+    min_severity = filters.get("minSeverity")
+    if min_severity:
+        conditions.append(model.severity.isnot(None))
+        conditions.append(model.severity <= int(min_severity))
+
+    protocols = filters.get("protocols") or []
+    if protocols:
+        conditions.append(model.protocol.in_(list(protocols)))
+
+    port = filters.get("port")
+    if port not in (None, ""):
+        port = int(port)
+        conditions.append(or_(model.src_port == port, model.dest_port == port))
+
+    ip = filters.get("ip")
+    if ip:
+        conditions.append(or_(model.src_ip.contains(ip, autoescape=True), model.dest_ip.contains(ip, autoescape=True)))
+
+    time_range = filters.get("timeRange") or {}
+    start = _naive_utc(time_range.get("start"))
+    end = _naive_utc(time_range.get("end"))
+    if start:
+        conditions.append(model.timestamp >= start)
+    if end:
+        conditions.append(model.timestamp <= end)
+
+    return conditions
+
+
+def encode_cursor(alert):
+    raw = json.dumps([alert.timestamp.isoformat(), alert.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    ts, alert_id = json.loads(base64.urlsafe_b64decode(padded))
+    return datetime.fromisoformat(ts), int(alert_id)
+
+
+def query_alerts(filters=None, cursor=None, limit=DEFAULT_PAGE_SIZE, order="desc"):
+    """
+    Return one page of stored alerts plus the cursor for the next page.
+
+    Pages are keyset-paginated on (timestamp, id): each page resumes strictly
+    after the last row of the previous one, so deep pages cost the same as the
+    first and concurrent inserts never shift or duplicate rows.
+    """
+    from app.models.alert import Alert  # Lazy import avoids circular import
+
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    descending = order != "asc"
+
+    query = Alert.query.filter(*filter_conditions(Alert, filters))
+
+    if cursor:
+        ts, alert_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(Alert.timestamp < ts, and_(Alert.timestamp == ts, Alert.id < alert_id)))
+        else:
+            query = query.filter(or_(Alert.timestamp > ts, and_(Alert.timestamp == ts, Alert.id > alert_id)))
+
+    if descending:
+        query = query.order_by(Alert.timestamp.desc(), Alert.id.desc())
+    else:
+        query = query.order_by(Alert.timestamp.asc(), Alert.id.asc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "alerts": [row.to_dict() for row in rows],
+        "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+    }
@@ -0,0 +1,126 @@
+# backend/app/utils/alert_store.py
+from datetime import datetime
+
+from app.utils.normalize import parse_timestamp
+
+BATCH_SIZE = 1000  # rows per multi-row INSERT
+
+
+def to_int(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    # Upload-path signature ids look like "signature ID:2025001"
+    digits = str(value).rpartition(":")[2].strip()
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+def _to_str(value, limit):
+    if value is None:
+        return None
+    return str(value)[:limit]
+
+
+def to_row(alert: dict, source: str) -> dict:
+    """Map a normalize_alert() result onto the columns of the alerts table."""
+    ts = parse_timestamp(alert.get("timestamp"))
+    return {
+        # Stored as naive UTC; events without a usable timestamp get the ingest
+        # time so (timestamp, id) keyset pagination never has to deal with NULLs
+        "timestamp": ts.replace(tzinfo=None) if ts else datetime.utcnow(),
+        "src_ip": _to_str(alert.get("src_ip"), 45),
+        "src_port": to_int(alert.get("src_port")),
+        "dest_ip": _to_str(alert.get("dest_ip"), 45),
+        "dest_port": to_int(alert.get("dest_port")),
+        "protocol": _to_str(alert.get("protocol"), 16),
+        "signature": _to_str(alert.get("signature"), 255),
+        "signature_id": to_int(alert.get("signature_id")),
+        "gid": to_int(alert.get("gid")),
+        "severity": to_int(alert.get("severity")),
+        "action": _to_str(alert.get("action"), 32),
+        "source": source,
+        "upload_id": alert.get("upload_id"),
+        "event_index": alert.get("event_index"),
+        "sensor_id": _to_str(alert.get("sensor_id"), 64),
+    }
+
+
+class BulkAlertWriter:
+    """
+    Buffers normalized alerts and writes them with multi-row INSERTs.
+
+    Rows go through the Core table insert (executemany), skipping ORM object
+    construction, identity-map bookkeeping and per-row flushes. Must be used
+    inside an app context.
+    """
+
+    def __init__(self, source="upload", batch_size=BATCH_SIZE):
+        # Lazy import: app/__init__ imports the routes before db exists
+        from app import db
+        from app.models.alert import Alert
+
+        self.db = db
+        self.table = Alert.__table__
+        self.source = source
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+
+    def add(self, alert: dict):
+        self.rows.append(to_row(alert, self.source))
+        if len(self.rows) >= self.batch_size:
+            self._write()
+
+    def _write(self):
+        if not self.rows:
+            return
+        self.db.session.execute(self.table.insert(), self.rows)
+        self.db.session.commit()  # one short transaction per batch
+        self.written += len(self.rows)
+        self.rows = []
+
+    def flush(self):
+        self._write()
+        return self.written
+
+
+def last_alert_id():
+    """Highest alert id so far; rows inserted later get larger ids. Needs an app context."""
+    from sqlalchemy import func
+    from app import db
+    from app.models.alert import Alert
+    return db.session.query(func.max(Alert.id)).scalar() or 0
+
+
+def reassign_upload(old_id, new_id, after_id=0):
+    """Point rows stored under upload old_id at new_id; after_id keeps it to a primary key range scan."""
+    from app import db
+    from app.models.alert import Alert
+    table = Alert.__table__
+    try:
+        result = db.session.execute(
+            table.update()
+            .where(table.c.id > after_id, table.c.upload_id == old_id)
+            .values(upload_id=new_id)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result.rowcount
+
+
+def store_alerts(alerts, source="upload", batch_size=BATCH_SIZE):
+    """Persist an iterable of normalized alerts; returns the number of rows written."""
+    writer = BulkAlertWriter(source=source, batch_size=batch_size)
+    try:
+        for alert in alerts:
+            writer.add(alert)
+        return writer.flush()
+    except Exception:
+        writer.db.session.rollback()
+        raise
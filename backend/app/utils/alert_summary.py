@@ -0,0 +1,183 @@
+# backend/app/utils/alert_summary.py
+import heapq
+import threading
+from collections import Counter
+
+IP_CAPACITY = 1024         # tracked keys per heavy-hitter sketch for IPs
+SIGNATURE_CAPACITY = 4096  # signatures are lower-cardinality; keep more of them
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch (Metwally et al.) with O(1) updates.
+
+    Tracks at most `capacity` keys. When full, the key with the smallest count
+    is replaced and the newcomer inherits that count (plus its own, for
+    weighted adds of pre-aggregated counts), so reported counts may
+    overestimate by at most the evicted minimum, and any key with a true
+    frequency above total/capacity is guaranteed to be present.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}   # key -> count
+        self.buckets = {}  # count -> {key: None} (dict used as an ordered set)
+        self.min_count = 0
+
+    def _move(self, key, old, new):
+        self.buckets.setdefault(new, {})[key] = None
+        self.counts[key] = new
+        if old:
+            bucket = self.buckets[old]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[old]
+                if self.min_count == old:
+                    # Nothing lies between old and old + 1; bigger steps have to look
+                    self.min_count = new if new == old + 1 else min(self.buckets)
+
+    def add(self, key, count=1):
+        old = self.counts.get(key)
+        if old is not None:
+            self._move(key, old, old + count)
+            return
+
+        if len(self.counts) < self.capacity:
+            self._move(key, 0, count)
+            self.min_count = min(self.min_count, count) if self.min_count else count
+            return
+
+        # Evict a key holding the minimum count; the newcomer takes its place
+        floor = self.min_count
+        bucket = self.buckets[floor]
+        victim = next(iter(bucket))
+        del bucket[victim]
+        del self.counts[victim]
+        self.buckets.setdefault(floor + count, {})[key] = None
+        self.counts[key] = floor + count
+        if not bucket:
+            del self.buckets[floor]
+            self.min_count = floor + 1 if count == 1 else min(self.buckets)
+
+    def top(self, n):
+        return heapq.nlargest(n, self.counts.items(), key=lambda kv: kv[1])
+
+    def clear(self):
+        self.counts.clear()
+        self.buckets.clear()
+        self.min_count = 0
+
+
+class AlertSummary:
+    """
+    Dashboard counters maintained as alerts are ingested.
+
+    Mirrors the `summary` useMemo in alertPage.tsx: top talkers count every
+    alert by src_ip, while the total, top hosts and top signatures only count
+    alerts that carry a severity.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total = 0
+        self.events = 0
+        self.top_talkers = SpaceSaving(IP_CAPACITY)
+        self.top_hosts = SpaceSaving(IP_CAPACITY)
+        self.top_signatures = SpaceSaving(SIGNATURE_CAPACITY)
+        self.severity = Counter()
+        self.protocols = Counter()
+
+    def _add(self, alert):
+        self.events += 1
+        src_ip = alert.get("src_ip")
+        if src_ip:
+            self.top_talkers.add(src_ip)
+
+        protocol = alert.get("protocol")
+        if protocol:
+            self.protocols[protocol] += 1
+
+        severity = alert.get("severity")
+        if not severity:
+            return
+        self.total += 1
+        self.severity[severity] += 1
+        dest_ip = alert.get("dest_ip")
+        if dest_ip:
+            self.top_hosts.add(dest_ip)
+        signature = alert.get("signature")
+        if signature:
+            self.top_signatures.add(signature)
+
+    def add(self, alert: dict):
+        with self.lock:
+            self._add(alert)
+
+    def add_many(self, alerts):
+        with self.lock:
+            for alert in alerts:
+                self._add(alert)
+
+    def add_counts(self, counts):
+        """Merge pre-aggregated counts from summary_counts(), e.g. another worker's upload."""
+        with self.lock:
+            self.events += counts["events"]
+            self.total += counts["total"]
+            for sketch, name in ((self.top_talkers, "talkers"), (self.top_hosts, "hosts"), (self.top_signatures, "signatures")):
+                for key, count in counts[name].items():
+                    sketch.add(key, count)
+            self.severity.update(counts["severity"])
+            self.protocols.update(counts["protocols"])
+
+    def snapshot(self, top_n=5):
+        with self.lock:
+            return {
+                "total": self.total,
+                "events": self.events,
+                "topTalkers": self.top_talkers.top(top_n),
+                "topHosts": self.top_hosts.top(top_n),
+                "topSignatures": self.top_signatures.top(top_n),
+                "severity": {str(k): v for k, v in self.severity.items()},
+                "protocols": dict(self.protocols),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.total = 0
+            self.events = 0
+            self.top_talkers.clear()
+            self.top_hosts.clear()
+            self.top_signatures.clear()
+            self.severity.clear()
+            self.protocols.clear()
+
+
+def summary_counts(alerts):
+    """
+    What AlertSummary.add_many(alerts) would count, as plain Counters.
+
+    Grows with the distinct IPs and signatures rather than with the alerts,
+    so an upload's share of the summary can travel through the message queue.
+    """
+    counts = {"events": 0, "total": 0, "talkers": Counter(), "hosts": Counter(),
+              "signatures": Counter(), "severity": Counter(), "protocols": Counter()}
+    for alert in alerts:
+        counts["events"] += 1
+        if alert.get("src_ip"):
+            counts["talkers"][alert["src_ip"]] += 1
+        if alert.get("protocol"):
+            counts["protocols"][alert["protocol"]] += 1
+        severity = alert.get("severity")
+        if not severity:
+            continue
+        counts["total"] += 1
+        counts["severity"][severity] += 1
+        if alert.get("dest_ip"):
+            counts["hosts"][alert["dest_ip"]] += 1
+        if alert.get("signature"):
+            counts["signatures"][alert["signature"]] += 1
+    return counts
+
+
+# Process-wide counters shared by the upload and live paths
+alert_summary = AlertSummary()
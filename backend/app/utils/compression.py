@@ -0,0 +1,79 @@
+# backend/app/utils/compression.py
+import bz2
+import gzip
+import lzma
+
+# Magic bytes -> (file extension, wrapper for a file object, opener for a path)
+FORMATS = (
+    (b"\x1f\x8b", ".gz", lambda f: gzip.GzipFile(fileobj=f, mode="rb"), gzip.open),
+    (b"BZh", ".bz2", lambda f: bz2.BZ2File(f, mode="rb"), bz2.open),
+    (b"\xfd7zXZ\x00", ".xz", lambda f: lzma.LZMAFile(f, mode="rb"), lzma.open),
+)
+MAGIC_LEN = max(len(magic) for magic, *_ in FORMATS)
+EXTENSIONS = tuple(ext for _, ext, _, _ in FORMATS)
+
+
+def sniff(head: bytes):
+    """Return the matching FORMATS entry for the leading bytes, or None for plain text."""
+    for fmt in FORMATS:
+        if head.startswith(fmt[0]):
+            return fmt
+    return None
+
+
+class _PrefixedReader:
+    """Puts already-consumed leading bytes back in front of a non-seekable stream."""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size=-1):
+        if not self.prefix:
+            return self.stream.read(size)
+        if size is None or size < 0:
+            data, self.prefix = self.prefix + self.stream.read(), b""
+            return data
+        data, self.prefix = self.prefix[:size], self.prefix[size:]
+        if len(data) < size:
+            data += self.stream.read(size - len(data))
+        return data
+
+
+def open_decompressed(stream):
+    """
+    Detect compression from magic bytes and wrap the stream accordingly.
+
+    Works on non-seekable streams: the sniffed bytes are replayed in front of
+    the rest, and decompression happens chunk by chunk as the parser reads,
+    so nothing uncompressed is ever written to disk. Returns (reader, ext),
+    with ext being "" for uncompressed input.
+    """
+    head = b""
+    while len(head) < MAGIC_LEN:
+        chunk = stream.read(MAGIC_LEN - len(head))
+        if not chunk:
+            break
+        head += chunk
+
+    reader = _PrefixedReader(head, stream)
+    fmt = sniff(head)
+    if fmt is None:
+        return reader, ""
+    return fmt[2](reader), fmt[1]
+
+
+def sniff_file(stream):
+    """Extension for a seekable upload ("" if uncompressed); leaves it rewound."""
+    head = stream.read(MAGIC_LEN)
+    stream.seek(0)
+    fmt = sniff(head)
+    return fmt[1] if fmt else ""
+
+
+def open_stored(path):
+    """Open a stored upload for binary reading, decompressing by extension."""
+    for _, ext, _, opener in FORMATS:
+        if path.endswith(ext):
+            return opener(path, "rb")
+    return open(path, "rb")
@@ -0,0 +1,266 @@
+# backend/app/utils/geo_bins.py
+import heapq
+import threading
+import time
+from collections import Counter
+
+from config import Config
+
+LEVELS = ("country", "city", "grid")
+SRC, DEST = 0, 1
+YIELD_EVERY = 500       # IPs folded between yields to the hub
+STORED_TAIL_IDS = 10000  # newest alert ids re-checked on every stored refresh
+
+
+def _lookup(ip):
+    from app.geo import get_geo  # lazy: keeps the mmdb out of modules that never map anything
+    return get_geo(ip)
+
+
+def ip_counts(alerts):
+    """(src, dest) Counters of the IPs GeoBins.add_many(alerts) would count."""
+    counts = (Counter(), Counter())
+    for alert in alerts:
+        if alert.get("src_ip"):
+            counts[SRC][alert["src_ip"]] += 1
+        if alert.get("dest_ip"):
+            counts[DEST][alert["dest_ip"]] += 1
+    return counts
+
+
+def grid_cell(lat, lon, zoom):
+    """(row, col) of a point in the 2^zoom x 2^zoom lat/lon grid."""
+    cells = 1 << zoom
+    row = min(int((lat + 90.0) * cells / 180.0), cells - 1)
+    col = min(int((lon + 180.0) * cells / 360.0), cells - 1)
+    return max(row, 0), max(col, 0)
+
+
+class GeoBins:
+    """
+    Alert counts per country, city and lat/lon grid cell, for the map view.
+
+    Ingest only bumps a per-IP counter. Those deltas are folded into the bins
+    by run_folder() every few seconds (sooner once `pending_max` distinct IPs
+    are waiting) and before each snapshot, with one cached geo lookup per
+    distinct IP rather than per alert, and every grid zoom level up to
+    `max_zoom` is updated in the same pass. Long folds yield regularly so
+    the hub keeps serving other requests. Each bin keeps separate src and dest counts and
+    a count-weighted centroid, so the map payload grows with the number of
+    bins, not with the number of IPs or alerts.
+    """
+
+    def __init__(self, max_zoom, lookup=_lookup, pending_max=50000):
+        self.max_zoom = max_zoom
+        self.lookup = lookup
+        self.pending_max = pending_max
+        self.wake = threading.Event()  # set when pending outgrows pending_max
+        self.lock = threading.Lock()       # guards the pending deltas
+        self.fold_lock = threading.Lock()  # guards the bins
+        self.pending = (Counter(), Counter())
+        self.countries = {}  # country -> [src, dest, lat_sum, lon_sum]
+        self.cities = {}     # (country, city) -> [src, dest, lat_sum, lon_sum]
+        self.grid = [{} for _ in range(max_zoom + 1)]  # per zoom: (row, col) -> [...]
+        self.unlocated = [0, 0]
+
+    def _count(self, alert):
+        src_ip = alert.get("src_ip")
+        if src_ip:
+            self.pending[SRC][src_ip] += 1
+        dest_ip = alert.get("dest_ip")
+        if dest_ip:
+            self.pending[DEST][dest_ip] += 1
+
+    def _check_pending(self):
+        if len(self.pending[SRC]) + len(self.pending[DEST]) > self.pending_max:
+            self.wake.set()
+
+    def add(self, alert: dict):
+        with self.lock:
+            self._count(alert)
+            self._check_pending()
+
+    def add_many(self, alerts):
+        with self.lock:
+            for alert in alerts:
+                self._count(alert)
+            self._check_pending()
+
+    def add_counts(self, side, counts):
+        """Add pre-aggregated {ip: n} counts for one side (SRC or DEST); negative n subtracts."""
+        with self.lock:
+            self.pending[side].update(counts)
+            self._check_pending()
+
+    @staticmethod
+    def _bump(bins, key, side, weight, lat, lon):
+        entry = bins.get(key)
+        if entry is None:
+            entry = bins[key] = [0, 0, 0.0, 0.0]
+        entry[side] += weight
+        entry[2] += lat * weight
+        entry[3] += lon * weight
+
+    def _fold(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = (Counter(), Counter())
+        folded = 0
+        for side, counts in enumerate(pending):
+            for ip, weight in counts.items():
+                folded += 1
+                if folded % YIELD_EVERY == 0:
+                    time.sleep(0)  # green under eventlet.monkey_patch(): lets the hub run
+                if not weight:
+                    continue
+                geo = self.lookup(ip)
+                if not geo or geo.get("lat") is None or geo.get("lon") is None:
+                    self.unlocated[side] += weight
+                    continue
+                lat, lon = geo["lat"], geo["lon"]
+                country = geo.get("country") or "Unknown"
+                self._bump(self.countries, country, side, weight, lat, lon)
+                self._bump(self.cities, (country, geo.get("city") or "Unknown"), side, weight, lat, lon)
+                for zoom, cells in enumerate(self.grid):
+                    self._bump(cells, grid_cell(lat, lon, zoom), side, weight, lat, lon)
+
+    def fold(self):
+        with self.fold_lock:
+            self._fold()
+
+    def run_folder(self, interval):
+        """Background loop: fold every `interval` seconds, or as soon as pending is too big."""
+        while True:
+            self.wake.wait(interval)
+            self.wake.clear()
+            try:
+                self.fold()
+            except Exception as e:
+                print(f"⚠️ Error folding geo bins: {e}")
+
+    def snapshot(self, level="grid", zoom=0, bbox=None, limit=None):
+        """
+        Bins at one level, largest first.
+
+        bbox is (south, west, north, east) and keeps bins whose centroid is
+        inside it; limit keeps the N largest. Zooms past max_zoom use the
+        finest grid.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {', '.join(LEVELS)}")
+        zoom = max(0, min(int(zoom), self.max_zoom))
+
+        with self.fold_lock:
+            self._fold()
+            if level == "country":
+                bins = self.countries
+            elif level == "city":
+                bins = self.cities
+            else:
+                bins = self.grid[zoom]
+
+            out = []
+            for key, (src, dest, lat_sum, lon_sum) in bins.items():
+                count = src + dest
+                lat, lon = round(lat_sum / count, 4), round(lon_sum / count, 4)
+                if bbox and not (bbox[0] <= lat <= bbox[2] and bbox[1] <= lon <= bbox[3]):
+                    continue
+                item = {"lat": lat, "lon": lon, "count": count, "src": src, "dest": dest}
+                if level == "country":
+                    item["country"] = key
+                elif level == "city":
+                    item["country"], item["city"] = key
+                else:
+                    item["cell"] = list(key)
+                out.append(item)
+            unlocated = {"src": self.unlocated[SRC], "dest": self.unlocated[DEST]}
+
+        if limit:
+            out = heapq.nlargest(limit, out, key=lambda b: b["count"])
+        else:
+            out.sort(key=lambda b: b["count"], reverse=True)
+        return {"level": level, "zoom": zoom if level == "grid" else None, "bins": out, "unlocated": unlocated}
+
+    def reset(self):
+        with self.fold_lock, self.lock:
+            self.pending = (Counter(), Counter())
+            self.countries.clear()
+            self.cities.clear()
+            for cells in self.grid:
+                cells.clear()
+            self.unlocated = [0, 0]
+
+
+class StoredGeoBins(GeoBins):
+    """
+    GeoBins over the alerts table, caught up on demand.
+
+    Ids up to `settled` are counted in bulk, grouped by IP in the database,
+    so the table is scanned once overall. The newest STORED_TAIL_IDS ids are
+    re-checked row by row on every refresh, so rows from transactions that
+    commit out of id order are still picked up unless they land further
+    back than that. Must be used inside an app context.
+    """
+
+    def __init__(self, max_zoom, lookup=_lookup, tail_ids=STORED_TAIL_IDS):
+        super().__init__(max_zoom, lookup)
+        self.tail_ids = tail_ids
+        self.settled = 0
+        self.tail = {}  # id -> (src_ip, dest_ip) of rows counted above `settled`
+        self.refresh_lock = threading.Lock()
+
+    def refresh(self):
+        # Lazy imports: app/__init__ imports the routes before db exists
+        from sqlalchemy import func
+        from app import db
+        from app.models.alert import Alert
+
+        with self.refresh_lock:
+            max_id = db.session.query(func.max(Alert.id)).scalar() or 0
+            settled = max(self.settled, max_id - self.tail_ids)
+
+            if settled > self.settled:
+                # Bulk range, minus the rows already counted while they were in the tail
+                in_range = [i for i in self.tail if i <= settled]
+                for side, column in ((SRC, Alert.src_ip), (DEST, Alert.dest_ip)):
+                    counts = Counter(dict(
+                        db.session.query(column, func.count())
+                        .filter(Alert.id > self.settled, Alert.id <= settled, column.isnot(None))
+                        .group_by(column)
+                    ))
+                    for i in in_range:
+                        ip = self.tail[i][side]
+                        if ip:
+                            counts[ip] -= 1
+                    self.add_counts(side, counts)
+                for i in in_range:
+                    del self.tail[i]
+                self.settled = settled
+
+            # Tail: skip the row fetch when nothing new has committed there
+            present = db.session.query(func.count(Alert.id)).filter(Alert.id > settled).scalar() or 0
+            if present == len(self.tail):
+                return
+            src, dest = Counter(), Counter()
+            rows = db.session.query(Alert.id, Alert.src_ip, Alert.dest_ip).filter(Alert.id > settled)
+            for row_id, src_ip, dest_ip in rows:
+                if row_id in self.tail:
+                    continue
+                self.tail[row_id] = (src_ip, dest_ip)
+                if src_ip:
+                    src[src_ip] += 1
+                if dest_ip:
+                    dest[dest_ip] += 1
+            self.add_counts(SRC, src)
+            self.add_counts(DEST, dest)
+
+    def reset(self):
+        with self.refresh_lock:
+            super().reset()
+            self.settled = 0
+            self.tail.clear()
+
+
+# Process-wide bins shared by the upload and live paths, like alert_summary
+geo_bins = GeoBins(Config.GEO_GRID_MAX_ZOOM, pending_max=Config.GEO_BINS_PENDING_MAX)
+stored_geo_bins = StoredGeoBins(Config.GEO_GRID_MAX_ZOOM)
@@ -0,0 +1,70 @@
+# backend/app/utils/geo_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()  # returned by GeoCache.get when the IP has no live entry
+
+
+class GeoCache:
+    """
+    Size-bounded LRU of geo lookups with per-entry expiry.
+
+    A value of None is a negative entry (address not in the database, or not
+    routable at all) and is kept for `negative_ttl` rather than `ttl`, so a
+    private address seen thousands of times costs one classification instead
+    of one failed lookup per sighting. Cached dicts are shared between
+    callers and must not be modified.
+    """
+
+    def __init__(self, max_size, ttl, negative_ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.entries = OrderedDict()  # ip -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, ip):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(ip)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self.entries[ip]
+                self.misses += 1
+                return MISSING
+            self.entries.move_to_end(ip)
+            self.hits += 1
+            if entry[1] is None:
+                self.negative_hits += 1
+            return entry[1]
+
+    def put(self, ip, value):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        with self.lock:
+            self.entries[ip] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(ip)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
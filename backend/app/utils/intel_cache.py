@@ -0,0 +1,63 @@
+# backend/app/utils/intel_cache.py
+import threading
+from datetime import datetime, timedelta
+
+
+class InflightRequests:
+    """
+    Coalesces concurrent calls for the same key onto one future.
+
+    The first caller for a key submits the work to the executor; anyone
+    asking for that key before it finishes gets the same future, so a burst
+    of identical lookups costs a single upstream request.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.lock = threading.Lock()
+        self.futures = {}
+
+    def submit(self, key, fn, *args):
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                return future
+            future = self.futures[key] = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._done(key, future))
+        return future
+
+    def _done(self, key, future):
+        with self.lock:
+            if self.futures.get(key) is future:
+                del self.futures[key]
+
+
+def cached_responses(ip, providers):
+    """{provider: response} for the unexpired cache entries of an IP. Needs an app context."""
+    from app.models.threat_intel import ThreatIntelCache  # Lazy import avoids circular import
+    rows = ThreatIntelCache.query.filter(
+        ThreatIntelCache.ip == ip,
+        ThreatIntelCache.provider.in_(list(providers)),
+        ThreatIntelCache.expires_at > datetime.utcnow(),
+    ).all()
+    return {row.provider: row.response for row in rows}
+
+
+def store_response(provider, ip, response, ttl):
+    """Insert or refresh the cache entry for (provider, ip). Needs an app context."""
+    from app import db
+    from app.models.threat_intel import ThreatIntelCache
+    from sqlalchemy.exc import IntegrityError
+
+    now = datetime.utcnow()
+    row = ThreatIntelCache.query.filter_by(provider=provider, ip=ip).first()
+    if row is None:
+        row = ThreatIntelCache(provider=provider, ip=ip)
+        db.session.add(row)
+    row.response = response
+    row.fetched_at = now
+    row.expires_at = now + timedelta(seconds=ttl)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # another worker stored the same lookup first; keep theirs
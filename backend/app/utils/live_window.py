@@ -0,0 +1,237 @@
+# backend/app/utils/live_window.py
+import ipaddress
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.utils.normalize import parse_timestamp
+
+LIVE_WINDOW_SIZE = 100_000  # most recent live alerts kept in memory
+IPV4_SPACE = 1 << 32        # IP codes below this are IPv4 addresses as integers
+NO_VALUE = -1
+
+
+class _Interner:
+    """String <-> small int dictionary for repeated values (signatures, protocols)."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        if value is None:
+            return NO_VALUE
+        value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def value(self, code):
+        return self.values[code] if code >= 0 else None
+
+    def __len__(self):
+        return len(self.values)
+
+
+class LiveWindow:
+    """
+    Fixed-capacity columnar ring buffer of the most recent live alerts.
+
+    Each alert is split across preallocated NumPy columns: timestamps as epoch
+    floats, IPv4 addresses as integers, ports and severity as small ints and
+    signatures/protocols as interned codes. Addresses that are not IPv4 are
+    interned too and stored above IPV4_SPACE. An alert costs ~40 bytes instead
+    of a dict of strings, and filters/aggregations run as vectorized masks.
+    """
+
+    def __init__(self, capacity=LIVE_WINDOW_SIZE):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.src_ip = np.full(capacity, NO_VALUE, dtype=np.int64)
+        self.dest_ip = np.full(capacity, NO_VALUE, dtype=np.int64)
+        self.src_port = np.full(capacity, NO_VALUE, dtype=np.int32)
+        self.dest_port = np.full(capacity, NO_VALUE, dtype=np.int32)
+        self.severity = np.zeros(capacity, dtype=np.int8)  # 0 = no severity
+        self.protocol = np.full(capacity, NO_VALUE, dtype=np.int32)
+        self.signature = np.full(capacity, NO_VALUE, dtype=np.int32)
+        self.strings = _Interner()
+        self.ips = _Interner()
+        self.head = 0  # next slot to write
+        self.size = 0
+
+    # 🔹 Encoding helpers
+    def _ip_code(self, ip):
+        if not ip:
+            return NO_VALUE
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            addr = None
+        if addr is not None and addr.version == 4:
+            return int(addr)
+        return IPV4_SPACE + self.ips.code(ip)
+
+    def _ip_value(self, code):
+        code = int(code)
+        if code < 0:
+            return None
+        if code < IPV4_SPACE:
+            return str(ipaddress.IPv4Address(code))
+        return self.ips.value(code - IPV4_SPACE)
+
+    @staticmethod
+    def _small_int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return NO_VALUE
+
+    # 🔹 Writes
+    def append(self, alert: dict):
+        with self.lock:
+            self._append(alert)
+
+    def extend(self, alerts):
+        with self.lock:
+            for alert in alerts:
+                self._append(alert)
+
+    def _append(self, alert):
+        i = self.head
+        ts = parse_timestamp(alert.get("timestamp"))
+        self.ts[i] = ts.timestamp() if ts else time.time()
+        self.src_ip[i] = self._ip_code(alert.get("src_ip"))
+        self.dest_ip[i] = self._ip_code(alert.get("dest_ip"))
+        self.src_port[i] = self._small_int(alert.get("src_port"))
+        self.dest_port[i] = self._small_int(alert.get("dest_port"))
+        severity = self._small_int(alert.get("severity"))
+        self.severity[i] = severity if 0 < severity < 128 else 0
+        self.protocol[i] = self.strings.code(alert.get("protocol"))
+        self.signature[i] = self.strings.code(alert.get("signature"))
+
+        self.head = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        elif len(self.strings) + len(self.ips) > 4 * self.capacity:
+            self._compact()
+
+    def _compact(self):
+        """Drop dictionary entries that no longer appear in the window."""
+        for interner, columns, offset in (
+            (self.strings, (self.protocol, self.signature), 0),
+            (self.ips, (self.src_ip, self.dest_ip), IPV4_SPACE),
+        ):
+            used = np.unique(np.concatenate([c[c >= offset] - offset for c in columns]))
+            interner.values = [interner.values[int(old)] for old in used]
+            interner.codes = {value: code for code, value in enumerate(interner.values)}
+            for column in columns:
+                live = column >= offset
+                if live.any():
+                    old_codes = column[live] - offset
+                    column[live] = np.searchsorted(used, old_codes) + offset
+
+    # 🔹 Reads
+    def _order(self):
+        """Slot indices from newest to oldest."""
+        return (self.head - 1 - np.arange(self.size)) % self.capacity
+
+    def _codes_matching(self, interner, values):
+        return np.array([interner.codes[v] for v in values if v in interner.codes], dtype=np.int64)
+
+    def _ip_substring_mask(self, idx, needle):
+        src, dest = self.src_ip[idx], self.dest_ip[idx]
+        candidates = np.unique(np.concatenate([src, dest]))
+        hits = np.array(
+            [c for c in candidates if c >= 0 and needle in (self._ip_value(c) or "")],
+            dtype=np.int64,
+        )
+        return np.isin(src, hits) | np.isin(dest, hits)
+
+    def mask(self, idx, filters: dict):
+        """Vectorized version of the alertPage.tsx filter over the slots in idx."""
+        filters = filters or {}
+        keep = np.ones(len(idx), dtype=bool)
+
+        if filters.get("alertsOnly"):
+            keep &= self.signature[idx] >= 0
+
+        min_severity = filters.get("minSeverity")
+        if min_severity:
+            severity = self.severity[idx]
+            keep &= (severity > 0) & (severity <= int(min_severity))
+
+        protocols = filters.get("protocols") or []
+        if protocols:
+            keep &= np.isin(self.protocol[idx], self._codes_matching(self.strings, protocols))
+
+        port = filters.get("port")
+        if port not in (None, ""):
+            port = int(port)
+            keep &= (self.src_port[idx] == port) | (self.dest_port[idx] == port)
+
+        ip = filters.get("ip")
+        if ip:
+            keep &= self._ip_substring_mask(idx, ip)
+
+        time_range = filters.get("timeRange") or {}
+        start = parse_timestamp(time_range.get("start"))
+        end = parse_timestamp(time_range.get("end"))
+        if start:
+            keep &= self.ts[idx] >= start.timestamp()
+        if end:
+            keep &= self.ts[idx] <= end.timestamp()
+
+        return keep
+
+    def _top(self, column, top_n, decode):
+        values = column[column >= 0]
+        if not len(values):
+            return []
+        codes, counts = np.unique(values, return_counts=True)
+        order = np.argsort(-counts, kind="stable")[:top_n]
+        return [[decode(codes[i]), int(counts[i])] for i in order]
+
+    def _row(self, i):
+        return {
+            "timestamp": datetime.fromtimestamp(float(self.ts[i]), tz=timezone.utc).isoformat(),
+            "src_ip": self._ip_value(self.src_ip[i]),
+            "src_port": int(self.src_port[i]) if self.src_port[i] >= 0 else None,
+            "dest_ip": self._ip_value(self.dest_ip[i]),
+            "dest_port": int(self.dest_port[i]) if self.dest_port[i] >= 0 else None,
+            "protocol": self.strings.value(int(self.protocol[i])),
+            "signature": self.strings.value(int(self.signature[i])),
+            "severity": int(self.severity[i]) or None,
+        }
+
+    def query(self, filters=None, limit=100, top_n=5):
+        """Newest matching alerts plus dashboard aggregates over the whole match."""
+        with self.lock:
+            idx = self._order()
+            idx = idx[self.mask(idx, filters)]
+
+            with_severity = idx[self.severity[idx] > 0]
+            severity_counts = np.bincount(self.severity[with_severity], minlength=4)
+
+            return {
+                "alerts": [self._row(i) for i in idx[:limit]],
+                "summary": {
+                    "total": int(len(with_severity)),
+                    "events": int(len(idx)),
+                    "topTalkers": self._top(self.src_ip[idx], top_n, self._ip_value),
+                    "topHosts": self._top(self.dest_ip[with_severity], top_n, self._ip_value),
+                    "topSignatures": self._top(
+                        self.signature[with_severity], top_n, lambda c: self.strings.value(int(c))
+                    ),
+                    "severity": {str(s): int(n) for s, n in enumerate(severity_counts) if s and n},
+                },
+            }
+
+
+# Process-wide window fed by the live Socket.IO path
+live_window = LiveWindow()
@@ -0,0 +1,83 @@
+# backend/app/utils/message_queue.py
+import pickle
+
+import socketio
+
+# Internal event carrying a whole live batch between workers; never sent to clients
+FANOUT_EVENT = "__alert_fanout"
+
+
+class FanoutMixin:
+    """
+    Lets the live batch travel through the message queue once per worker.
+
+    Emitting FANOUT_EVENT publishes the batch like any other emit, but every
+    worker (the sender included) hands it to fanout_handler instead of
+    delivering it to clients. The handler then applies that worker's own
+    filter rooms and emits locally, so filters are still evaluated once per
+    batch per worker and the queue carries each alert once.
+    """
+
+    fanout_handler = None
+
+    def _handle_emit(self, message):
+        if message.get("event") == FANOUT_EVENT and self.fanout_handler:
+            self.fanout_handler(message["data"])
+        else:
+            super()._handle_emit(message)
+
+
+class LocalManager(socketio.PubSubManager):
+    """
+    In-process stand-in for a message queue, selected with a local:// URL.
+
+    Every server created in this process on the same channel sees the others'
+    messages, pickled as they would be on a real queue. Meant for tests and
+    single-machine development; it does not cross process boundaries.
+    """
+
+    name = "local"
+    buses = {}  # channel -> queues of the listening managers
+
+    def __init__(self, url="local://", channel="flask-socketio", write_only=False, logger=None):
+        self.url = url
+        self.queue = None
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+
+    def initialize(self):
+        if not self.write_only:
+            self.queue = self.server.eio.create_queue()
+            self.buses.setdefault(self.channel, []).append(self.queue)
+        super().initialize()
+
+    def _publish(self, data):
+        message = pickle.dumps(data)
+        for queue in self.buses.get(self.channel, []):
+            if queue is not self.queue:
+                queue.put(message)
+
+    def _listen(self):
+        while True:
+            yield self.queue.get()
+
+
+def make_client_manager(url, channel="flask-socketio"):
+    """
+    Client manager for SOCKETIO_MESSAGE_QUEUE, with live-batch fan-out support.
+
+    Same URL schemes as Flask-SocketIO's message_queue option (redis://,
+    kafka://, zmq+tcp://, anything else goes to kombu), plus local:// for
+    the in-process stand-in. The matching client library must be installed.
+    """
+    if url.startswith("local://"):
+        base = LocalManager
+    elif url.startswith(("redis://", "rediss://")):
+        base = socketio.RedisManager
+    elif url.startswith("kafka://"):
+        base = socketio.KafkaManager
+    elif url.startswith("zmq"):
+        base = socketio.ZmqManager
+    else:
+        base = socketio.KombuManager
+    manager_class = type(f"Fanout{base.__name__}", (FanoutMixin, base), {})
+    return manager_class(url, channel=channel)
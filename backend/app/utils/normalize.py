@@ -0,0 +1,196 @@
+# backend/app/utils/normalize.py
+from datetime import datetime, timezone
+
+SCHEMA_EVE = "eve"            # Suricata EVE JSON
+SCHEMA_UNIFIED2 = "unified2"  # idstools / Unified2 {"Event": {...}}
+SCHEMA_FLAT = "flat"          # flat Snort-style JSON
+
+
+def detect_schema(event: dict) -> str:
+    if "Event" in event:
+        return SCHEMA_UNIFIED2
+    if "event_type" in event or "alert" in event:
+        return SCHEMA_EVE
+    return SCHEMA_FLAT
+
+
+def parse_timestamp(ts):
+    """Parse the timestamp formats seen in exports into an aware UTC datetime."""
+    if not ts:
+        return None
+    if isinstance(ts, (int, float)):
+        return datetime.fromtimestamp(ts, tz=timezone.utc)
+    try:
+        if ts.endswith("Z"):
+            ts = ts[:-1] + "+00:00"
+        elif len(ts) > 5 and ts[-5] in "+-" and ts[-3] != ":":
+            ts = f"{ts[:-2]}:{ts[-2:]}"  # Suricata's "+0000" -> "+00:00"
+        parsed = datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _format_sig_id(sig_id):
+    if isinstance(sig_id, int):
+        return f"signature ID:{sig_id}"
+    return sig_id
+
+
+def _split_ap(ap):
+    """Split a Unified2 style "ip:port" string into (ip, port)."""
+    if not ap or ":" not in ap:
+        return None, None
+    ip, _, port = ap.rpartition(":")
+    try:
+        return ip, int(port)
+    except ValueError:
+        return ip, None
+
+
+# 🔹 Suricata EVE: fields live at the top level and under "alert"
+def _extract_eve(event: dict) -> dict:
+    get = event.get
+    alert = get("alert") or {}
+    return {
+        "timestamp": get("timestamp"),
+        "src_ip": get("src_ip"),
+        "dest_ip": get("dest_ip"),
+        "signature": alert.get("signature") or get("signature"),
+        "severity": alert.get("severity") or get("severity"),
+        "protocol": get("proto") or get("protocol"),
+        "signature_id": _format_sig_id(alert.get("signature_id")),
+        "gid": alert.get("gid"),
+        "pkt_num": get("pkt_num"),
+        "action": get("action"),
+        "src_port": get("src_port"),
+        "dest_port": get("dest_port"),
+    }
+
+
+# 🔹 idstools / Unified2: everything is nested under "Event"
+def _extract_unified2(event: dict) -> dict:
+    ev = event["Event"]
+    get = ev.get
+    alert = get("alert") or {}
+
+    ts = get("event_second")
+    if isinstance(ts, int):
+        micro = get("event_microsecond", 0)
+        ts = datetime.fromtimestamp(ts + micro / 1_000_000, tz=timezone.utc).isoformat()
+
+    return {
+        "timestamp": ts,
+        "src_ip": get("ip_source"),
+        "dest_ip": get("ip_dest"),
+        "signature": alert.get("signature"),
+        "severity": alert.get("severity") or get("priority_id"),
+        "protocol": get("ip_proto"),
+        "signature_id": _format_sig_id(get("signature_id")),
+        "gid": get("generator_id"),
+        "pkt_num": get("event_id"),
+        "action": get("packet_action"),
+        "src_port": get("src_port", get("sport")),
+        "dest_port": get("dest_port", get("dport")),
+    }
+
+
+# 🔹 Flat Snort-style JSON and anything unrecognised: tolerant fallbacks
+def _extract_flat(event: dict) -> dict:
+    get = event.get
+    alert = get("alert") or {}
+
+    src_ap_ip, src_ap_port = _split_ap(get("src_ap"))
+    dst_ap_ip, dst_ap_port = _split_ap(get("dst_ap"))
+
+    ts = get("timestamp") or get("time") or alert.get("timestamp")
+
+    return {
+        "timestamp": ts,
+        "src_ip": get("src_ip") or get("src_addr") or get("src_host") or alert.get("ip_source") or src_ap_ip,
+        "dest_ip": (
+            get("dest_ip") or get("dst_ip") or get("dst_addr") or get("dst_host")
+            or alert.get("ip_destination") or alert.get("ip_dest") or dst_ap_ip
+        ),
+        "signature": alert.get("signature") or get("signature") or get("msg") or get("rule") or get("class"),
+        "severity": alert.get("severity") or alert.get("priority") or get("severity") or get("priority"),
+        "protocol": get("proto") or get("protocol") or alert.get("protocol") or alert.get("ip_proto"),
+        "signature_id": _format_sig_id(alert.get("signature_id") or get("sid") or alert.get("sig_id")),
+        "gid": alert.get("gid") or get("gid"),
+        "pkt_num": get("pkt_num") or get("event_id"),
+        "action": get("action") or alert.get("packet_action"),
+        "src_port": get("src_port") or alert.get("src_port") or get("sport") or src_ap_port,
+        "dest_port": get("dest_port") or alert.get("dest_port") or get("dport") or dst_ap_port,
+    }
+
+
+EXTRACTORS = {
+    SCHEMA_EVE: _extract_eve,
+    SCHEMA_UNIFIED2: _extract_unified2,
+    SCHEMA_FLAT: _extract_flat,
+}
+
+
+class AlertNormalizer:
+    """
+    Normalizer for files and streams.
+
+    The schema is detected from the first event of each stream and its
+    extractor reused for the rest. An upload is one stream; the live path
+    shares one normalizer between agents and keys each call by sensor or
+    connection, since different sensors may export different formats.
+    forget() drops a stream that has ended.
+    """
+
+    def __init__(self, include_original=False):
+        self.include_original = include_original
+        self.schemas = {}     # stream key -> schema of its first event
+        self.extractors = {}  # stream key -> extractor for that schema
+
+    @property
+    def schema(self):
+        """Schema of the default (unkeyed) stream, None before its first event."""
+        return self.schemas.get(None)
+
+    def __call__(self, event: dict, stream=None) -> dict:
+        extract = self.extractors.get(stream)
+        if extract is None:
+            schema = self.schemas[stream] = detect_schema(event)
+            extract = self.extractors[stream] = EXTRACTORS[schema]
+        normalized = extract(event)
+        if self.include_original:
+            normalized["original"] = event
+        return normalized
+
+    def forget(self, stream):
+        self.schemas.pop(stream, None)
+        self.extractors.pop(stream, None)
+
+
+def normalize_alert(alert: dict, include_original=False) -> dict:
+    """One-off normalization; prefer AlertNormalizer for files and streams."""
+    normalized = EXTRACTORS[detect_schema(alert)](alert)
+    if include_original:
+        normalized["original"] = alert
+    return normalized
+
+
+# 🔹 DNS events: lightweight normalization for display
+def dns_to_display(dns_event):
+    rrname = (
+        dns_event.get("dns", {}).get("queries", [{}])[0].get("rrname")
+        if dns_event.get("dns")
+        else "unknown.domain"
+    )
+    return {
+        "timestamp": dns_event.get("timestamp"),
+        "src_ip": dns_event.get("src_ip"),
+        "src_port": dns_event.get("src_port"),
+        "dest_ip": dns_event.get("dest_ip"),
+        "dest_port": dns_event.get("dest_port"),
+        "protocol": dns_event.get("proto"),
+        "signature": f"DNS query for {rrname}",
+        "severity": dns_event.get("severity"),
+    }
@@ -0,0 +1,167 @@
+# backend/app/utils/parallel_ingest.py
+import heapq
+import os
+import pickle
+import struct
+import subprocess
+import sys
+from operator import itemgetter
+
+from app.utils.normalize import AlertNormalizer, parse_timestamp
+from app.utils.stream_parser import iter_events
+
+MIN_CHUNK_BYTES = 1024 * 1024  # don't bother splitting below ~1 MB per worker
+BLOCK_ALERTS = 2000            # alerts per pickled block a worker writes back
+BLOCK_HEADER = struct.Struct("<I")  # byte length of the pickled block that follows
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.dirname(APP_DIR)
+
+# Worker entry point. Only the parsing modules are loaded: an empty `app`
+# package stands in for app/__init__, which would pull in Flask, the models
+# and every route for nothing.
+WORKER_SCRIPT = """
+import sys, types
+app = types.ModuleType("app")
+app.__path__ = [sys.argv[1]]
+sys.modules["app"] = app
+from app.utils.parallel_ingest import worker_main
+worker_main(*sys.argv[2:])
+"""
+
+
+def split_ranges(path, parts):
+    """
+    Split an NDJSON file into at most `parts` (start, end) byte ranges.
+
+    Each boundary is moved forward to just after the next newline, so no line
+    is cut in half and every range can be parsed on its own.
+    """
+    size = os.path.getsize(path)
+    parts = max(1, min(parts, size // MIN_CHUNK_BYTES or 1))
+
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, bounds[-1]))
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def sort_key(alert):
+    """Parsed timestamp in epoch seconds; alerts without a usable one sort first."""
+    parsed = parse_timestamp(alert.get("timestamp"))
+    return parsed.timestamp() if parsed else float("-inf")
+
+
+class _RangeReader:
+    """Binary reader over [start, end) of a file, for iter_events."""
+
+    def __init__(self, f, start, end):
+        f.seek(start)
+        self.f = f
+        self.remaining = end - start
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+def ingest_range(path, start, end):
+    """
+    Parse and normalize the events in [start, end); runs in a worker process.
+
+    Returns (sort_key, alert, byte_offset, byte_length) tuples sorted by
+    timestamp, the offsets pointing at the raw event in the file.
+    """
+    normalize = AlertNormalizer()
+    alerts = []
+    with open(path, "rb") as f:
+        for event, offset, length in iter_events(_RangeReader(f, start, end), with_offsets=True):
+            if event.get("event_type") == "stats":
+                continue
+            alert = normalize(event)
+            alerts.append((sort_key(alert), alert, start + offset, length))
+    alerts.sort(key=itemgetter(0))
+    return alerts
+
+
+def worker_main(path, start, end):
+    """Write the sorted run of one range to stdout as length-prefixed pickled blocks."""
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr  # keep stray prints out of the data stream
+    alerts = ingest_range(path, int(start), int(end))
+    for i in range(0, len(alerts), BLOCK_ALERTS):
+        block = pickle.dumps(alerts[i:i + BLOCK_ALERTS], protocol=pickle.HIGHEST_PROTOCOL)
+        out.write(BLOCK_HEADER.pack(len(block)))
+        out.write(block)
+    out.flush()
+
+
+def _read_exact(pipe, size):
+    data = b""
+    while len(data) < size:
+        chunk = pipe.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _read_run(pipe):
+    """Alerts of one worker's run, a block at a time."""
+    while True:
+        header = _read_exact(pipe, BLOCK_HEADER.size)
+        if len(header) < BLOCK_HEADER.size:
+            return
+        (size,) = BLOCK_HEADER.unpack(header)
+        block = _read_exact(pipe, size)
+        if len(block) < size:
+            raise RuntimeError("parallel ingest worker output was cut short")
+        yield from pickle.loads(block)
+
+
+def parallel_ingest(path, workers):
+    """
+    Normalize an NDJSON file across worker processes.
+
+    Yields (alert, byte_offset, byte_length) in timestamp order. Each worker
+    parses one newline-aligned range, sorts it by parsed timestamp and
+    streams it back over its stdout; the sorted runs are k-way merged here
+    as they arrive, so every alert is pickled once and nothing is spooled
+    to disk.
+
+    Workers are plain subprocesses rather than a process pool: pools
+    deadlock under eventlet.monkey_patch(), and pool workers spawned from
+    the server would re-import run.py. Under eventlet the subprocess module
+    and its pipes are green, so waiting on the workers doesn't block the hub.
+    """
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, APP_DIR, path, str(start), str(end)],
+            cwd=BACKEND_DIR,
+            stdout=subprocess.PIPE,
+        )
+        for start, end in split_ranges(path, workers)
+    ]
+    try:
+        runs = [_read_run(proc.stdout) for proc in procs]
+        for _, alert, offset, length in heapq.merge(*runs, key=itemgetter(0)):
+            yield alert, offset, length
+        for proc in procs:
+            if proc.wait() != 0:
+                raise RuntimeError(f"parallel ingest worker exited with status {proc.returncode}")
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
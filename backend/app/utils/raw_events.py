@@ -0,0 +1,193 @@
+# backend/app/utils/raw_events.py
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from app.utils.compression import FORMATS
+
+# One fixed-size entry per normalized alert: byte offset and length of the
+# raw event inside the (decompressed) upload, so entry n lives at n * INDEX_ENTRY.size
+INDEX_ENTRY = struct.Struct("<QI")
+# Compressed uploads: after the entries, one restart point per compressed block,
+# (decompressed offset, file offset), then a trailer with their count
+RESTART_POINT = struct.Struct("<QQ")
+RESTART_TRAILER = struct.Struct("<Q8s")
+RESTART_MAGIC = b"RESTARTS"
+
+BLOCK_EXT = ".gz"           # compressed uploads are stored as blocked gzip
+BLOCK_BYTES = 256 * 1024    # decompressed bytes per independently compressed block
+BLOCK_LEVEL = 6
+SKIP_CHUNK = 1024 * 1024
+
+
+class RawIndexWriter:
+    """Appends (offset, length) entries to a temp file renamed into place on commit()."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, suffix=".idx.tmp")
+        self.file = os.fdopen(fd, "wb")
+        self.count = 0
+
+    def add(self, offset, length):
+        """Record one raw event and return its index."""
+        self.file.write(INDEX_ENTRY.pack(offset, length))
+        self.count += 1
+        return self.count - 1
+
+    def commit(self, path, restart_points=None):
+        """Publish the index; restart_points come from the BlockWriter of a compressed upload."""
+        if restart_points is not None:
+            for point in restart_points:
+                self.file.write(RESTART_POINT.pack(*point))
+            self.file.write(RESTART_TRAILER.pack(len(restart_points), RESTART_MAGIC))
+        self.file.close()
+        os.replace(self.tmp_path, path)
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class BlockWriter:
+    """
+    Stores a compressed upload as gzip blocks that decompress independently.
+
+    The decompressed stream is written back in BLOCK_BYTES pieces, each its
+    own gzip member, so the file is still an ordinary .gz while any block
+    can be read without inflating what comes before it. restart_points
+    lists where each block starts, for the raw-event index.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        self.file = os.fdopen(fd, "wb")
+        self.pending = bytearray()
+        self.restart_points = []  # (decompressed offset, file offset) per block
+        self.offset = 0
+        self.file_offset = 0
+
+    def write(self, data):
+        self.pending += data
+        while len(self.pending) >= BLOCK_BYTES:
+            self._write_block(BLOCK_BYTES)
+
+    def _write_block(self, size):
+        block = self.pending[:size]
+        del self.pending[:size]
+        gz = zlib.compressobj(BLOCK_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip member
+        member = gz.compress(block) + gz.flush()
+        self.file.write(member)
+        self.restart_points.append((self.offset, self.file_offset))
+        self.offset += len(block)
+        self.file_offset += len(member)
+
+    def tee(self, stream):
+        """Reader over `stream` that writes everything read through it here."""
+        return _TeeReader(stream, self)
+
+    def commit(self, path):
+        if self.pending:
+            self._write_block(len(self.pending))
+        self.file.close()
+        os.replace(self.tmp_path, path)
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class _TeeReader:
+    def __init__(self, stream, sink):
+        self.stream = stream
+        self.sink = sink
+
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.sink.write(chunk)
+        return chunk
+
+    def drain(self):
+        """Read the rest of the stream through, e.g. whatever follows a closing "]"."""
+        while self.read(SKIP_CHUNK):
+            pass
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _restart_point(mm, size, offset):
+    """(entries end, nearest restart point at or before `offset`) from a mapped index."""
+    if size < RESTART_TRAILER.size:
+        return size, None
+    count, magic = RESTART_TRAILER.unpack_from(mm, size - RESTART_TRAILER.size)
+    if magic != RESTART_MAGIC:
+        return size, None  # plain upload (or indexed before restart points)
+    start = size - RESTART_TRAILER.size - count * RESTART_POINT.size
+    if offset is None or not count:
+        return start, None
+    lo, hi = 0, count - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if RESTART_POINT.unpack_from(mm, start + mid * RESTART_POINT.size)[0] <= offset:
+            lo = mid
+        else:
+            hi = mid - 1
+    return start, RESTART_POINT.unpack_from(mm, start + lo * RESTART_POINT.size)
+
+
+def _skip(reader, count):
+    while count > 0:
+        chunk = reader.read(min(count, SKIP_CHUNK))
+        if not chunk:
+            break
+        count -= len(chunk)
+        time.sleep(0)  # green under eventlet.monkey_patch(): lets the hub run
+
+
+def read_raw_event(content_path, index_path, n):
+    """
+    Return the raw bytes of event n of an upload.
+
+    Both the index and a plain upload are memory-mapped, so only the pages
+    holding the index entry and the event itself are read from disk. A
+    compressed upload is decompressed from the restart point of the block
+    holding the event, never from the start of the file, and nothing
+    decompressed is written to disk.
+    """
+    fmt = next((fmt for fmt in FORMATS if content_path.endswith(fmt[1])), None)
+    with open(index_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if n < 0 or size < (n + 1) * INDEX_ENTRY.size:
+            raise IndexError(n)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            entries_end, _ = _restart_point(mm, size, None)
+            if entries_end < (n + 1) * INDEX_ENTRY.size:
+                raise IndexError(n)
+            offset, length = INDEX_ENTRY.unpack_from(mm, n * INDEX_ENTRY.size)
+            point = _restart_point(mm, size, offset)[1] if fmt else None
+
+    if fmt is None:
+        with open(content_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[offset:offset + length]
+
+    # Without restart points (an upload stored before blocks) the whole prefix is inflated
+    block_offset, file_offset = point or (0, 0)
+    with open(content_path, "rb") as f:
+        f.seek(file_offset)
+        with fmt[2](f) as reader:
+            _skip(reader, offset - block_offset)
+            return reader.read(length)
@@ -0,0 +1,136 @@
+# backend/app/utils/stream_parser.py
+import codecs
+import itertools
+import json
+
+CHUNK_SIZE = 64 * 1024  # bytes read from the upload per iteration
+MAX_EVENT_SIZE = 16 * 1024 * 1024  # refuse to buffer a single event past this
+_WHITESPACE = " \t\r\n"
+
+_decoder = json.JSONDecoder()
+
+
+def _read_text(stream, chunk_size):
+    """Yield decoded text chunks from a binary (or text) file-like object."""
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+    tail = utf8.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _byte_len(text):
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def _iter_ndjson(first, chunks, offset):
+    """One event per line; only the current partial line is kept in memory."""
+    pending = ""
+    for chunk in itertools.chain((first,), chunks):
+        pending += chunk
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if len(pending) > MAX_EVENT_SIZE:
+            raise ValueError("NDJSON line exceeds maximum event size")
+        for line in lines:
+            parsed = _parse_line(line, offset)
+            if parsed is not None:
+                yield parsed
+            offset += _byte_len(line) + 1
+    parsed = _parse_line(pending, offset)
+    if parsed is not None:
+        yield parsed
+
+
+def _parse_line(line, offset):
+    stripped = line.strip()
+    if not stripped:
+        return None
+    try:
+        event = json.loads(stripped)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    lead = _byte_len(line[:len(line) - len(line.lstrip())])
+    return event, offset + lead, _byte_len(stripped)
+
+
+def _iter_array(first, chunks, offset):
+    """Decode a top-level JSON array element by element with raw_decode."""
+    start = first.index("[") + 1
+    buf = first[start:]
+    base = offset + _byte_len(first[:start])  # byte offset of buf[pos]
+    pos = 0
+    exhausted = False
+
+    while True:
+        # Skip separators between elements (always single-byte characters)
+        while pos < len(buf) and (buf[pos] in _WHITESPACE or buf[pos] == ","):
+            pos += 1
+            base += 1
+
+        if pos < len(buf) and buf[pos] == "]":
+            return
+
+        try:
+            if pos >= len(buf):
+                raise ValueError("need more data")
+            event, end = _decoder.raw_decode(buf, pos)
+        except ValueError:
+            if exhausted:
+                if buf[pos:].strip():
+                    raise ValueError("Truncated JSON array")
+                return
+            # Drop what has been consumed and pull in the next chunk
+            buf = buf[pos:]
+            pos = 0
+            if len(buf) > MAX_EVENT_SIZE:
+                raise ValueError("JSON array element exceeds maximum event size")
+            try:
+                buf += next(chunks)
+            except StopIteration:
+                exhausted = True
+            continue
+
+        length = _byte_len(buf[pos:end])
+        if isinstance(event, dict):
+            yield event, base, length
+        pos = end
+        base += length
+
+
+def iter_events(stream, chunk_size=CHUNK_SIZE, with_offsets=False):
+    """
+    Incrementally parse a Suricata/Snort/idstools export.
+
+    Works on both a top-level JSON array and NDJSON (one event per line),
+    decided by the first non-whitespace character. Memory use is bounded by
+    the chunk size plus the largest single event, not by the file size.
+
+    With with_offsets=True, yields (event, byte_offset, byte_length) so the
+    raw event can be read back from the file later without re-parsing it.
+    """
+    chunks = _read_text(stream, chunk_size)
+
+    first = ""
+    for chunk in chunks:
+        first += chunk
+        if first.strip():
+            break
+
+    stripped = first.lstrip()
+    if not stripped:
+        return iter(())
+    offset = _byte_len(first[:len(first) - len(stripped)])
+    if stripped[0] == "[":
+        events = _iter_array(stripped, chunks, offset)
+    else:
+        events = _iter_ndjson(stripped, chunks, offset)
+    if with_offsets:
+        return events
+    return (event for event, _, _ in events)
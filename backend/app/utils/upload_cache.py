@@ -0,0 +1,187 @@
+# backend/app/utils/upload_cache.py
+import hashlib
+import os
+import tempfile
+import threading
+
+HASH_CHUNK = 1024 * 1024
+REPLAY_CHUNK = 64 * 1024
+
+
+def hash_stream(stream):
+    """SHA-256 of a seekable upload; leaves the stream rewound for parsing."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(HASH_CHUNK), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class HashingReader:
+    """
+    Wraps a non-seekable stream and hashes bytes as the parser pulls them,
+    optionally copying them to a sink file on the way through.
+    """
+
+    def __init__(self, stream, sink=None):
+        self.stream = stream
+        self.sink = sink
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.digest.update(chunk)
+        if self.sink is not None:
+            self.sink.write(chunk)
+        return chunk
+
+    def hexdigest(self):
+        # Hash whatever the parser left unread (e.g. after a closing "]")
+        for _ in iter(lambda: self.read(HASH_CHUNK), b""):
+            pass
+        return self.digest.hexdigest()
+
+
+class _CacheEntryWriter:
+    """Temp file that only becomes a cache entry when commit() is called."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        fd, self.tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+        self.file = os.fdopen(fd, "w", encoding="utf-8")
+
+    def write(self, text):
+        self.file.write(text)
+
+    def commit(self, digest, rewrite=None):
+        """Publish the entry; `rewrite`, if given, maps each line on the way."""
+        self.file.close()
+        if rewrite is not None:
+            written = self.tmp_path
+            fd, self.tmp_path = tempfile.mkstemp(dir=self.cache.directory, suffix=".tmp")
+            with open(written, "r", encoding="utf-8") as src, os.fdopen(fd, "w", encoding="utf-8") as dst:
+                for line in src:
+                    dst.write(rewrite(line))
+            os.remove(written)
+        os.replace(self.tmp_path, self.cache.path(digest))
+        self.cache.evict()
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class UploadCache:
+    """
+    Disk-backed cache of normalized upload results keyed by content hash.
+
+    Each entry is the NDJSON of normalized alerts for one upload. Files in
+    `content_directory` (stored uploads, raw-event indexes) named after the
+    same id belong to the entry and count towards the same budget. Recency
+    is tracked through file mtimes (refreshed on every hit) and the least
+    recently used entries, with their files, are deleted once the total size
+    exceeds max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes, content_directory=None):
+        self.directory = directory
+        self.content_directory = content_directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.directory, f"{digest}.ndjson")
+
+    def get(self, digest):
+        """Path of the cached result, or None. A hit marks the entry as recently used."""
+        if not digest:
+            return None
+        path = self.path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def touch(self, name):
+        """Mark the entry `name` as recently used through one of its content files."""
+        if self.content_directory:
+            try:
+                os.utime(os.path.join(self.content_directory, name))
+            except FileNotFoundError:
+                pass
+
+    def writer(self):
+        return _CacheEntryWriter(self)
+
+    def _scan(self):
+        """{id: [mtime, size, paths]}, grouping every file by the id before its first dot."""
+        groups = {}
+        for directory in (self.directory, self.content_directory):
+            if not directory or not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if entry.name.endswith(".tmp") or not entry.is_file():
+                    continue  # uploads still being written
+                stat = entry.stat()
+                group = groups.setdefault(entry.name.partition(".")[0], [0.0, 0, []])
+                group[0] = max(group[0], stat.st_mtime)
+                group[1] += stat.st_size
+                group[2].append(entry.path)
+        return groups
+
+    def evict(self):
+        with self.lock:
+            groups = self._scan()
+            total = sum(size for _, size, _ in groups.values())
+            for _, size, paths in sorted(groups.values()):
+                if total <= self.max_bytes:
+                    break
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+
+
+def replay_ndjson(path):
+    """Yield a cached NDJSON result in fixed-size chunks."""
+    with open(path, "r", encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(REPLAY_CHUNK), ""):
+            yield chunk
+
+
+def replay_json(path):
+    """Yield a cached NDJSON result re-framed as {"alerts": [...]} without parsing it."""
+    yield '{"alerts": ['
+    first = True
+    out = []
+    size = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            out.append(line if first else "," + line)
+            first = False
+            size += len(line)
+            if size >= REPLAY_CHUNK:
+                yield "".join(out)
+                out = []
+                size = 0
+    out.append("]}")
+    yield "".join(out)
+
+
+_caches = {}
+
+
+def get_upload_cache(directory, max_bytes, content_directory=None):
+    """One UploadCache per directory for the whole process."""
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = _caches[directory] = UploadCache(directory, max_bytes, content_directory)
+    return cache
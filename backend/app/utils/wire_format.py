@@ -0,0 +1,66 @@
+# backend/app/utils/wire_format.py
+try:
+    import msgpack
+except ImportError:  # optional; clients asking for msgpack get columnar JSON instead
+    msgpack = None
+
+JSON = "json"
+COLUMNAR = "columnar"
+MSGPACK = "msgpack"
+FORMATS = (JSON, COLUMNAR, MSGPACK)
+
+
+def negotiate(requested):
+    """Wire format to use for a client that asked for `requested`."""
+    if requested == MSGPACK and msgpack is None:
+        return COLUMNAR
+    return requested if requested in FORMATS else JSON
+
+
+def to_columns(alerts):
+    """
+    Column-oriented form of a batch with a per-batch string dictionary.
+
+    Every key becomes one array with a value per alert (null where missing).
+    String columns that repeat values (IPs, signatures, protocols...) hold
+    indexes into "strings" instead, and are listed in "dict"; a batch of a
+    few distinct talkers then sends each address once rather than per alert.
+    """
+    keys = {}
+    for alert in alerts:
+        for key in alert:
+            keys.setdefault(key, None)
+
+    strings = []
+    string_ids = {}
+    columns = {}
+    dict_columns = []
+    for key in keys:
+        values = [alert.get(key) for alert in alerts]
+        present = [v for v in values if v is not None]
+        if present and all(isinstance(v, str) for v in present) and len(set(present)) < len(present):
+            encoded = []
+            for v in values:
+                if v is None:
+                    encoded.append(None)
+                    continue
+                idx = string_ids.get(v)
+                if idx is None:
+                    idx = string_ids[v] = len(strings)
+                    strings.append(v)
+                encoded.append(idx)
+            columns[key] = encoded
+            dict_columns.append(key)
+        else:
+            columns[key] = values
+    return {"format": COLUMNAR, "count": len(alerts), "strings": strings, "dict": dict_columns, "columns": columns}
+
+
+def encode_batch(alerts, fmt=JSON, **extra):
+    """bulk_alerts payload for a batch in the given wire format; extra keys ride along."""
+    if fmt == JSON:
+        return {"alerts": alerts, **extra}
+    payload = {**to_columns(alerts), **extra}
+    if fmt == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return payload
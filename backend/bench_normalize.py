@@ -0,0 +1,45 @@
+# backend/bench_normalize.py
+# Micro-benchmark for the alert normalizer against the sample exports.
+#
+#   python bench_normalize.py [--rounds 2000]
+import argparse
+import glob
+import os
+import time
+
+from app.utils.normalize import AlertNormalizer, normalize_alert
+from app.utils.stream_parser import iter_events
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources")
+
+
+def time_per_event(fn, events, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            fn(event)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(events)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-event normalization cost")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'file':<28}{'schema':<10}{'events':>7}{'cached ns/ev':>14}{'detect ns/ev':>14}")
+    for path in sorted(glob.glob(os.path.join(RESOURCES, "*.json"))):
+        with open(path, "rb") as f:
+            events = [e for e in iter_events(f) if e.get("event_type") != "stats"]
+        if not events:
+            continue
+
+        normalizer = AlertNormalizer()
+        cached = time_per_event(normalizer, events, args.rounds)
+        per_event = time_per_event(normalize_alert, events, args.rounds)
+
+        print(f"{os.path.basename(path):<28}{normalizer.schema:<10}{len(events):>7}{cached:>14.0f}{per_event:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
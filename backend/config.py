@@ -14,4 +14,37 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
-    SECRET_KEY = os.getenv('SECRET_KEY')
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY')
+
+    # Parallel ingest for large NDJSON uploads
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', os.cpu_count() or 1))
+    PARALLEL_INGEST_MIN_BYTES = int(os.getenv('PARALLEL_INGEST_MIN_BYTES', 8 * 1024 * 1024))
+
+    # Disk cache of normalized upload results, evicted LRU by total size
+    UPLOAD_CACHE_MAX_BYTES = int(os.getenv('UPLOAD_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+    # Live alert buffer: bounded, flushed by batch size or delay, whichever comes first
+    LIVE_BUFFER_CAPACITY = int(os.getenv('LIVE_BUFFER_CAPACITY', 50000))
+    LIVE_BUFFER_POLICY = os.getenv('LIVE_BUFFER_POLICY', 'drop_oldest')  # drop_oldest | drop_lowest_severity | coalesce
+    LIVE_FLUSH_MAX_BATCH = int(os.getenv('LIVE_FLUSH_MAX_BATCH', 1000))
+    LIVE_FLUSH_MAX_DELAY = float(os.getenv('LIVE_FLUSH_MAX_DELAY', 0.25))
+    LIVE_REPLAY_SIZE = int(os.getenv('LIVE_REPLAY_SIZE', 20000))  # recent alerts kept for reconnect replay
+
+    # Multi-worker: URL of the message queue the Socket.IO servers share (redis://, kafka://, amqp://,
+    # or local:// for the in-process stand-in). Unset runs a single self-contained worker.
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'sentinel-alerts')
+
+    # GeoIP lookup cache (entries, seconds); negative entries cover private and unknown addresses
+    GEO_CACHE_SIZE = int(os.getenv('GEO_CACHE_SIZE', 100000))
+    GEO_CACHE_TTL = int(os.getenv('GEO_CACHE_TTL', 24 * 3600))
+    GEO_NEGATIVE_TTL = int(os.getenv('GEO_NEGATIVE_TTL', 3600))
+    # Attach src/dest lat, lon and country to alerts as they are ingested (uploads and live stream)
+    GEO_ENRICH = os.getenv('GEO_ENRICH', 'false').lower() in ('1', 'true', 'yes')
+    GEO_GRID_MAX_ZOOM = int(os.getenv('GEO_GRID_MAX_ZOOM', 10))  # finest lat/lon grid kept for /api/geo/bins
+    GEO_BINS_FOLD_INTERVAL = float(os.getenv('GEO_BINS_FOLD_INTERVAL', 5))  # seconds between background folds
+    GEO_BINS_PENDING_MAX = int(os.getenv('GEO_BINS_PENDING_MAX', 50000))  # distinct IPs waiting before an early fold
+
+    # Threat intel: provider responses are cached in the database for this long (seconds)
+    THREAT_INTEL_TTL = int(os.getenv('THREAT_INTEL_TTL', 24 * 3600))
+    THREAT_INTEL_TIMEOUT = float(os.getenv('THREAT_INTEL_TIMEOUT', 10))  # per upstream request
\ No newline at end of file
@@ -1,18 +1,19 @@
 import eventlet
 eventlet.monkey_patch()
+import os
 from app import create_app, socketio
 from app.routes.socketIO import AlertsNamespace, start_bulk_sender
 
 app = create_app()
 socketio.on_namespace(AlertsNamespace("/api/alerts/stream"))
-start_bulk_sender()
+start_bulk_sender(app)
 
 
 if __name__ == "__main__":
     socketio.run(
         app,
         host="0.0.0.0",
-        port=5000,
+        port=int(os.getenv("PORT", 5000)),  # one port per worker when running several
         debug=True,
         use_reloader=False
     )
@@ -0,0 +1,24 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+# Tests import the app the way run.py does, from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db_app():
+    """Bare app on an in-memory SQLite database, for code that needs db inside an app context."""
+    from app import db
+    from app import models  # registers every model with db before create_all
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
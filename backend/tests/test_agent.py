@@ -0,0 +1,46 @@
+# backend/tests/test_agent.py
+import json
+import os
+
+import pytest
+
+import agent
+
+CONFIG = {
+    "filter": {"drop_event_types": ["flow"]},
+    "sensors": [
+        {"id": "dmz", "path": "/var/log/dmz/eve.json"},
+        {"id": "lan", "path": "/var/log/lan/eve.json", "filter": {"min_severity": 2}},
+    ],
+}
+
+
+def test_sensor_comes_from_the_config_or_the_command_line():
+    assert agent.resolve_sensor(CONFIG) == ("dmz", "/var/log/dmz/eve.json", {"drop_event_types": ["flow"]})
+    assert agent.resolve_sensor(CONFIG, sensor_id="lan") == ("lan", "/var/log/lan/eve.json", {"min_severity": 2})
+
+    sensor_id, path, _ = agent.resolve_sensor(CONFIG, eve_path="/srv/eve.json")
+    assert path == "/srv/eve.json" and sensor_id == agent.sensor_id_for("/srv/eve.json")
+    assert agent.resolve_sensor(CONFIG, sensor_id="new", eve_path="/srv/eve.json")[0] == "new"
+
+    with pytest.raises(SystemExit):
+        agent.resolve_sensor(CONFIG, sensor_id="missing")
+
+
+def test_agents_on_different_files_get_different_ids():
+    a = agent.sensor_id_for(r"C:\Program Files\Suricata\log\eve.json")
+    b = agent.sensor_id_for(r"D:\Program Files\Suricata\log\eve.json")
+    assert a != b and a == agent.sensor_id_for(r"C:\Program Files\Suricata\log\eve.json")
+
+
+def test_legacy_checkpoint_is_adopted_only_by_its_own_file(tmp_path, monkeypatch):
+    legacy = tmp_path / "eve_checkpoint.json"
+    eve = tmp_path / "eve.json"
+    legacy.write_text(json.dumps({"path": os.path.normcase(os.path.abspath(eve)), "inode": 1, "offset": 5}))
+    monkeypatch.setattr(agent, "LEGACY_CHECKPOINT_PATH", str(legacy))
+
+    agent.adopt_legacy_checkpoint(str(tmp_path / "other.json"), str(tmp_path / "other-ck.json"))
+    assert legacy.exists() and not (tmp_path / "other-ck.json").exists()
+
+    agent.adopt_legacy_checkpoint(str(eve), str(tmp_path / "eve-ck.json"))
+    assert not legacy.exists() and json.loads((tmp_path / "eve-ck.json").read_text())["offset"] == 5
@@ -0,0 +1,78 @@
+# backend/tests/test_agent_async.py
+import asyncio
+import json
+import os
+
+import pytest
+
+import agent_async
+from agent_async import Sensor, report_delivered
+
+FILTER = {"drop_event_types": ["flow"]}
+
+
+@pytest.fixture
+def checkpoints(tmp_path, monkeypatch):
+    directory = tmp_path / "checkpoints"
+    directory.mkdir()
+    monkeypatch.setattr(agent_async, "CHECKPOINT_DIR", str(directory))
+    return directory
+
+
+def _append(path, *events):
+    with open(path, "ab") as f:
+        for event in events:
+            f.write(json.dumps(event).encode() + b"\n")
+    return os.path.getsize(path)
+
+
+def _saved_offset(checkpoints, sensor_id):
+    with open(checkpoints / f"{sensor_id}.json", encoding="utf-8") as f:
+        return json.load(f)["offset"]
+
+
+def _sensor(tmp_path, sensor_id):
+    eve = tmp_path / f"{sensor_id}.json"
+    eve.write_bytes(b"")
+    sensor = Sensor(sensor_id, str(eve), FILTER, asyncio.Queue())
+    sensor.tailer.step()  # no checkpoint yet: starts at the (empty) end
+    return sensor, eve
+
+
+def test_checkpoint_moves_only_past_delivered_events(tmp_path, checkpoints):
+    sensor, eve = _sensor(tmp_path, "dmz")
+    first = _append(eve, {"event_type": "alert", "n": 1}, {"event_type": "flow"})
+    end = _append(eve, {"event_type": "alert", "n": 2}, {"event_type": "flow"})
+    sensor.tailer.step()
+
+    assert [e["n"] for e in sensor.events] == [1, 2]
+    assert all(e["sensor_id"] == "dmz" for e in sensor.events)
+    assert _saved_offset(checkpoints, "dmz") == 0  # read, but nothing delivered yet
+
+    sensor.delivered(1)  # the dropped flow after n=1 rides along with it
+    assert _saved_offset(checkpoints, "dmz") == first
+    sensor.delivered(1)
+    assert _saved_offset(checkpoints, "dmz") == end and not sensor.positions
+
+
+def test_filtered_lines_with_nothing_pending_still_advance(tmp_path, checkpoints):
+    sensor, eve = _sensor(tmp_path, "lan")
+    end = _append(eve, {"event_type": "flow"}, {"event_type": "flow"})
+    sensor.tailer.step()
+    assert not sensor.events and _saved_offset(checkpoints, "lan") == end
+
+
+def test_mixed_batches_are_credited_to_each_sensor(tmp_path, checkpoints):
+    dmz, dmz_eve = _sensor(tmp_path, "dmz")
+    lan, lan_eve = _sensor(tmp_path, "lan")
+    dmz_first = _append(dmz_eve, {"event_type": "alert"})
+    _append(dmz_eve, {"event_type": "alert"})
+    lan_end = _append(lan_eve, {"event_type": "alert"})
+    dmz.tailer.step()
+    lan.tailer.step()
+
+    batch = [dmz.events[0], lan.events[0]]  # interleaved in the shared queue
+    report_delivered({"dmz": dmz, "lan": lan}, batch)
+    assert _saved_offset(checkpoints, "dmz") == dmz_first
+    assert _saved_offset(checkpoints, "lan") == lan_end
+    assert len(dmz.positions) == 1 and not lan.positions
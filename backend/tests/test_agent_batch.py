@@ -0,0 +1,49 @@
+# backend/tests/test_agent_batch.py
+import time
+
+from agent_batch import AlertBatcher
+
+
+def test_size_and_delay_flushes_report_the_last_position():
+    sent, committed = [], []
+    batcher = AlertBatcher(sent.append, max_size=2, max_delay=0.05, on_sent=committed.append)
+    batcher.add("a", 10)
+    batcher.add("b", 20)  # full: goes out now
+    batcher.add("c", 30)
+    assert sent == [["a", "b"]] and committed == [20]
+
+    time.sleep(0.2)  # the timer flushes the quiet batch
+    assert sent == [["a", "b"], ["c"]] and committed == [20, 30]
+
+
+def test_skipped_lines_ride_with_the_pending_batch():
+    sent, committed = [], []
+    batcher = AlertBatcher(sent.append, max_size=10, max_delay=60, on_sent=committed.append)
+    assert batcher.skip(5) is False  # nothing pending: the caller checkpoints it
+    batcher.add("a", 10)
+    assert batcher.skip(15) is True
+    batcher.flush()
+    assert sent == [["a"]] and committed == [15]
+
+
+def test_position_is_not_reported_when_sending_fails():
+    committed = []
+
+    def broken(batch):
+        raise OSError("disk full")
+
+    batcher = AlertBatcher(broken, max_size=1, on_sent=committed.append)
+    try:
+        batcher.add("a", 10)
+    except OSError:
+        pass
+    assert committed == []
+
+
+def test_flush_can_use_another_sender():
+    sent, other, committed = [], [], []
+    batcher = AlertBatcher(sent.append, max_delay=60, on_sent=committed.append)
+    batcher.add("a", 1)
+    batcher.flush(other.append)
+    batcher.flush(other.append)  # nothing left
+    assert sent == [] and other == [["a"]] and committed == [1]
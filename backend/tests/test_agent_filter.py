@@ -0,0 +1,44 @@
+# backend/tests/test_agent_filter.py
+import json
+
+from agent_filter import EventFilter, load_agent_config
+
+
+def _line(**event):
+    return json.dumps(event, separators=(",", ":")).encode()
+
+
+def test_dropped_types_are_rejected_without_decoding():
+    event_filter = EventFilter()
+    # Not even valid JSON past the event type: rejected before json.loads runs
+    assert event_filter.check(b'{"event_type":"flow","flow":{') is None
+    assert event_filter.check(_line(event_type="stats")) is None
+    assert event_filter.check(_line(event_type="dns", src_ip="10.0.0.1")) == {"event_type": "dns", "src_ip": "10.0.0.1"}
+    assert event_filter.dropped == 2
+
+
+def test_severity_subnets_and_allowlist():
+    event_filter = EventFilter({
+        "event_types": ["alert"],
+        "min_severity": 2,
+        "ignore_subnets": ["10.0.0.0/8", "fe80::/10"],
+    })
+    assert event_filter.check(_line(event_type="alert", alert={"severity": 2}, src_ip="192.0.2.1"))
+    assert event_filter.check(_line(event_type="alert", alert={"severity": 3})) is None
+    assert event_filter.check(_line(event_type="alert", alert={"severity": 1}, dest_ip="10.1.2.3")) is None
+    assert event_filter.check(_line(event_type="alert", alert={"severity": 1}, src_ip="fe80::1")) is None
+    assert event_filter.check(_line(event_type="http")) is None  # not on the allowlist
+    assert event_filter.dropped == 4
+
+
+def test_lines_the_byte_sniff_misses_are_checked_decoded():
+    event_filter = EventFilter({"min_severity": 1, "ignore_subnets": ["10.0.0.0/8"]})
+    # An escaped key hides event_type from the regex; the decoded event is filtered instead
+    hidden = b'{"event\\u005ftype": "alert", "alert": {"severity": 3}}'
+    assert event_filter.check(hidden) is None
+    assert event_filter.check(b'{"event\\u005ftype": "flow"}') is None
+    assert event_filter.check(b'{"event\\u005ftype": "alert", "alert": {"severity": 1}}') == {"event_type": "alert", "alert": {"severity": 1}}
+
+
+def test_missing_config_file_means_defaults(tmp_path):
+    assert load_agent_config(str(tmp_path / "absent.json")) == {}
@@ -0,0 +1,103 @@
+# backend/tests/test_agent_link.py
+import asyncio
+from threading import Event, Thread
+
+from agent_link import AsyncServerLink, ServerLink, open_spool
+from agent_spool import DiskSpool
+
+NAMESPACE = "/api/alerts/stream"
+
+
+class FakeClient:
+    """Just enough of socketio.Client for ServerLink; records what would go over the wire."""
+
+    def __init__(self, connected=True, fail=False):
+        self.connected = connected
+        self.namespaces = {NAMESPACE: "sid"} if connected else {}
+        self.fail = fail
+        self.emitted = []
+        self.called = []
+
+    def emit(self, event, data, namespace=None):
+        if self.fail:
+            raise ConnectionError("gone")
+        self.emitted.append(data["events"])
+
+    def call(self, event, data, namespace=None, timeout=None):
+        if self.fail:
+            raise TimeoutError()
+        self.called.append(data["events"])
+        return len(data["events"])
+
+
+class FakeAsyncClient(FakeClient):
+    async def emit(self, *args, **kwargs):
+        FakeClient.emit(self, *args, **kwargs)
+
+    async def call(self, *args, **kwargs):
+        return FakeClient.call(self, *args, **kwargs)
+
+
+def test_sends_directly_only_while_connected_and_spool_is_empty(tmp_path):
+    sio = FakeClient(connected=False)
+    link = ServerLink(sio, "http://x", DiskSpool(str(tmp_path)))
+    link.send_batch([1])            # offline: spooled
+    sio.connected, sio.namespaces = True, {NAMESPACE: "sid"}
+    link.send_batch([2])            # online, but queues behind the spool
+    assert sio.emitted == [] and link.wake.is_set()
+
+    stop = Event()
+    drainer = Thread(target=link.drain_spool, args=(stop,))
+    drainer.start()
+    for _ in range(200):
+        if link.spool.empty():
+            break
+        stop.wait(0.01)
+    stop.set()
+    drainer.join()
+    assert sio.called == [[1], [2]]
+
+    link.send_batch([3])
+    assert sio.emitted == [[3]]
+
+
+def test_failed_emit_falls_back_to_the_spool(tmp_path):
+    link = ServerLink(FakeClient(fail=True), "http://x", DiskSpool(str(tmp_path)))
+    link.send_batch([1, 2])
+    assert link.spool.peek()[0] == [1, 2]
+
+
+def test_shutdown_flush_acks_or_spools_in_chunks(tmp_path):
+    sio = FakeClient()
+    link = ServerLink(sio, "http://x", DiskSpool(str(tmp_path / "a")))
+    link.flush_on_shutdown(list(range(1200)))
+    assert [len(c) for c in sio.called] == [500, 500, 200]
+
+    offline = ServerLink(FakeClient(fail=True), "http://x", DiskSpool(str(tmp_path / "b")))
+    offline.flush_on_shutdown(list(range(600)))
+    first, token = offline.spool.peek()
+    offline.spool.commit(token)
+    assert len(first) == 500 and len(offline.spool.peek()[0]) == 100
+
+
+def test_async_link_follows_the_same_policy(tmp_path):
+    async def scenario():
+        sio = FakeAsyncClient(connected=False)
+        link = AsyncServerLink(sio, "http://x", DiskSpool(str(tmp_path)), drain_rate=1000)
+        await link.send_batch([1])
+        sio.connected, sio.namespaces = True, {NAMESPACE: "sid"}
+        await link.flush_on_shutdown([2])  # spool not empty: spooled behind [1]
+        drainer = asyncio.create_task(link.drain_spool())
+        while not link.spool.empty():
+            await asyncio.sleep(0.01)
+        drainer.cancel()
+        await link.send_batch([3])
+        return sio
+
+    sio = asyncio.run(scenario())
+    assert sio.called == [[1], [2]] and sio.emitted == [[3]]
+
+
+def test_open_spool_uses_the_configured_directory(tmp_path):
+    spool = open_spool({"directory": str(tmp_path / "custom"), "max_bytes": 1234}, str(tmp_path / "default"))
+    assert spool.directory == str(tmp_path / "custom") and spool.max_bytes == 1234
@@ -0,0 +1,110 @@
+# backend/tests/test_agent_tail.py
+import json
+import os
+
+from agent_tail import EveTailer
+
+
+class Collector:
+    def __init__(self):
+        self.lines = []
+        self.positions = []
+
+    def __call__(self, line, position):
+        self.lines.append(line)
+        self.positions.append(position)
+
+
+def _append(path, *lines):
+    with open(path, "ab") as f:
+        for line in lines:
+            f.write(line + b"\n")
+
+
+def _checkpoint(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_first_run_starts_at_the_end_and_saves_that_point(tmp_path):
+    eve, ck = tmp_path / "eve.json", tmp_path / "ck.json"
+    _append(eve, b'{"old": 1}')
+    got = Collector()
+    tailer = EveTailer(str(eve), got, str(ck))
+    tailer.step()
+    _append(eve, b'{"new": 1}', b"", b'{"new": 2}')
+    tailer.step()
+    assert got.lines == [b'{"new": 1}', b'{"new": 2}']
+    assert got.positions[-1] == (os.stat(eve).st_ino, os.path.getsize(eve))
+    assert _checkpoint(ck)["offset"] == len(b'{"old": 1}\n')
+
+
+def test_checkpoint_only_moves_on_commit(tmp_path):
+    eve, ck = tmp_path / "eve.json", tmp_path / "ck.json"
+    eve.write_bytes(b"")
+    got = Collector()
+    tailer = EveTailer(str(eve), got, str(ck))
+    tailer.step()
+    _append(eve, b"a", b"b", b"c")
+    tailer.step()
+    assert _checkpoint(ck)["offset"] == 0  # read, but nothing delivered yet
+
+    tailer.commit(got.positions[1])
+    assert _checkpoint(ck)["offset"] == 4
+
+    # Restart: the undelivered line is read again
+    again = Collector()
+    EveTailer(str(eve), again, str(ck)).step()
+    assert again.lines == [b"c"]
+
+
+def test_uncommitted_skip_is_written_after_the_read_pass(tmp_path):
+    eve, ck = tmp_path / "eve.json", tmp_path / "ck.json"
+    eve.write_bytes(b"")
+    tailer = None
+
+    def skip_all(line, position):
+        tailer.commit(position, save=False)
+
+    tailer = EveTailer(str(eve), skip_all, str(ck))
+    tailer.step()
+    _append(eve, b"flow", b"flow")
+    tailer.step()
+    assert _checkpoint(ck)["offset"] == 10
+
+
+def test_rotation_finishes_the_old_file_then_follows_the_new_one(tmp_path):
+    eve, ck = tmp_path / "eve.json", tmp_path / "ck.json"
+    eve.write_bytes(b"")
+    got = Collector()
+    tailer = EveTailer(str(eve), got, str(ck))
+    tailer.step()
+    _append(eve, b"old-1")
+    os.rename(eve, tmp_path / "eve.json.1")
+    _append(tmp_path / "eve.json.1", b"old-2")  # written through the old handle before the switch
+    _append(eve, b"new-1")
+    tailer.step()
+    assert got.lines == [b"old-1", b"old-2", b"new-1"]
+    assert got.positions[-1][0] == os.stat(eve).st_ino
+
+
+def test_truncation_restarts_from_the_beginning(tmp_path):
+    eve, ck = tmp_path / "eve.json", tmp_path / "ck.json"
+    eve.write_bytes(b"")
+    got = Collector()
+    tailer = EveTailer(str(eve), got, str(ck))
+    tailer.step()
+    _append(eve, b"0123456789")
+    tailer.step()
+    eve.write_bytes(b"x\n")
+    tailer.step()
+    assert got.lines == [b"0123456789", b"x"]
+
+
+def test_checkpoint_for_a_rotated_file_is_not_resumed(tmp_path):
+    eve, ck = tmp_path / "eve.json", tmp_path / "ck.json"
+    _append(eve, b"a", b"b")
+    ck.write_text(json.dumps({"inode": os.stat(eve).st_ino + 1, "offset": 2}))
+    got = Collector()
+    EveTailer(str(eve), got, str(ck)).step()
+    assert got.lines == [b"a", b"b"]
@@ -0,0 +1,60 @@
+# backend/tests/test_alert_buffer.py
+import pytest
+
+from app.utils.alert_buffer import AlertRingBuffer
+
+
+def _sigs(alerts):
+    return [a["signature"] for a in alerts]
+
+
+def test_drain_keeps_arrival_order_across_severities():
+    buf = AlertRingBuffer(10)
+    for sig, severity in (("a", 3), ("b", 1), ("c", None), ("d", 2)):
+        buf.append({"signature": sig, "severity": severity})
+    assert _sigs(buf.drain()) == ["a", "b", "c", "d"]
+    assert len(buf) == 0
+
+
+def test_drop_oldest_evicts_by_age():
+    buf = AlertRingBuffer(2)
+    for sig in "abc":
+        buf.append({"signature": sig, "severity": 1})
+    assert _sigs(buf.drain()) == ["b", "c"]
+    assert buf.stats()["dropped"] == 1
+
+
+def test_drop_lowest_severity_coerces_string_severities():
+    buf = AlertRingBuffer(2, policy="drop_lowest_severity")
+    buf.append({"signature": "high", "severity": "1"})
+    buf.append({"signature": "low", "severity": 4})
+    buf.append({"signature": "mid", "severity": "2"})  # evicts "low", not the string-typed "high"
+    buf.append({"signature": "none", "severity": "junk"})  # ranks below everything: dropped
+    assert _sigs(buf.drain()) == ["high", "mid"]
+    assert buf.stats()["dropped"] == 2
+
+
+def test_coalesce_folds_repeats_once_full():
+    buf = AlertRingBuffer(2, policy="coalesce")
+    alert = {"signature": "scan", "src_ip": "1.1.1.1", "dest_ip": "2.2.2.2", "severity": 2}
+    buf.append(dict(alert))
+    buf.append({"signature": "other", "severity": 2})
+    buf.append(dict(alert, timestamp="t3"))
+    buf.append(dict(alert, timestamp="t4"))
+    drained = buf.drain()
+    assert _sigs(drained) == ["scan", "other"]
+    assert drained[0]["count"] == 3 and drained[0]["last_seen"] == "t4"
+    assert buf.stats() == {"buffered": 0, "dropped": 0, "coalesced": 2}
+
+
+def test_wait_ready_returns_once_flush_size_is_reached():
+    buf = AlertRingBuffer(10, flush_size=2)
+    buf.append({"signature": "a"})
+    buf.append({"signature": "b"})
+    buf.wait_ready(60)  # would block for a minute if the size trigger were ignored
+    assert len(buf.drain(limit=1)) == 1 and len(buf) == 1
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AlertRingBuffer(10, policy="nope")
@@ -0,0 +1,21 @@
+# backend/tests/test_alert_filter.py
+from app.utils.alert_filter import FilterRooms, compile_filter
+
+
+def test_min_severity_accepts_string_and_junk_severities():
+    keep = compile_filter({"minSeverity": 2})
+    assert keep({"severity": "2"})
+    assert keep({"severity": 1})
+    assert not keep({"severity": "3"})
+    assert not keep({"severity": "high"})
+    assert not keep({})
+
+
+def test_fan_out_survives_string_severity():
+    rooms = FilterRooms()
+    rooms.join("a", None)
+    rooms.join("b", {"minSeverity": 1})
+    batch = [{"severity": "1"}, {"severity": "low"}, {"severity": 3}]
+    delivered = {room: matches for room, matches, _ in rooms.fan_out(batch)}
+    assert len(delivered["all"]) == 3
+    assert [a["severity"] for room, matches in delivered.items() if room != "all" for a in matches] == ["1"]
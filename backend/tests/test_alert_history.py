@@ -0,0 +1,43 @@
+# backend/tests/test_alert_history.py
+import pytest
+
+from app.utils.alert_history import AlertHistory, SharedSequence
+
+
+def test_since_replays_the_gap_and_reports_what_was_forgotten():
+    history = AlertHistory(5)
+    first = history.next_seq
+    history.stamp([{"n": i, "severity": i % 2 + 1} for i in range(8)])
+    assert history.last_seq == first + 7
+
+    alerts, missed = history.since(first + 4)
+    assert [a["n"] for a in alerts] == [5, 6, 7] and not missed
+
+    alerts, missed = history.since(first)  # n=1 and n=2 already left the window
+    assert [a["n"] for a in alerts] == [3, 4, 5, 6, 7] and missed
+
+    alerts, _ = history.since(first + 2, predicate=lambda a: a["severity"] == 1)
+    assert [a["n"] for a in alerts] == [4, 6]
+    assert history.since(history.last_seq) == ([], False)
+
+
+def test_record_follows_seqs_stamped_by_another_worker():
+    history = AlertHistory(10)
+    history.record([{"seq": 100}, {"seq": 101}])
+    assert history.last_seq == 101
+    assert [a["seq"] for a in history.since(100)[0]] == [101]
+
+
+def test_shared_sequence_hands_out_consecutive_blocks(db_app):
+    sequence = SharedSequence()
+    start = sequence.peek()  # creates the row on first use
+    with sequence.allocate(3) as first:
+        assert first == start
+    with SharedSequence().allocate(2) as first:  # another worker's handle on the same row
+        assert first == start + 3
+    assert sequence.peek() == start + 5
+
+    with pytest.raises(RuntimeError):
+        with sequence.allocate(4):
+            raise RuntimeError("publish failed")
+    assert sequence.peek() == start + 5  # rolled back, nothing skipped
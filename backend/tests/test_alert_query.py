@@ -0,0 +1,46 @@
+# backend/tests/test_alert_query.py
+from app.utils.alert_query import query_alerts
+from app.utils.alert_store import store_alerts
+
+
+def _pages(**kwargs):
+    ids, cursor = [], None
+    while True:
+        page = query_alerts(cursor=cursor, **kwargs)
+        ids.extend(a["id"] for a in page["alerts"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_keyset_pages_cover_every_row_once_across_timestamp_ties(db_app):
+    # Ten rows share each timestamp, so pages break inside a tie
+    store_alerts([{"timestamp": f"2025-01-01T00:00:{i // 10:02d}Z", "severity": 1} for i in range(95)])
+
+    desc = _pages(limit=7)
+    assert len(desc) == len(set(desc)) == 95
+    assert _pages(limit=7, order="asc") == desc[::-1]
+
+    # Rows inserted after the first page never shift what the following pages return
+    first = query_alerts(limit=10)
+    store_alerts([{"timestamp": "2025-01-01T00:00:09Z", "severity": 1}])
+    second = query_alerts(limit=10, cursor=first["next_cursor"])
+    assert [a["id"] for a in second["alerts"]] == desc[10:20]
+
+
+def test_filters_match_the_dashboard(db_app):
+    store_alerts([
+        {"timestamp": "2025-01-01T00:00:00Z", "severity": 1, "signature": "a", "protocol": "TCP", "src_ip": "10.0.0.1", "dest_port": 443},
+        {"timestamp": "2025-01-01T01:00:00Z", "severity": 3, "signature": "b", "protocol": "UDP", "src_ip": "10.0.0.2", "src_port": 53},
+        {"timestamp": "2025-01-01T02:00:00Z", "protocol": "TCP", "dest_ip": "10.0.0_1"},
+    ])
+
+    def signatures(filters):
+        return [a["signature"] for a in query_alerts(filters=filters, order="asc")["alerts"]]
+
+    assert signatures({"minSeverity": 2}) == ["a"]
+    assert signatures({"alertsOnly": True}) == ["a", "b"]
+    assert signatures({"protocols": ["UDP"]}) == ["b"]
+    assert signatures({"port": "53"}) == ["b"]
+    assert signatures({"ip": "0_1"}) == [None]  # substring match with LIKE wildcards escaped
+    assert signatures({"timeRange": {"start": "2025-01-01T00:30:00Z", "end": "2025-01-01T01:00:00Z"}}) == ["b"]
@@ -0,0 +1,40 @@
+# backend/tests/test_alert_store.py
+from datetime import datetime
+
+from app.utils.alert_store import last_alert_id, reassign_upload, store_alerts, to_int, to_row
+
+
+def test_to_row_coerces_upload_and_live_fields():
+    row = to_row({
+        "timestamp": "2025-03-01T12:00:00.250000+0200",
+        "src_ip": "10.0.0.1",
+        "src_port": "443",
+        "signature_id": "signature ID:2025001",
+        "severity": True,
+        "signature": "x" * 300,
+        "sensor_id": "edge-1",
+    }, "live")
+    assert row["timestamp"] == datetime(2025, 3, 1, 10, 0, 0, 250000)  # naive UTC
+    assert row["src_port"] == 443
+    assert row["signature_id"] == 2025001
+    assert row["severity"] is None
+    assert len(row["signature"]) == 255
+    assert row["source"] == "live" and row["sensor_id"] == "edge-1"
+    assert to_int("n/a") is None
+    assert to_row({}, "upload")["timestamp"] is not None  # ingest time, never NULL
+
+
+def test_store_alerts_writes_in_batches_and_reassigns(db_app):
+    from app.models.alert import Alert
+
+    alerts = [{"timestamp": f"2025-01-01T00:00:{i:02d}Z", "severity": i % 3 + 1, "upload_id": "tmp", "event_index": i}
+              for i in range(25)]
+    assert store_alerts(alerts, batch_size=10) == 25
+    after = last_alert_id()
+    assert after == 25
+    store_alerts([{"upload_id": "tmp"}])
+
+    assert reassign_upload("tmp", "final", after_id=after) == 1  # only rows after the cursor move
+    assert Alert.query.filter_by(upload_id="final").count() == 1
+    assert Alert.query.filter_by(upload_id="tmp").count() == 25
+    assert [a.event_index for a in Alert.query.order_by(Alert.id).limit(3)] == [0, 1, 2]
@@ -0,0 +1,88 @@
+# backend/tests/test_alert_summary.py
+import random
+
+from app.utils.alert_summary import AlertSummary, SpaceSaving, summary_counts
+from app.utils.geo_bins import DEST, SRC, GeoBins, ip_counts
+
+
+def _alerts(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "src_ip": f"10.0.0.{rng.randint(1, 40)}",
+            "dest_ip": f"192.168.1.{rng.randint(1, 40)}",
+            "signature": f"sig {rng.randint(1, 30)}",
+            "severity": rng.choice([1, 2, 3, None]),
+            "protocol": rng.choice(["TCP", "UDP", None]),
+        }
+        for _ in range(n)
+    ]
+
+
+def test_merged_counts_match_adding_alerts():
+    alerts = _alerts(2000)
+    direct = AlertSummary()
+    direct.add_many(alerts)
+
+    merged = AlertSummary()
+    merged.add_many(alerts[:500])
+    merged.add_counts(summary_counts(alerts[500:]))
+
+    assert merged.snapshot(top_n=100) == direct.snapshot(top_n=100)
+
+
+def test_weighted_adds_keep_the_space_saving_bounds():
+    sketch = SpaceSaving(4)
+    for key, count in [("a", 50), ("b", 3), ("c", 2), ("d", 1), ("e", 7), ("a", 1), ("f", 1)]:
+        sketch.add(key, count)
+
+    counts = dict(sketch.top(10))
+    assert len(counts) == 4
+    assert counts["a"] == 51
+    assert counts["e"] == 8  # took over d's slot: 1 + 7
+    assert sketch.min_count == min(counts.values())
+    assert sorted(sketch.buckets) == sorted(set(counts.values()))
+
+
+def test_ip_counts_fold_like_added_alerts():
+    alerts = _alerts(300)
+    lookup = lambda ip: {"lat": 1.0, "lon": 2.0, "country": ip.split(".")[0]}
+    direct, merged = GeoBins(2, lookup=lookup), GeoBins(2, lookup=lookup)
+    direct.add_many(alerts)
+    src, dest = ip_counts(alerts)
+    merged.add_counts(SRC, src)
+    merged.add_counts(DEST, dest)
+
+    assert merged.snapshot("country") == direct.snapshot("country")
+
+
+def test_snapshot_counts_like_the_dashboard():
+    summary = AlertSummary()
+    summary.add({"src_ip": "10.0.0.1", "dest_ip": "10.0.0.9", "signature": "a", "severity": 1, "protocol": "TCP"})
+    summary.add({"src_ip": "10.0.0.1", "dest_ip": "10.0.0.9", "protocol": "UDP"})  # no severity: not an alert
+    summary.add({"src_ip": "10.0.0.2", "dest_ip": "10.0.0.8", "signature": "b", "severity": 3})
+
+    snap = summary.snapshot()
+    assert snap["events"] == 3 and snap["total"] == 2
+    assert snap["topTalkers"] == [("10.0.0.1", 2), ("10.0.0.2", 1)]
+    assert snap["topHosts"] == [("10.0.0.9", 1), ("10.0.0.8", 1)]
+    assert snap["severity"] == {"1": 1, "3": 1}
+    assert snap["protocols"] == {"TCP": 1, "UDP": 1}
+    summary.reset()
+    assert summary.snapshot()["events"] == 0
+
+
+def test_space_saving_keeps_heavy_hitters_within_capacity():
+    rng = random.Random(3)
+    stream = ["hot-1"] * 400 + ["hot-2"] * 250 + [f"cold-{rng.randint(0, 5000)}" for _ in range(2000)]
+    rng.shuffle(stream)
+    sketch = SpaceSaving(32)
+    for key in stream:
+        sketch.add(key)
+
+    assert len(sketch.counts) == 32
+    top = dict(sketch.top(2))
+    # Anything above total/capacity is tracked, overestimated by at most the minimum count
+    assert set(top) == {"hot-1", "hot-2"}
+    assert 400 <= top["hot-1"] <= 400 + sketch.min_count
+    assert 250 <= top["hot-2"] <= 250 + sketch.min_count
@@ -0,0 +1,45 @@
+# backend/tests/test_geo.py
+import os
+
+import pytest
+
+import app
+
+if not os.path.exists(os.path.join(os.path.dirname(app.__file__), "GeoLite2-City.mmdb")):
+    pytest.skip("GeoLite2-City.mmdb is not installed", allow_module_level=True)
+
+from app import geo  # noqa: E402  (opens the mmdb at import)
+
+
+def test_non_routable_ranges_match_ipaddress():
+    for ip in ["10.1.2.3", "172.31.255.255", "192.168.0.1", "100.64.0.1", "127.0.0.1",
+               "169.254.1.1", "192.0.2.7", "198.19.0.1", "224.0.0.1", "255.255.255.255", "0.1.2.3"]:
+        assert not geo.is_routable(ip), ip
+    for ip in ["8.8.8.8", "172.32.0.1", "192.169.0.1", "100.128.0.1", "223.255.255.255", "2001:4860::8888"]:
+        assert geo.is_routable(ip), ip
+    for ip in ["fe80::1", "::1", "fd00::1", "ff02::1", "not-an-ip", "", None]:
+        assert not geo.is_routable(ip), ip
+
+
+def test_batches_are_deduplicated_and_non_routable_ips_never_reach_the_reader():
+    geo.geo_cache.clear()
+    before = geo.geo_stats()
+    ips = ["10.0.0.1", "10.0.0.1", "192.168.1.5", None, "10.0.0.1"]
+    assert geo.get_geo_many(ips) == {"10.0.0.1": None, "192.168.1.5": None}
+
+    after = geo.geo_stats()
+    assert after["misses"] - before["misses"] == 2  # one classification per distinct IP
+    assert geo.get_geo("10.0.0.1") is None
+    assert geo.geo_stats()["negative_hits"] == after["negative_hits"] + 1
+
+
+def test_enrich_geo_adds_fields_only_for_located_addresses():
+    geo.geo_cache.clear()
+    geo.geo_cache.put("203.0.114.9", {"lat": 1.5, "lon": 2.5, "city": None, "country": "X"})
+    geo.geo_cache.put("203.0.114.10", {"lat": None, "lon": None, "city": None, "country": "Y"})
+
+    alert = geo.enrich_geo({"src_ip": "203.0.114.9", "dest_ip": "10.0.0.1"})
+    assert alert == {"src_ip": "203.0.114.9", "dest_ip": "10.0.0.1", "geo_enriched": True,
+                     "src_lat": 1.5, "src_lon": 2.5, "src_country": "X"}
+    assert geo.enrich_geo({"src_ip": "203.0.114.10", "dest_ip": None}) == {
+        "src_ip": "203.0.114.10", "dest_ip": None, "geo_enriched": True}
@@ -0,0 +1,67 @@
+# backend/tests/test_geo_bins.py
+from app.utils.alert_store import store_alerts
+from app.utils.geo_bins import GeoBins, StoredGeoBins, grid_cell
+
+LOCATIONS = {
+    "1.1.1.1": {"lat": 10.0, "lon": 20.0, "city": "A", "country": "X"},
+    "1.1.1.2": {"lat": 12.0, "lon": 22.0, "city": "B", "country": "X"},
+    "2.2.2.2": {"lat": -30.0, "lon": -60.0, "city": None, "country": "Y"},
+}
+lookup = LOCATIONS.get  # anything else is unlocated
+
+
+def _alerts(pairs):
+    return [{"src_ip": src, "dest_ip": dest, "severity": 1} for src, dest in pairs]
+
+
+def test_grid_cells_clamp_to_the_edges():
+    assert grid_cell(0.0, 0.0, 0) == (0, 0)
+    assert grid_cell(-90.0, -180.0, 3) == (0, 0)
+    assert grid_cell(90.0, 180.0, 3) == (7, 7)
+    assert grid_cell(10.0, 20.0, 2) == (2, 2)
+
+
+def test_bins_count_each_side_around_a_weighted_centroid():
+    bins = GeoBins(3, lookup=lookup)
+    bins.add_many(_alerts([("1.1.1.1", "2.2.2.2"), ("1.1.1.1", "10.0.0.1"), ("1.1.1.2", "2.2.2.2")]))
+    bins.add({"src_ip": "10.0.0.2"})
+
+    countries = {b["country"]: b for b in bins.snapshot("country")["bins"]}
+    assert countries["X"] == {"lat": 10.6667, "lon": 20.6667, "count": 3, "src": 3, "dest": 0, "country": "X"}
+    assert countries["Y"]["dest"] == 2
+    assert bins.snapshot("country")["unlocated"] == {"src": 1, "dest": 1}
+
+    cities = bins.snapshot("city")["bins"]
+    assert [(b["city"], b["count"]) for b in cities] == [("A", 2), ("Unknown", 2), ("B", 1)]
+
+    # bbox is (south, west, north, east) on the centroid; limit keeps the largest
+    assert [b["country"] for b in bins.snapshot("country", bbox=(0, 0, 50, 50))["bins"]] == ["X"]
+    assert len(bins.snapshot("city", limit=1)["bins"]) == 1
+    assert bins.snapshot("grid", zoom=99)["zoom"] == 3
+
+
+def test_stored_bins_count_every_row_once(db_app):
+    from app import db
+    from app.models.alert import Alert
+
+    pairs = [("1.1.1.1", "2.2.2.2"), ("1.1.1.2", None), (None, "1.1.1.1"), ("2.2.2.2", "10.0.0.1")] * 3
+    store_alerts(_alerts(pairs))
+    late = db.session.get(Alert, 9)
+    late_pair = (late.src_ip, late.dest_ip)
+    db.session.delete(late)  # a transaction that has not committed yet
+    db.session.commit()
+
+    stored = StoredGeoBins(2, lookup=lookup, tail_ids=4)
+    stored.refresh()
+    store_alerts(_alerts(pairs[:5]))
+    db.session.add(Alert(id=9, src_ip=late_pair[0], dest_ip=late_pair[1]))  # commits out of id order
+    db.session.commit()
+    stored.refresh()
+    stored.refresh()  # nothing new: no double counting
+    store_alerts(_alerts(pairs[:6]))  # pushes the late row out of the tail into the bulk range
+    stored.refresh()
+
+    direct = GeoBins(2, lookup=lookup)
+    direct.add_many(_alerts(pairs + pairs[:5] + pairs[:6]))
+    for level in ("country", "city", "grid"):
+        assert stored.snapshot(level, zoom=2) == direct.snapshot(level, zoom=2)
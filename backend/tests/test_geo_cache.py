@@ -0,0 +1,41 @@
+# backend/tests/test_geo_cache.py
+import pytest
+
+from app.utils import geo_cache
+from app.utils.geo_cache import MISSING, GeoCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(geo_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = GeoCache(max_size=2, ttl=60)
+    cache.put("1.1.1.1", {"country": "A"})
+    cache.put("8.8.8.8", {"country": "B"})
+    assert cache.get("1.1.1.1") == {"country": "A"}  # now the most recent
+    cache.put("9.9.9.9", {"country": "C"})
+
+    assert cache.get("8.8.8.8") is MISSING
+    assert cache.get("1.1.1.1") == {"country": "A"}
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+
+def test_negative_entries_expire_on_their_own_ttl(clock):
+    cache = GeoCache(max_size=10, ttl=3600, negative_ttl=60)
+    cache.put("1.1.1.1", {"country": "A"})
+    cache.put("10.0.0.1", None)
+    assert cache.get("10.0.0.1") is None  # a hit, not MISSING
+
+    clock[0] += 61
+    assert cache.get("10.0.0.1") is MISSING
+    assert cache.get("1.1.1.1") == {"country": "A"}
+    clock[0] += 3600
+    assert cache.get("1.1.1.1") is MISSING
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["negative_hits"], stats["misses"]) == (2, 1, 2)
+    assert stats["hit_rate"] == 0.5 and stats["size"] == 0
@@ -0,0 +1,36 @@
+# backend/tests/test_intel_cache.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.intel_cache import InflightRequests, cached_responses, store_response
+
+
+def test_concurrent_lookups_for_one_key_share_a_request():
+    calls = []
+    release = threading.Event()
+
+    def fetch(ip):
+        calls.append(ip)
+        release.wait(5)
+        return {"ip": ip}
+
+    with ThreadPoolExecutor(4) as executor:
+        inflight = InflightRequests(executor)
+        futures = [inflight.submit(("abuse", "1.2.3.4"), fetch, "1.2.3.4") for _ in range(5)]
+        other = inflight.submit(("vt", "1.2.3.4"), fetch, "1.2.3.4")
+        release.set()
+        assert all(f is futures[0] for f in futures) and other is not futures[0]
+        assert futures[0].result() == {"ip": "1.2.3.4"}
+        other.result()
+    # Once finished the key is forgotten, so a later lookup goes upstream again
+    assert len(calls) == 2 and not inflight.futures
+
+
+def test_cached_responses_skip_expired_entries(db_app):
+    store_response("abuse", "1.2.3.4", {"score": 10}, ttl=3600)
+    store_response("vt", "1.2.3.4", {"malicious": 0}, ttl=-1)
+    store_response("abuse", "5.6.7.8", {"score": 0}, ttl=3600)
+    assert cached_responses("1.2.3.4", ["abuse", "vt"]) == {"abuse": {"score": 10}}
+
+    store_response("vt", "1.2.3.4", {"malicious": 2}, ttl=3600)  # refreshes the same row
+    assert cached_responses("1.2.3.4", ("abuse", "vt")) == {"abuse": {"score": 10}, "vt": {"malicious": 2}}
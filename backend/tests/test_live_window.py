@@ -0,0 +1,48 @@
+# backend/tests/test_live_window.py
+from app.utils.live_window import LiveWindow
+
+
+def _alert(i, **extra):
+    alert = {
+        "timestamp": f"2025-01-01T00:00:{i:02d}+00:00",
+        "src_ip": f"10.0.0.{i % 3}",
+        "dest_ip": "2001:db8::1",
+        "dest_port": 443 if i % 2 else 80,
+        "protocol": "TCP",
+        "signature": f"sig{i % 2}",
+        "severity": i % 3 + 1,
+    }
+    alert.update(extra)
+    return alert
+
+
+def test_ring_keeps_the_newest_alerts_and_round_trips_them():
+    window = LiveWindow(capacity=4)
+    window.extend(_alert(i) for i in range(6))
+    rows = window.query(limit=10)["alerts"]
+    assert [r["timestamp"][-11:-6] for r in rows] == ["00:05", "00:04", "00:03", "00:02"]
+    assert rows[0]["src_ip"] == "10.0.0.2" and rows[0]["dest_ip"] == "2001:db8::1"
+    assert rows[0]["dest_port"] == 443 and rows[0]["src_port"] is None
+
+
+def test_filters_and_aggregates_match_the_page_filter():
+    window = LiveWindow(capacity=16)
+    window.extend(_alert(i) for i in range(6))
+    window.append({"signature": None, "src_ip": "10.0.0.9"})  # non-alert event
+
+    result = window.query({"alertsOnly": True, "minSeverity": 2, "port": 443, "ip": "10.0.0."})
+    assert [r["severity"] for r in result["alerts"]] == [1, 2]
+    assert result["summary"]["total"] == 2
+    assert result["summary"]["severity"] == {"1": 1, "2": 1}
+    assert result["summary"]["topSignatures"] == [["sig1", 2]]
+
+    assert window.query({"ip": "10.0.0.9"})["summary"]["events"] == 1
+
+
+def test_compaction_keeps_decoding_live_values():
+    window = LiveWindow(capacity=2)
+    for i in range(20):
+        window.append(_alert(i, signature=f"unique{i}", dest_ip=f"fe80::{i}"))
+    assert len(window.strings) + len(window.ips) <= 4 * 2 + 2
+    assert [r["signature"] for r in window.query()["alerts"]] == ["unique19", "unique18"]
+    assert window.query()["alerts"][0]["dest_ip"] == "fe80::19"
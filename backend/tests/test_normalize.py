@@ -0,0 +1,48 @@
+# backend/tests/test_normalize.py
+from app.utils.normalize import AlertNormalizer, normalize_alert
+
+EVE = {
+    "timestamp": "2025-01-01T00:00:00.000000+0000",
+    "event_type": "alert",
+    "src_ip": "10.0.0.1",
+    "dest_ip": "10.0.0.2",
+    "proto": "TCP",
+    "alert": {"signature": "ET TEST eve", "severity": 2, "signature_id": 1},
+}
+FLAT = {"src_addr": "10.1.1.1", "dst_addr": "10.1.1.2", "msg": "SNORT flat", "priority": 3}
+UNIFIED2 = {"Event": {"ip_source": "10.2.2.1", "ip_dest": "10.2.2.2", "priority_id": 1, "signature_id": 7}}
+
+
+def test_interleaved_streams_keep_their_own_schema():
+    # One normalizer shared by several sensors, as on the live path
+    normalize = AlertNormalizer()
+    streams = [("a", EVE), ("b", FLAT), ("a", EVE), ("c", UNIFIED2), ("b", FLAT), ("b", FLAT), ("a", EVE)]
+    for stream, event in streams:
+        assert normalize(event, stream=stream) == normalize_alert(event)
+    assert normalize.schemas == {"a": "eve", "b": "flat", "c": "unified2"}
+
+
+def test_flat_stream_after_eve_stream_keeps_fields():
+    normalize = AlertNormalizer()
+    normalize(EVE, stream="sensor-1")
+    alert = normalize(FLAT, stream="sensor-2")
+    assert alert["src_ip"] == "10.1.1.1"
+    assert alert["dest_ip"] == "10.1.1.2"
+    assert alert["signature"] == "SNORT flat"
+    assert alert["severity"] == 3
+
+
+def test_schema_is_detected_once_per_stream(monkeypatch):
+    from app.utils import normalize as module
+
+    calls = []
+    detect = module.detect_schema
+    monkeypatch.setattr(module, "detect_schema", lambda event: calls.append(event) or detect(event))
+    normalize = AlertNormalizer()
+    for _ in range(3):
+        normalize(EVE)
+    assert len(calls) == 1 and normalize.schema == "eve"
+
+    normalize.forget(None)
+    normalize(FLAT)
+    assert len(calls) == 2 and normalize.schema == "flat"
@@ -0,0 +1,76 @@
+# backend/tests/test_parallel_ingest.py
+import json
+import os
+import subprocess
+import sys
+
+from app.utils.normalize import parse_timestamp
+from app.utils.parallel_ingest import APP_DIR, WORKER_SCRIPT
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same setup as run.py: eventlet patches everything before the app is imported
+SCRIPT = """
+import eventlet
+eventlet.monkey_patch()
+import sys
+from app.utils.parallel_ingest import parallel_ingest
+alerts = list(parallel_ingest(sys.argv[1], 4))
+with open(sys.argv[2], "w") as f:
+    for alert, offset, length in alerts:
+        f.write(f"{alert['timestamp']} {offset} {length}\\n")
+"""
+
+
+def _write_eve(path, count):
+    # Offsets vary, so string order and time order disagree
+    lines = []
+    for i in range(count):
+        zone = ("+0000", "+0200", "-0500")[i % 3]
+        lines.append(json.dumps({
+            "timestamp": f"2025-01-01T{i % 24:02d}:{(i * 7) % 60:02d}:{i % 60:02d}.000000{zone}",
+            "event_type": "alert",
+            "src_ip": f"10.0.{i % 256}.1",
+            "dest_ip": "192.168.1.10",
+            "proto": "TCP",
+            "alert": {"signature": f"ET TEST rule {i % 50}", "severity": i % 3 + 1},
+        }))
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return lines
+
+
+def test_parallel_ingest_under_monkey_patch(tmp_path):
+    path, out = tmp_path / "eve.json", tmp_path / "out.txt"
+    lines = _write_eve(path, 60000)
+
+    proc = subprocess.run(
+        [sys.executable, "-c", SCRIPT, str(path), str(out)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    with open(out) as f:
+        rows = [line.split() for line in f]
+    assert len(rows) == len(lines)
+    times = [parse_timestamp(ts) for ts, _, _ in rows]
+    assert times == sorted(times)
+    with open(path, "rb") as f:
+        data = f.read()
+    for ts, offset, length in rows[:100]:
+        raw = json.loads(data[int(offset):int(offset) + int(length)])
+        assert raw["timestamp"] == ts
+
+
+def test_worker_skips_the_app_package(tmp_path):
+    path = tmp_path / "eve.json"
+    _write_eve(path, 10)
+    check = WORKER_SCRIPT + "\nprint('flask' in sys.modules, 'app.routes' in sys.modules, file=sys.stderr)\n"
+
+    proc = subprocess.run(
+        [sys.executable, "-W", "error", "-c", check, APP_DIR, str(path), "0", str(os.path.getsize(path))],
+        cwd=BACKEND_DIR, capture_output=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stderr.split() == [b"False", b"False"]
+    assert proc.stdout  # the run came back on stdout
@@ -0,0 +1,87 @@
+# backend/tests/test_raw_events.py
+import bz2
+import gzip
+import io
+import json
+
+import pytest
+
+from app.utils import raw_events
+from app.utils.raw_events import BlockWriter, RawIndexWriter, read_raw_event
+
+
+def _events(count):
+    return [b'{"n": %d, "pad": "%s"}' % (i, b"x" * (i % 37)) for i in range(count)]
+
+
+def _index(tmp_path, events, restart_points=None):
+    index = RawIndexWriter(str(tmp_path))
+    offset = 0
+    for event in events:
+        index.add(offset, len(event))
+        offset += len(event) + 1
+    index.commit(str(tmp_path / "abc.idx"), restart_points)
+    return str(tmp_path / "abc.idx")
+
+
+def test_compressed_upload_is_stored_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(raw_events, "BLOCK_BYTES", 1000)  # events straddle block boundaries
+    events = _events(500)
+    body = b"\n".join(events)
+
+    blocks = BlockWriter(str(tmp_path))
+    with blocks.tee(bz2.BZ2File(io.BytesIO(bz2.compress(body)))) as reader:
+        assert reader.read(5000) == body[:5000]
+        reader.drain()
+    content_path = tmp_path / "abc.json.gz"
+    blocks.commit(str(content_path))
+    assert len(blocks.restart_points) > 10
+    index_path = _index(tmp_path, events, blocks.restart_points)
+
+    assert gzip.decompress(content_path.read_bytes()) == body  # still an ordinary .gz
+    for n in (0, 1, 42, 250, 499):
+        assert read_raw_event(str(content_path), index_path, n) == events[n]
+    with pytest.raises(IndexError):
+        read_raw_event(str(content_path), index_path, 500)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["abc.idx", "abc.json.gz"]  # nothing decompressed on disk
+
+
+def test_index_without_restart_points_still_reads(tmp_path):
+    events = _events(100)
+    body = b"\n".join(events)
+    content_path = tmp_path / "abc.json.gz"
+    content_path.write_bytes(gzip.compress(body))
+    index_path = _index(tmp_path, events)
+
+    assert read_raw_event(str(content_path), index_path, 99) == events[99]
+    (tmp_path / "abc.json").write_bytes(body)
+    assert read_raw_event(str(tmp_path / "abc.json"), index_path, 7) == events[7]
+    with pytest.raises(IndexError):
+        read_raw_event(str(tmp_path / "abc.json"), index_path, 100)
+
+
+@pytest.mark.parametrize("body", [
+    '[\n  {"n": 0, "msg": "café"},\n  {"n": 1, "nested": {"a": [1, 2]}} ,{"n": 2}\n]\n',
+    '{"n": 0, "msg": "café"}\r\n\r\n{"n": 1, "nested": {"a": [1, 2]}}\n{"n": 2}',
+])
+def test_parser_offsets_point_back_at_the_raw_events(tmp_path, body):
+    from app.utils.stream_parser import iter_events
+
+    content_path = tmp_path / "abc.json"
+    content_path.write_bytes(body.encode())
+    index = RawIndexWriter(str(tmp_path))
+    with open(content_path, "rb") as f:
+        events = [(event, index.add(offset, length)) for event, offset, length in iter_events(f, with_offsets=True)]
+    index.commit(str(tmp_path / "abc.idx"))
+
+    assert [n for _, n in events] == [0, 1, 2]
+    for event, n in events:
+        raw = read_raw_event(str(content_path), str(tmp_path / "abc.idx"), n)
+        assert json.loads(raw) == event  # byte offsets, so the multi-byte character does not shift later events
+
+
+def test_discarded_index_leaves_nothing_behind(tmp_path):
+    index = RawIndexWriter(str(tmp_path))
+    index.add(0, 10)
+    index.discard()
+    assert list(tmp_path.iterdir()) == []
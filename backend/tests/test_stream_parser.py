@@ -0,0 +1,47 @@
+# backend/tests/test_stream_parser.py
+import io
+import json
+
+import pytest
+
+from app.utils import stream_parser
+from app.utils.stream_parser import iter_events
+
+EVENTS = [
+    {"event_type": "alert", "n": 0, "msg": "ascii"},
+    {"event_type": "alert", "n": 1, "msg": "café ☃"},
+    {"event_type": "dns", "n": 2, "nested": {"list": [1, 2, {"x": "]"}]}},
+]
+
+
+def _check_offsets(data, parsed):
+    for event, offset, length in parsed:
+        assert json.loads(data[offset:offset + length]) == event
+
+
+def test_ndjson_offsets_point_at_the_raw_line():
+    data = ("\n" + "\n".join(json.dumps(e, ensure_ascii=False) for e in EVENTS) + "\n\nnot json\n[1]\n").encode()
+    # Tiny chunks split lines and multi-byte characters
+    parsed = list(iter_events(io.BytesIO(data), chunk_size=3, with_offsets=True))
+    assert [event for event, _, _ in parsed] == EVENTS  # blank, invalid and non-object lines skipped
+    _check_offsets(data, parsed)
+
+
+def test_array_is_decoded_element_by_element():
+    data = (" [\n" + ",\n  ".join(json.dumps(e, ensure_ascii=False) for e in EVENTS) + "\n]\ntrailing").encode()
+    parsed = list(iter_events(io.BytesIO(data), chunk_size=5, with_offsets=True))
+    assert [event for event, _, _ in parsed] == EVENTS
+    _check_offsets(data, parsed)
+    assert list(iter_events(io.BytesIO(b"[]"))) == []
+    assert list(iter_events(io.BytesIO(b"   "))) == []
+
+
+def test_truncated_array_and_oversized_events_raise(monkeypatch):
+    with pytest.raises(ValueError):
+        list(iter_events(io.BytesIO(b'[{"a": 1}, {"b": ')))
+
+    monkeypatch.setattr(stream_parser, "MAX_EVENT_SIZE", 64)
+    with pytest.raises(ValueError):
+        list(iter_events(io.BytesIO(b'{"a": "' + b"x" * 200 + b'"}\n'), chunk_size=16))
+    with pytest.raises(ValueError):
+        list(iter_events(io.BytesIO(b'[{"a": "' + b"x" * 200 + b'"}]'), chunk_size=16))
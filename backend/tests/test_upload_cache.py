@@ -0,0 +1,56 @@
+# backend/tests/test_upload_cache.py
+import os
+
+from app.utils.upload_cache import UploadCache
+
+
+def _write(path, size, mtime):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_eviction_removes_content_files_with_their_entry(tmp_path):
+    cache_dir, content_dir = tmp_path / "cache", tmp_path / "content"
+    content_dir.mkdir()
+    cache = UploadCache(str(cache_dir), max_bytes=250, content_directory=str(content_dir))
+
+    _write(cache.path("old"), 50, 1000)
+    _write(content_dir / "old.json.gz", 60, 1000)
+    _write(content_dir / "old.idx", 10, 1000)
+    _write(content_dir / "orphan.json", 200, 1500)  # stored upload without a cache entry
+    _write(cache.path("new"), 50, 2000)
+    _write(content_dir / "new.json", 60, 2000)
+    _write(content_dir / "new.idx", 10, 2000)
+    _write(content_dir / "busy.idx.tmp", 500, 500)  # still being written
+
+    cache.evict()
+
+    assert sorted(os.listdir(cache_dir)) == ["new.ndjson"]
+    assert sorted(os.listdir(content_dir)) == ["busy.idx.tmp", "new.idx", "new.json"]
+
+
+def test_touching_content_keeps_an_entry(tmp_path):
+    cache_dir, content_dir = tmp_path / "cache", tmp_path / "content"
+    content_dir.mkdir()
+    cache = UploadCache(str(cache_dir), max_bytes=100, content_directory=str(content_dir))
+
+    _write(cache.path("a"), 50, 1000)
+    _write(content_dir / "a.idx", 10, 1000)
+    _write(cache.path("b"), 50, 2000)
+    cache.touch("a.idx")  # e.g. a raw event was just read
+
+    cache.evict()
+
+    assert cache.get("a") and not cache.get("b")
+
+
+def test_commit_can_rewrite_lines(tmp_path):
+    cache = UploadCache(str(tmp_path), max_bytes=1000)
+    writer = cache.writer()
+    writer.write('{"upload_id": "tmp"}\n')
+    writer.commit("real", rewrite=lambda line: line.replace('"tmp"', '"real"'))
+
+    with open(cache.get("real"), encoding="utf-8") as f:
+        assert f.read() == '{"upload_id": "real"}\n'
+    assert os.listdir(tmp_path) == ["real.ndjson"]
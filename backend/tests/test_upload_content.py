@@ -0,0 +1,39 @@
+# backend/tests/test_upload_content.py
+import io
+import os
+
+import pytest
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+
+from app.routes.alerts import _geo_stage, _save_content
+
+
+class _FailingStream(io.BytesIO):
+    def read(self, size=-1):
+        chunk = super().read(4)
+        if self.tell() > 8:
+            raise OSError("client went away")
+        return chunk
+
+
+def test_save_content_never_exposes_a_partial_file(tmp_path):
+    path = str(tmp_path / "abc.json")
+    with pytest.raises(OSError):
+        _save_content(FileStorage(_FailingStream(b'{"event_type": "alert"}')), path)
+    assert os.listdir(tmp_path) == []
+
+    _save_content(FileStorage(io.BytesIO(b"[1]")), path)
+    _save_content(FileStorage(io.BytesIO(b"[2]")), path)  # same digest again: already stored
+    assert os.listdir(tmp_path) == ["abc.json"]
+    with open(path, "rb") as f:
+        assert f.read() == b"[1]"
+
+
+def test_uploads_are_not_enriched_when_geo_enrich_is_off():
+    app = Flask(__name__)
+    app.config["GEO_ENRICH"] = False
+    alert = {"src_ip": "8.8.8.8"}
+    with app.app_context():
+        enrich = _geo_stage()
+    assert enrich(alert) is alert and alert == {"src_ip": "8.8.8.8"}
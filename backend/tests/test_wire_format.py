@@ -0,0 +1,49 @@
+# backend/tests/test_wire_format.py
+import json
+
+import pytest
+
+from app.utils import wire_format
+from app.utils.wire_format import COLUMNAR, JSON, MSGPACK, encode_batch, negotiate, to_columns
+
+ALERTS = [
+    {"src_ip": "10.0.0.1", "signature": "ET A", "severity": 1, "seq": 1},
+    {"src_ip": "10.0.0.1", "signature": "ET B", "severity": 2, "seq": 2},
+    {"src_ip": "10.0.0.2", "signature": "ET A", "seq": 3, "sensor_id": "edge-1"},
+]
+
+
+def _decode(payload):
+    """What the dashboard does with a columnar batch."""
+    strings, columns = payload["strings"], payload["columns"]
+    alerts = [{} for _ in range(payload["count"])]
+    for key, values in columns.items():
+        for alert, value in zip(alerts, values):
+            if value is None:
+                continue
+            alert[key] = strings[value] if key in payload["dict"] else value
+    return alerts
+
+
+def test_columnar_round_trips_and_sends_repeated_strings_once():
+    payload = json.loads(json.dumps(encode_batch(ALERTS, COLUMNAR, replay=True)))
+    assert payload["replay"] is True
+    assert _decode(payload) == ALERTS
+    assert sorted(payload["dict"]) == ["signature", "src_ip"]  # sensor_id never repeats
+    assert sorted(payload["strings"]) == ["10.0.0.1", "10.0.0.2", "ET A", "ET B"]
+    assert to_columns([])["count"] == 0
+
+
+def test_negotiation_falls_back_when_msgpack_is_missing(monkeypatch):
+    assert negotiate(None) == JSON
+    assert negotiate("xml") == JSON
+    assert negotiate(COLUMNAR) == COLUMNAR
+    monkeypatch.setattr(wire_format, "msgpack", None)
+    assert negotiate(MSGPACK) == COLUMNAR
+    assert encode_batch(ALERTS, JSON, missed=False) == {"alerts": ALERTS, "missed": False}
+
+
+def test_msgpack_carries_the_columnar_payload():
+    msgpack = pytest.importorskip("msgpack")
+    assert negotiate(MSGPACK) == MSGPACK
+    assert _decode(msgpack.unpackb(encode_batch(ALERTS, MSGPACK), raw=False)) == ALERTS
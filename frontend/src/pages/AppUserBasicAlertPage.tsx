@@ -35,6 +35,16 @@ export default function AppUserBasicAlertPage() {
     }
   };
 
+  // Uploaded alerts only carry a reference; fetch the raw event for the detail view
+  const openAlert = (a: any) => {
+    setSelectedAlert(a);
+    if (a.upload_id && a.event_index != null) {
+      axios.get(`http://localhost:5000/api/alerts/raw/${a.upload_id}/${a.event_index}`)
+        .then(res => setSelectedAlert(res.data))
+        .catch(err => console.error("Failed to load raw event:", err));
+    }
+  };
+
   // Filter alerts based on selected filters
   const filteredAlerts = alerts.filter((a) => {
     if (filters.alertsOnly && !a.signature) return false;
@@ -244,7 +254,7 @@ const summary = useMemo(() => {
                       ? "bg-green-100"
                       : ""
                   }`}
-                  onDoubleClick={() => setSelectedAlert(a.original || a)}
+                  onDoubleClick={() => openAlert(a)}
                 >
                   <td className="p-3">{a.timestamp || "-"}</td>
                   <td className="p-3">{a.src_ip || "-"}</td>
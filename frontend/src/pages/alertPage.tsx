@@ -1,5 +1,5 @@
 //frontend/src/pages/alertPage.tsx
-import { useState, useEffect, useMemo } from "react";
+import { useState, useEffect, useMemo, useRef } from "react";
 import axios from "axios";
 import { MapContainer, TileLayer, CircleMarker, Tooltip } from 'react-leaflet';
 import 'leaflet/dist/leaflet.css';
@@ -21,6 +21,7 @@ import { Line, Bar, Doughnut } from "react-chartjs-2";
 ChartJS.register(CategoryScale, LinearScale, PointElement, LineElement, BarElement, ArcElement, ChartTitle, ChartTooltip, Legend);
 import { io } from "socket.io-client";
 import { useSocketLogger } from "../hooks/useSocketLogger";
+import { decodeAlertBatch } from "../utils/decodeAlertBatch";
 
 
 export default function AlertsPage() {
@@ -116,32 +117,33 @@ export default function AlertsPage() {
       setAlertsWithGeo([]);
       return;
     }
+    const toGeo = (lat: any, lon: any) => (lat != null && lon != null ? { lat, lon } : undefined);
     const fetchGeo = async () => {
+      // Alerts enriched server-side (GEO_ENRICH) already carry src_lat/dest_lat; only look up the rest
       const ips = Array.from(
         new Set(
-          alerts.flatMap(a => [a.src_ip, a.dest_ip]).filter(Boolean)
+          alerts.filter(a => !a.geo_enriched).flatMap(a => [a.src_ip, a.dest_ip]).filter(Boolean)
         )
       );
 
-      if (!ips.length) {
-        setAlertsWithGeo(alerts);
-        return;
-      }
-      try {
-        const res = await axios.post("http://localhost:5000/api/geo", { ips });
-        const geoMap: Record<string, { lat: number; lon: number }> = {};
-        res.data.forEach((loc: any) => {
-          geoMap[loc.ip] = { lat: loc.lat, lon: loc.lon };
-        });
-        const geoAlerts = alerts.map(a => ({
-          ...a,
-          src_geo: a.src_ip ? geoMap[a.src_ip] : undefined,
-          dest_geo: a.dest_ip ? geoMap[a.dest_ip] : undefined
-        }));
-        setAlertsWithGeo(geoAlerts);
-      } catch (err) {
-        setAlertsWithGeo(alerts);
+      // Response is keyed by IP: { "8.8.8.8": [lat, lon], ... }
+      const geoMap: Record<string, { lat: number; lon: number }> = {};
+      if (ips.length) {
+        try {
+          const res = await axios.post("http://localhost:5000/api/geo", { ips });
+          Object.entries(res.data as Record<string, [number, number]>).forEach(([ip, [lat, lon]]) => {
+            geoMap[ip] = { lat, lon };
+          });
+        } catch (err) {
+          console.warn("⚠️ GeoIP lookup failed:", err);
+        }
       }
+      const geoAlerts = alerts.map(a => ({
+        ...a,
+        src_geo: a.geo_enriched ? toGeo(a.src_lat, a.src_lon) : geoMap[a.src_ip],
+        dest_geo: a.geo_enriched ? toGeo(a.dest_lat, a.dest_lon) : geoMap[a.dest_ip]
+      }));
+      setAlertsWithGeo(geoAlerts);
     };
     fetchGeo();
   }, [alerts]);
@@ -167,6 +169,27 @@ export default function AlertsPage() {
     fetchAlertOptions();
   }, [token]);
   //live monitoring via websockets
+  const socketRef = useRef<ReturnType<typeof io> | null>(null);
+  const filtersRef = useRef(filters);
+  const lastSeqRef = useRef<number | null>(null); // highest server seq received so far
+
+  // Ask the server for only the alerts matching the current filter
+  // (and, after a reconnect, for the ones we missed since lastSeq)
+  const subscribe = (socket: ReturnType<typeof io>, f: typeof filters, since: number | null = null) => {
+    socket.emit(
+      "subscribe",
+      { filters: { ...f, protocols: Array.from(f.protocols) }, since },
+      (res: any) => {
+        if (res?.error) console.warn("⚠️ Live filter rejected:", res.error);
+      }
+    );
+  };
+
+  useEffect(() => {
+    filtersRef.current = filters;
+    if (socketRef.current?.connected) subscribe(socketRef.current, filters);
+  }, [filters]);
+
     useEffect(() => {
   // Connect to your backend Socket.IO endpoint
   const socket = io("http://localhost:5000/api/alerts/stream", {
@@ -174,11 +197,14 @@ export default function AlertsPage() {
     reconnection: true,
     reconnectionAttempts: Infinity,
     reconnectionDelay: 2000,
+    auth: { format: "columnar" }, // dictionary-encoded columns instead of one object per alert
   });
+  socketRef.current = socket;
 
   // --- Socket Event Handlers ---
   socket.on("connect", () => {
     console.log("✅ Connected to Socket.IO stream");
+    subscribe(socket, filtersRef.current, lastSeqRef.current); // rooms don't survive a reconnect
   });
 
   socket.on("disconnect", () => {
@@ -186,15 +212,23 @@ export default function AlertsPage() {
   });
 
   socket.on("bulk_alerts", (payload) => {
-    if (!payload || !Array.isArray(payload.alerts)) {
+    const received = decodeAlertBatch(payload);
+    if (!received) {
       console.warn("⚠️ Malformed payload received:", payload);
       return;
     }
 
-    const alerts = payload.alerts.map((a: any, i: number) => {
-      console.log(`🔹 [${i + 1}/${payload.alerts.length}]`, a);
+    if (payload.missed) console.warn("⚠️ Some alerts were lost while disconnected");
+
+    // Seq ids only increase, so anything at or below the last one is a duplicate
+    const fresh = received.filter((a: any) => lastSeqRef.current === null || a.seq > lastSeqRef.current);
+    if (!fresh.length) return;
+    lastSeqRef.current = Math.max(lastSeqRef.current ?? 0, ...fresh.map((a: any) => a.seq));
+
+    const alerts = fresh.map((a: any, i: number) => {
+      console.log(`🔹 [${i + 1}/${fresh.length}]`, a);
       return {
-        id: crypto.randomUUID(),
+        id: a.seq,
         timestamp: a.timestamp || new Date().toISOString(),
         src_ip: a.src_ip || "unknown",
         src_port: a.src_port ?? null,
@@ -203,6 +237,13 @@ export default function AlertsPage() {
         protocol: a.protocol || "N/A",
         signature: a.signature || "Unlabeled Alert",
         severity: a.severity ?? 0,
+        geo_enriched: a.geo_enriched ?? false,
+        src_lat: a.src_lat,
+        src_lon: a.src_lon,
+        src_country: a.src_country,
+        dest_lat: a.dest_lat,
+        dest_lon: a.dest_lon,
+        dest_country: a.dest_country,
       };
     });
 
@@ -215,6 +256,7 @@ export default function AlertsPage() {
   // --- Cleanup on component unmount ---
   return () => {
     console.log("🧹 Cleaning up socket connection");
+    socketRef.current = null;
     socket.disconnect();
   };
 }, [token]);
@@ -388,7 +430,13 @@ const alertsPerHourOptions = {
     const srcIP = alert.src_ip;
     const destIP = alert.dest_ip;
     
-    setSelectedAlert(alert.original || alert);
+    setSelectedAlert(alert);
+    // Uploaded alerts only carry a reference; fetch the raw event for the detail view
+    if (alert.upload_id && alert.event_index != null) {
+      axios.get(`http://localhost:5000/api/alerts/raw/${alert.upload_id}/${alert.event_index}`)
+        .then(res => setSelectedAlert(res.data))
+        .catch(err => console.error("Failed to load raw event:", err));
+    }
     setThreatIntel(null);
     setLoadingIntel(true);
     
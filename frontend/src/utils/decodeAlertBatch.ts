@@ -0,0 +1,25 @@
+// src/utils/decodeAlertBatch.ts
+// Turns a bulk_alerts payload back into a list of alert objects.
+// The server sends { alerts: [...] } by default, or a column-oriented batch
+// when the socket connected with auth: { format: "columnar" }:
+//   { format: "columnar", count, strings, dict, columns: { key: [values] } }
+// where the columns listed in `dict` hold indexes into `strings`.
+export const decodeAlertBatch = (payload: any): any[] | null => {
+  if (!payload) return null;
+  if (payload.format !== "columnar") {
+    return Array.isArray(payload.alerts) ? payload.alerts : null;
+  }
+
+  const { count, strings, columns } = payload;
+  const dictColumns = new Set<string>(payload.dict || []);
+  const alerts: any[] = Array.from({ length: count }, () => ({}));
+  for (const [key, values] of Object.entries(columns as Record<string, any[]>)) {
+    const isDict = dictColumns.has(key);
+    for (let i = 0; i < count; i++) {
+      const v = values[i];
+      if (v === null || v === undefined) continue;
+      alerts[i][key] = isDict ? strings[v] : v;
+    }
+  }
+  return alerts;
+};